@@ -0,0 +1,160 @@
+# bci_app/core/adaptive.py
+"""
+Online adaptation for calibration with live feedback.
+
+- AdaptiveLDA: LDA whose class means and pooled covariance are
+  exponentially-forgetting recursive estimates. The inverse covariance is
+  kept up to date with Sherman-Morrison rank-one updates, so each labeled
+  window costs O(n_features^2) however long the session runs.
+- AdaptiveThreshold: FSM threshold taken from a running, forgetting
+  histogram of the classifier's REST-window confidences, so it tracks the
+  false-positive rate the user actually gets.
+"""
+
+import numpy as np
+
+from .inference import LinearClassifier, log_variance_features
+
+
+class AdaptiveLDA:
+    """
+    Drop-in classifier for SlidingWindowEngine (features / predict_proba)
+    that also learns from labeled windows via `update`.
+
+    - forgetting: weight kept by the old statistics per update; the
+      effective memory is about 1 / (1 - forgetting) windows
+    - spatial_filters: as for LinearClassifier (None = per-channel band power)
+    - counts: windows behind each class mean; a class with none yet takes
+      its first labeled window as the mean instead of blending it in
+    """
+
+    def __init__(self, mean0, mean1, cov, forgetting=0.998, spatial_filters=None, counts=(0, 0)):
+        self.means = [np.array(mean0, dtype=np.float64), np.array(mean1, dtype=np.float64)]
+        self.precision = np.linalg.inv(np.asarray(cov, dtype=np.float64))
+        self.forgetting = float(forgetting)
+        self.spatial_filters = None if spatial_filters is None else np.asarray(spatial_filters, dtype=np.float64)
+        self.counts = list(counts)
+        self.n_updates = 0
+        self._refresh()
+
+    @classmethod
+    def from_features(cls, X, y, forgetting=0.998, shrinkage=0.1, spatial_filters=None):
+        """Seed from calibration features (n, n_features) with labels in {0, 1}."""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        m0, m1 = X[y == 0].mean(axis=0), X[y == 1].mean(axis=0)
+        Xc = np.where((y == 1)[:, None], X - m1, X - m0)
+        s = Xc.T @ Xc / len(X)
+        mu = np.trace(s) / len(s)
+        cov = (1 - shrinkage) * s + shrinkage * mu * np.eye(len(s))
+        # the calibrated means count as seen: live windows only nudge them
+        return cls(m0, m1, cov, forgetting, spatial_filters,
+                   counts=(int(np.sum(y == 0)), int(np.sum(y == 1))))
+
+    @classmethod
+    def cold(cls, n_features, forgetting=0.998, spatial_filters=None, scale=1.0):
+        """No calibration data: equal means (P = 0.5) until both classes are seen."""
+        z = np.zeros(n_features)
+        return cls(z, z, scale * np.eye(n_features), forgetting, spatial_filters)
+
+    @property
+    def n_features(self):
+        return len(self.coef)
+
+    def features(self, covs):
+        return log_variance_features(covs, self.spatial_filters)
+
+    def decision_function(self, features):
+        return features @ self.coef + self.intercept
+
+    def predict_proba(self, features):
+        z = np.clip(self.decision_function(features), -500.0, 500.0)
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def update(self, x, label):
+        """Fold one labeled feature vector into the means and the inverse pooled covariance."""
+        lam = self.forgetting
+        x = np.asarray(x, dtype=np.float64).ravel()
+        m = self.means[label]
+        if self.counts[label] == 0:
+            m[:] = x                      # first window of a class replaces the prior mean
+        else:
+            m += (1 - lam) * (x - m)
+        self.counts[label] += 1
+        self.n_updates += 1
+        # S <- lam S + (1 - lam) d d^T, inverted with Sherman-Morrison:
+        # (lam S + a d d^T)^-1 = (P - (a/lam) P d d^T P / (1 + (a/lam) d^T P d)) / lam
+        d = x - m
+        a = (1 - lam) / lam
+        pd = self.precision @ d
+        self.precision -= np.outer(pd, pd) * (a / (1.0 + a * d @ pd))
+        self.precision /= lam
+        # keep it symmetric against rounding drift
+        self.precision += self.precision.T
+        self.precision *= 0.5
+        self._refresh()
+
+    def _refresh(self):
+        m0, m1 = self.means
+        self.coef = self.precision @ (m1 - m0)
+        self.intercept = float(-self.coef @ (m0 + m1) / 2)
+
+    def to_linear(self) -> LinearClassifier:
+        """Snapshot as a LinearClassifier (for export)."""
+        return LinearClassifier(self.coef.copy(), self.intercept, self.spatial_filters)
+
+
+class AdaptiveThreshold:
+    """
+    Running confidence distributions per class (forgetting histograms over
+    [0, 1]) and a threshold at their (1 - target_fpr) REST quantile.
+
+    The threshold stays at `initial` until `min_weight` REST windows have
+    been seen, and is always clipped to `bounds`. Updates are O(bins).
+    """
+
+    def __init__(self, initial=0.8, target_fpr=0.05, forgetting=0.999, bins=100,
+                 bounds=(0.55, 0.95), min_weight=50):
+        self.initial = float(initial)
+        self.target_fpr = float(target_fpr)
+        self.forgetting = float(forgetting)
+        self.bounds = bounds
+        self.min_weight = min_weight
+        self.edges = np.linspace(0.0, 1.0, bins + 1)
+        self.hist = np.zeros((2, bins))
+        self.value = self.initial
+
+    @classmethod
+    def from_config(cls, train_cfg):
+        cfg = train_cfg or {}
+        return cls(initial=cfg.get("threshold", 0.8), target_fpr=cfg.get("target_fpr", 0.05))
+
+    def update(self, proba, label) -> float:
+        self.hist[label] *= self.forgetting
+        self.hist[label, min(int(proba * (len(self.edges) - 1)), len(self.edges) - 2)] += 1.0
+        rest = self.hist[0]
+        if rest.sum() >= self.min_weight:
+            self.value = float(np.clip(self.quantile(0, 1.0 - self.target_fpr), *self.bounds))
+        return self.value
+
+    def quantile(self, label, q) -> float:
+        """q-quantile of a class's confidence distribution (linear within a bin)."""
+        h = self.hist[label]
+        total = h.sum()
+        if total == 0:
+            return float("nan")
+        cdf = np.cumsum(h) / total
+        i = int(np.searchsorted(cdf, q))
+        i = min(i, len(h) - 1)
+        lo = cdf[i - 1] if i else 0.0
+        frac = (q - lo) / (cdf[i] - lo) if cdf[i] > lo else 0.0
+        return float(self.edges[i] + frac * (self.edges[i + 1] - self.edges[i]))
+
+    def rate_above(self, label, threshold=None) -> float:
+        """Fraction of a class's windows at or above `threshold` (TPR for 1, FPR for 0)."""
+        h = self.hist[label]
+        total = h.sum()
+        if total == 0:
+            return float("nan")
+        t = self.value if threshold is None else threshold
+        return float(h[int(t * (len(self.edges) - 1)):].sum() / total)
@@ -0,0 +1,298 @@
+# bci_app/core/catalog.py
+"""
+SQLite index of the epoched sessions stored under the data root.
+
+Every `save_npz_to_box` call registers its file here (subject, kind,
+timestamp, shapes, sampling rate, class counts, checksum), so selecting
+sessions is a query instead of a directory walk that opens every file.
+Sessions saved before the catalog existed are picked up by `scan()`.
+
+Paths are stored relative to the catalog's directory, so the index keeps
+working when the Box folder is synced to another machine.
+"""
+
+import hashlib
+import sqlite3
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+CATALOG_NAME = "catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id            INTEGER PRIMARY KEY,
+    path          TEXT UNIQUE NOT NULL,
+    subject       TEXT NOT NULL,
+    kind          TEXT NOT NULL,
+    created       TEXT NOT NULL,
+    n_trials      INTEGER NOT NULL,
+    n_channels    INTEGER NOT NULL,
+    n_samples     INTEGER NOT NULL,
+    dtype         TEXT NOT NULL,
+    sampling_rate REAL,
+    n_rest        INTEGER NOT NULL,
+    n_switch      INTEGER NOT NULL,
+    size_bytes    INTEGER NOT NULL,
+    checksum      TEXT NOT NULL,
+    raw_dir       TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_subject ON sessions (subject, kind, created);
+CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created);
+"""
+
+
+@dataclass
+class SessionRecord:
+    id: int
+    path: Path            # absolute
+    subject: str
+    kind: str
+    created: str          # ISO timestamp
+    n_trials: int
+    n_channels: int
+    n_samples: int
+    dtype: str
+    sampling_rate: float
+    n_rest: int
+    n_switch: int
+    size_bytes: int
+    checksum: str
+    raw_dir: str = None
+
+    @property
+    def shape(self):
+        return (self.n_trials, self.n_channels, self.n_samples)
+
+
+def file_checksum(path, chunk=1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def npz_member_header(path, member):
+    """(shape, dtype) of an .npz member, read from its .npy header only."""
+    with zipfile.ZipFile(path) as z, z.open(f"{member}.npy") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return shape, dtype
+
+
+def _timestamp_from_name(path):
+    stamp = Path(path).stem.partition("_")[2]
+    for fmt in ("%Y%m%d_%H%M%S_%f", "%Y%m%d_%H%M%S"):   # current names, then pre-µs ones
+        try:
+            return datetime.strptime(stamp, fmt).isoformat()
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(Path(path).stat().st_mtime).isoformat(timespec="seconds")
+
+
+class SessionCatalog:
+    """
+    Catalog at `path` (a .sqlite file, or a directory to hold CATALOG_NAME).
+
+    Connections are opened per call, so one catalog object can be shared
+    between the GUI and background threads.
+    """
+
+    def __init__(self, path):
+        path = Path(path)
+        if path.is_dir():
+            path = path / CATALOG_NAME
+        self.path = path
+        self.root = path.parent
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10.0)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _rel(self, path):
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _record(self, row) -> SessionRecord:
+        d = dict(row)
+        d["path"] = self.root / d["path"]
+        return SessionRecord(**d)
+
+    def register(self, path, subject, kind, sampling_rate=None, labels=None, raw_dir=None,
+                 created=None) -> SessionRecord:
+        """
+        Add (or refresh) one .npz session. Shapes come from the array
+        headers; pass `labels` when they are at hand to avoid reading them.
+        """
+        path = Path(path)
+        (n_trials, n_channels, n_samples), dtype = npz_member_header(path, "data")
+        if labels is None:
+            with np.load(path) as z:
+                labels = z["labels"]
+        labels = np.asarray(labels)
+        row = {
+            "path": self._rel(path),
+            "subject": subject,
+            "kind": kind,
+            "created": created or _timestamp_from_name(path),
+            "n_trials": int(n_trials),
+            "n_channels": int(n_channels),
+            "n_samples": int(n_samples),
+            "dtype": dtype.str,
+            "sampling_rate": sampling_rate,
+            "n_rest": int(np.sum(labels == 0)),
+            "n_switch": int(np.sum(labels == 1)),
+            "size_bytes": path.stat().st_size,
+            "checksum": file_checksum(path),
+            "raw_dir": None if raw_dir is None else self._rel(raw_dir),
+        }
+        cols = ", ".join(row)
+        marks = ", ".join(f":{k}" for k in row)
+        updates = ", ".join(f"{k} = excluded.{k}" for k in row if k != "path")
+        with self._connect() as db:
+            db.execute(f"INSERT INTO sessions ({cols}) VALUES ({marks}) "
+                       f"ON CONFLICT(path) DO UPDATE SET {updates}", row)
+            return self._record(db.execute("SELECT * FROM sessions WHERE path = ?", (row["path"],)).fetchone())
+
+    def scan(self, sampling_rate=None) -> int:
+        """
+        Register every <subject>/<kind>/eegdata_*.npz under the root that is
+        not in the catalog yet. Returns the number of sessions added.
+        """
+        with self._connect() as db:
+            known = {r[0] for r in db.execute("SELECT path FROM sessions")}
+        added = 0
+        for path in sorted(self.root.glob("*/*/eegdata_*.npz")):
+            if self._rel(path) in known:
+                continue
+            subject, kind = path.parent.parent.name, path.parent.name
+            try:
+                self.register(path, subject, kind, sampling_rate)
+                added += 1
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+                print(f"[Catalog] Skipping {path}: {e}")
+        return added
+
+    def query(self, subject=None, kind=None, since=None, until=None, sampling_rate=None,
+              n_channels=None, min_trials=None, limit=None, unknown_rate=False):
+        """
+        Sessions matching every given filter, oldest first. `subject` and
+        `kind` accept a single value or a list; since/until are ISO
+        timestamps (or dates) compared against the save time. With
+        unknown_rate=True the `sampling_rate` filter also matches sessions
+        whose rate was never recorded (back-filled by scan() without one).
+        """
+        where, args = [], []
+        for col, val in (("subject", subject), ("kind", kind)):
+            if val is None:
+                continue
+            vals = [val] if isinstance(val, str) else list(val)
+            where.append(f"{col} IN ({', '.join('?' * len(vals))})")
+            args.extend(vals)
+        rate_clause = "(sampling_rate = ? OR sampling_rate IS NULL)" if unknown_rate else "sampling_rate = ?"
+        for clause, val in (("created >= ?", since), ("created < ?", until),
+                            (rate_clause, sampling_rate), ("n_channels = ?", n_channels),
+                            ("n_trials >= ?", min_trials)):
+            if val is not None:
+                where.append(clause)
+                args.append(val)
+        sql = "SELECT * FROM sessions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created, id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._connect() as db:
+            return [self._record(r) for r in db.execute(sql, args)]
+
+    def subjects(self):
+        with self._connect() as db:
+            return [r[0] for r in db.execute("SELECT DISTINCT subject FROM sessions ORDER BY subject")]
+
+    def summary(self) -> dict:
+        """Totals per subject: sessions, trials, REST, SWITCH."""
+        with self._connect() as db:
+            rows = db.execute("SELECT subject, COUNT(*), SUM(n_trials), SUM(n_rest), SUM(n_switch) "
+                              "FROM sessions GROUP BY subject ORDER BY subject").fetchall()
+        return {r[0]: {"sessions": r[1], "trials": r[2], "rest": r[3], "switch": r[4]} for r in rows}
+
+    def remove_missing(self) -> int:
+        """Drop entries whose file no longer exists."""
+        with self._connect() as db:
+            gone = [r["id"] for r in db.execute("SELECT id, path FROM sessions")
+                    if not (self.root / r["path"]).exists()]
+            db.executemany("DELETE FROM sessions WHERE id = ?", [(i,) for i in gone])
+        return len(gone)
+
+
+def iter_batches(records, batch_trials=256, verify=False):
+    """
+    Stream trials from `records` in batches of up to `batch_trials`
+    (data, labels, session_ids). Files are opened one at a time, only when
+    the batch that needs them is built.
+    """
+    data, labels, ids, n = [], [], [], 0
+    for rec in records:
+        if verify and file_checksum(rec.path) != rec.checksum:
+            raise ValueError(f"{rec.path} does not match its catalog checksum")
+        with np.load(rec.path) as z:
+            d, l = z["data"], z["labels"]
+        i = 0
+        while i < len(l):
+            take = min(batch_trials - n, len(l) - i)
+            data.append(d[i:i + take])
+            labels.append(l[i:i + take])
+            ids.append(np.full(take, rec.id))
+            n += take
+            i += take
+            if n == batch_trials:
+                yield np.concatenate(data), np.concatenate(labels), np.concatenate(ids)
+                data, labels, ids, n = [], [], [], 0
+    if n:
+        yield np.concatenate(data), np.concatenate(labels), np.concatenate(ids)
+
+
+def load_dataset(records, dtype=np.float64, verify=False):
+    """
+    Pool `records` into one (n_trials, n_channels, n_samples) array. The
+    output is allocated once from the catalog shapes and filled session by
+    session; every session must share channel count and epoch length.
+    """
+    records = list(records)
+    if not records:
+        raise ValueError("no sessions selected")
+    shapes = {(r.n_channels, r.n_samples) for r in records}
+    if len(shapes) > 1:
+        raise ValueError(f"sessions have different (channels, samples) shapes: {sorted(shapes)}")
+    n_channels, n_samples = shapes.pop()
+    total = sum(r.n_trials for r in records)
+    data = np.empty((total, n_channels, n_samples), dtype=dtype)
+    labels = np.empty(total, dtype=np.int64)
+    i = 0
+    for rec in records:
+        if verify and file_checksum(rec.path) != rec.checksum:
+            raise ValueError(f"{rec.path} does not match its catalog checksum")
+        with np.load(rec.path) as z:
+            data[i:i + rec.n_trials] = z["data"]
+            labels[i:i + rec.n_trials] = z["labels"]
+        i += rec.n_trials
+    return data, labels
@@ -0,0 +1,181 @@
+# bci_app/core/export.py
+"""
+Pickle-free model export.
+
+A model file (.bcim) is
+
+    8 bytes   magic b"BCIMODL1"
+    4 bytes   little-endian uint32 header length
+    N bytes   UTF-8 JSON header
+    ...       data section: raw little-endian arrays, each on a 64-byte boundary
+
+The header holds the scalar settings (sampling rate, bands, channel map,
+FSM/inference settings, classifier kind and scalars) and, for every array,
+its dtype, shape and byte offset within the data section. Loading reads
+the header and maps each array straight out of one read-only np.memmap:
+no pickle, no class hierarchy, only numpy + json.
+"""
+
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .inference import LinearClassifier
+from .processing import StreamingFilterBank
+
+MAGIC = b"BCIMODL1"
+ALIGN = 64
+FORMAT_VERSION = 1
+
+
+@dataclass
+class ExportReport:
+    path: str
+    size_bytes: int
+    n_arrays: int
+    load_ms: float       # median time to open the file and build the classifier
+
+
+class ExportedModel:
+    """A loaded .bcim file: classifier + everything the runtime needs around it."""
+
+    def __init__(self, header: dict, arrays: dict):
+        self.header = header
+        self.arrays = arrays
+        self.sampling_rate = header["sampling_rate"]
+        self.channels = header["channels"]
+        self.bands = [tuple(b) for b in header["bands"]]
+        self.fsm_config = header.get("fsm", {})
+        self.infer_config = header.get("infer", {})
+        self.metadata = header.get("metadata", {})
+        self.classifier = _build_classifier(header["classifier"], arrays)
+
+    @property
+    def n_channels(self):
+        return len(self.channels)
+
+    def build_filter_bank(self) -> StreamingFilterBank:
+        """Filter bank from the stored coefficients (does not need scipy)."""
+        return StreamingFilterBank(
+            self.sampling_rate, self.n_channels, self.bands,
+            notch_sos=self.arrays.get("notch_sos"), band_sos=self.arrays["band_sos"],
+        )
+
+
+def _classifier_payload(classifier):
+    """Split a classifier into (header dict, arrays dict)."""
+    if isinstance(classifier, LinearClassifier):
+        arrays = {"clf.coef": classifier.coef}
+        if classifier.spatial_filters is not None:
+            arrays["clf.spatial_filters"] = classifier.spatial_filters
+        return {"kind": "linear", "intercept": classifier.intercept}, arrays
+    if hasattr(classifier, "export_payload"):
+        return classifier.export_payload()
+    raise TypeError(f"Don't know how to export {type(classifier).__name__}")
+
+
+def _build_classifier(spec, arrays):
+    kind = spec["kind"]
+    if kind == "linear":
+        return LinearClassifier(arrays["clf.coef"], spec["intercept"],
+                                arrays.get("clf.spatial_filters"))
+    if kind in ("mlp", "mlp_int8"):
+        from .mlp import load_payload
+        return load_payload(spec, arrays)
+    raise ValueError(f"Unknown classifier kind {kind!r}")
+
+
+def export_model(path, classifier, filter_bank: StreamingFilterBank, channels=None,
+                 fsm_config=None, infer_config=None, metadata=None, repeat=5) -> ExportReport:
+    """
+    Write `classifier` plus its filter bank and runtime settings to `path`.
+    `channels` is the board channel map (board row indices) the model
+    expects, by default the first filter_bank.n_channels rows.
+    Returns an ExportReport with the artifact size and measured load time.
+    """
+    clf_spec, arrays = _classifier_payload(classifier)
+    arrays = dict(arrays)
+    arrays["band_sos"] = filter_bank.band_sos
+    if filter_bank.notch_sos is not None:
+        arrays["notch_sos"] = filter_bank.notch_sos
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "sampling_rate": filter_bank.sampling_rate,
+        "channels": [int(c) for c in channels] if channels is not None else list(range(filter_bank.n_channels)),
+        "bands": [list(b) for b in filter_bank.bands],
+        "fsm": dict(fsm_config or {}),
+        "infer": dict(infer_config or {}),
+        "metadata": dict(metadata or {}),
+        "classifier": clf_spec,
+        "arrays": {},
+    }
+
+    # array offsets are relative to the data section, which starts on the
+    # first 64-byte boundary after the header
+    blobs = {k: np.ascontiguousarray(v, dtype=np.asarray(v).dtype.newbyteorder("<"))
+             for k, v in arrays.items()}
+    offset = 0
+    for k, b in blobs.items():
+        header["arrays"][k] = {"dtype": b.dtype.str, "shape": list(b.shape), "offset": offset}
+        offset = _align(offset + b.nbytes)
+    head = json.dumps(header).encode()
+    data_start = _align(len(MAGIC) + 4 + len(head))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(head).to_bytes(4, "little"))
+        f.write(head)
+        for k, b in blobs.items():
+            f.write(b"\0" * (data_start + header["arrays"][k]["offset"] - f.tell()))
+            f.write(b.tobytes())
+    os.replace(tmp, path)
+
+    runs = []
+    for _ in range(max(1, repeat)):
+        t = time.perf_counter()
+        load_model_file(path)
+        runs.append((time.perf_counter() - t) * 1e3)
+    return ExportReport(str(path), os.path.getsize(path), len(blobs), statistics.median(runs))
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _read_header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{f.name} is not an exported model file")
+    n = int.from_bytes(f.read(4), "little")
+    return json.loads(f.read(n)), _align(len(MAGIC) + 4 + n)
+
+
+def read_header(path) -> dict:
+    with open(path, "rb") as f:
+        return _read_header(f)[0]
+
+
+def is_model_file(path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_model_file(path) -> ExportedModel:
+    """Open an exported model; arrays are read-only views into a memory map."""
+    with open(path, "rb") as f:
+        header, data_start = _read_header(f)
+    if header.get("format_version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{path} was written by a newer exporter (v{header['format_version']})")
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(mm, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(spec["shape"])
+    return ExportedModel(header, arrays)
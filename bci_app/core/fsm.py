@@ -0,0 +1,169 @@
+# bci_app/core/fsm.py
+
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import instrumentation as instr
+
+OPEN = "open"
+CLOSED = "closed"
+
+
+@dataclass
+class LatencyTrail:
+    """
+    Timestamps (seconds, time.time() clock) a decision picked up on its way
+    from the board to the prosthesis.
+    - acquired:   when the newest sample in the window reached the host
+    - filtered:   when that sample left the filter bank
+    - classified: when the classifier produced the probability
+    - toggled:    when the FSM flipped state (NaN if it did not)
+
+    `sample_time` is that sample's board timestamp, on the stream's own
+    clock: the same as `acquired` for hardware, but for an accelerated or
+    free-running simulated clock it runs ahead of (or behind) wall time,
+    so it only drives the FSM's timing and never enters a latency.
+    """
+    acquired: float
+    filtered: float = float("nan")
+    classified: float = float("nan")
+    toggled: float = float("nan")
+    sample_time: float = float("nan")
+
+    @property
+    def total(self) -> float:
+        """Sample acquired -> state toggled."""
+        return self.toggled - self.acquired
+
+    def stages(self) -> dict:
+        return {
+            "acquire_to_filter": self.filtered - self.acquired,
+            "filter_to_classify": self.classified - self.filtered,
+            "classify_to_toggle": self.toggled - self.classified,
+            "total": self.total,
+        }
+
+
+@dataclass
+class ToggleEvent:
+    state: str          # new state, OPEN or CLOSED
+    proba: float        # probability that triggered the toggle
+    sample: int         # absolute sample index of the triggering window
+    trail: LatencyTrail
+
+
+class ToggleFSM:
+    """
+    Toggle state machine: one mental "hit" flips the prosthesis between
+    OPEN and CLOSED.
+
+    - threshold:     P(SWITCH) at or above which a window counts as a hit
+    - refractory_ms: minimum time between two toggles
+    - debounce:      consecutive hits needed before toggling
+    - hysteresis:    after a toggle, P(SWITCH) must drop below
+                     threshold - hysteresis before the next hit can count,
+                     so one sustained imagery burst cannot toggle twice
+
+    Time is taken from the trail's sample timestamp when one is given (so
+    replayed or accelerated streams behave as in real time), otherwise
+    from `clock`. Latencies are always measured on the wall clock.
+    """
+
+    def __init__(self, threshold=0.8, refractory_ms=500, debounce=1, hysteresis=0.0,
+                 initial=OPEN, clock=time.time, history=256):
+        self.threshold = threshold
+        self.refractory = refractory_ms / 1000.0
+        self.debounce = max(1, int(debounce))
+        self.hysteresis = hysteresis
+        self.clock = clock
+        self.initial = initial
+        self.latencies = deque(maxlen=history)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, train_cfg, **kwargs):
+        """Build from the `train` section of a session config."""
+        return cls(
+            threshold=train_cfg.get("threshold", 0.8),
+            refractory_ms=train_cfg.get("refractory_ms", 500),
+            debounce=train_cfg.get("debounce", 1),
+            hysteresis=train_cfg.get("hysteresis", 0.0),
+            **kwargs,
+        )
+
+    def reset(self):
+        self.state = self.initial
+        self._hits = 0
+        self._armed = True
+        self._last_toggle = -np.inf
+        self.latencies.clear()
+
+    def update(self, proba: float, sample: int = -1, trail: LatencyTrail = None):
+        """
+        Feed one classifier probability. Returns a ToggleEvent if the state
+        flipped, otherwise None.
+        """
+        t0 = instr.start()
+        event = self._step(proba, sample, trail)
+        instr.stop("fsm.update", t0)
+        return event
+
+    def _step(self, proba, sample, trail):
+        if trail is not None and np.isfinite(trail.sample_time):
+            now = trail.sample_time
+        else:
+            now = self.clock()
+
+        if not self._armed:
+            if proba < self.threshold - self.hysteresis:
+                self._armed = True
+            return None
+
+        if proba < self.threshold:
+            self._hits = 0
+            return None
+        if now - self._last_toggle < self.refractory:
+            return None
+
+        self._hits += 1
+        if self._hits < self.debounce:
+            return None
+
+        self.state = CLOSED if self.state == OPEN else OPEN
+        self._hits = 0
+        self._armed = self.hysteresis <= 0
+        self._last_toggle = now
+        toggled = time.time()
+        if trail is None:
+            trail = LatencyTrail(acquired=toggled, sample_time=now)
+        elif not np.isfinite(trail.acquired):
+            trail.acquired = toggled
+        trail.toggled = toggled
+        self.latencies.append(trail.total)
+        if instr.ENABLED:
+            instr.count("fsm.toggles")
+            # every stage is on the wall clock, so a negative span is a real fault:
+            # count it instead of letting it vanish into the underflow bin
+            for stage, dt in trail.stages().items():
+                if not np.isfinite(dt):
+                    continue
+                if dt < 0:
+                    instr.count(f"latency.{stage}.negative")
+                else:
+                    instr.record(f"latency.{stage}", dt)
+        return ToggleEvent(self.state, proba, sample, trail)
+
+    def latency_summary(self) -> dict:
+        """p50/p95/max of acquired -> toggled latency (seconds) over recent toggles."""
+        if not self.latencies:
+            return {}
+        lat = np.asarray(self.latencies)
+        return {
+            "count": len(lat),
+            "p50": float(np.percentile(lat, 50)),
+            "p95": float(np.percentile(lat, 95)),
+            "max": float(lat.max()),
+        }
@@ -0,0 +1,194 @@
+# bci_app/core/inference.py
+
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import instrumentation as instr
+from .fsm import LatencyTrail
+from .processing import StreamingFilterBank
+
+
+def log_variance_features(covs: np.ndarray, spatial_filters: np.ndarray = None) -> np.ndarray:
+    """
+    (..., n_bands, n_channels, n_channels) covariances -> (..., n_features)
+    log-variances, of every channel or of each band's spatial filters
+    (n_bands, n_channels, n_components).
+    """
+    if spatial_filters is None:
+        var = np.diagonal(covs, axis1=-2, axis2=-1)
+    else:
+        w = spatial_filters
+        var = np.einsum("...bij,bik,bjk->...bk", covs, w, w, optimize=True)
+    feats = np.log(np.maximum(var, 1e-12))
+    return feats.reshape(feats.shape[:-2] + (-1,))
+
+
+class LinearClassifier:
+    """
+    Log-variance features + linear discriminant.
+
+    - spatial_filters: (n_bands, n_channels, n_components) per-band spatial
+      filters (e.g. CSP). If None, features are the log band power of every
+      channel, i.e. the diagonal of each band covariance.
+    - coef, intercept: linear discriminant over the flattened features;
+      `predict_proba` returns P(class 1) through a logistic link.
+
+    Features only depend on the band covariances of a window, which is what
+    lets SlidingWindowEngine update them incrementally.
+    """
+
+    def __init__(self, coef, intercept=0.0, spatial_filters=None):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.spatial_filters = None if spatial_filters is None else np.asarray(spatial_filters, dtype=np.float64)
+
+    def features(self, covs: np.ndarray) -> np.ndarray:
+        """(..., n_bands, n_channels, n_channels) covariances -> (..., n_features)."""
+        return log_variance_features(covs, self.spatial_filters)
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        return features @ self.coef + self.intercept
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Probability of class 1 (SWITCH) for (..., n_features) features."""
+        z = np.clip(self.decision_function(features), -500.0, 500.0)
+        return 1.0 / (1.0 + np.exp(-z))
+
+
+@dataclass
+class WindowResult:
+    sample: int            # absolute index one past the window's last sample
+    timestamp: float       # acquisition timestamp of the window's last sample
+    features: np.ndarray
+    proba: float = None    # P(class 1), None without a classifier
+    trail: LatencyTrail = None
+
+
+class SlidingWindowEngine:
+    """
+    Sliding-window feature extraction with O(step) work per hop.
+
+    Raw chunks go through the streaming filter bank; filtered samples are
+    grouped into hops of `step` samples and each hop contributes one block
+    of per-band second moments, sum(x x^T), of shape
+    (n_bands, n_channels, n_channels). The window covariance is the running
+    sum of the last `window // step` blocks: every hop adds the new block
+    and subtracts the one that left the window, so its cost depends on the
+    hop length, not on the window length.
+
+    The band-passed signal is zero-mean, so the uncentered second moment is
+    used as the covariance. To keep float round-off from accumulating, the
+    running sum is rebuilt from the stored blocks once per window length.
+    """
+
+    def __init__(self, filter_bank: StreamingFilterBank, window_s=2.0, step_s=0.04,
+                 classifier=None):
+        fs = filter_bank.sampling_rate
+        self.filter_bank = filter_bank
+        self.classifier = classifier
+        self.step = max(1, int(round(step_s * fs)))
+        self.n_blocks = max(1, int(round(window_s * fs / self.step)))
+        self.window = self.step * self.n_blocks
+
+        shape = (filter_bank.n_bands, filter_bank.n_channels)
+        self._pending = np.zeros(shape + (self.step,))
+        self._fill = 0
+        self._blocks = deque()
+        self._sum = np.zeros(shape + (filter_bank.n_channels,))
+        self._hops = 0
+        self.sample = 0
+
+    def reset(self):
+        self.filter_bank.reset()
+        self._fill = 0
+        self._blocks.clear()
+        self._sum[:] = 0.0
+        self._hops = 0
+        self.sample = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self._blocks) == self.n_blocks
+
+    def covariance(self) -> np.ndarray:
+        """Current window covariance, (n_bands, n_channels, n_channels)."""
+        return self._sum / (len(self._blocks) * self.step)
+
+    def _add_block(self, block):
+        cov = np.einsum("bcn,bdn->bcd", block, block)
+        self._blocks.append(cov)
+        self._sum += cov
+        if len(self._blocks) > self.n_blocks:
+            self._sum -= self._blocks.popleft()
+        self._hops += 1
+        if self._hops % self.n_blocks == 0:
+            self._sum = np.sum(self._blocks, axis=0)
+
+    def push(self, chunk: np.ndarray, timestamps: np.ndarray = None, arrived: float = None):
+        """
+        Feed a raw (n_channels, n) chunk. Returns a list with one WindowResult
+        per completed hop (empty until the first full window).
+
+        `timestamps` are the board's sample timestamps. When they are not on
+        the time.time() clock (a simulated board on an accelerated or free
+        clock), pass `arrived`, the wall-clock time the chunk was read, for
+        the latency trail; without either it is the time of this call.
+        """
+        t0 = instr.start()
+        t_push = time.time()
+        filtered = self.filter_bank.process(chunk)
+        t_filtered = time.time()
+        n = filtered.shape[-1]
+        results = []
+        i = 0
+        while i < n:
+            take = min(self.step - self._fill, n - i)
+            self._pending[..., self._fill:self._fill + take] = filtered[..., i:i + take]
+            self._fill += take
+            i += take
+            self.sample += take
+            if self._fill < self.step:
+                break
+            self._fill = 0
+            self._add_block(self._pending)
+            if not self.ready:
+                continue
+            ts = float(timestamps[i - 1]) if timestamps is not None else float("nan")
+            if arrived is not None:
+                acquired = arrived
+            else:
+                acquired = ts if np.isfinite(ts) else t_push
+            results.append(self._evaluate(ts, acquired, t_filtered))
+        instr.stop("engine.push", t0)
+        return results
+
+    def _evaluate(self, timestamp, acquired, t_filtered):
+        t0 = instr.start()
+        cov = self.covariance()
+        trail = LatencyTrail(acquired=acquired, filtered=t_filtered, sample_time=timestamp)
+        if self.classifier is None:
+            feats = log_variance_features(cov)
+            trail.classified = time.time()
+            return WindowResult(self.sample, timestamp, feats, trail=trail)
+        feats = self.classifier.features(cov)
+        proba = float(self.classifier.predict_proba(feats))
+        trail.classified = time.time()
+        instr.stop("engine.classify", t0)
+        instr.count("engine.windows")
+        return WindowResult(self.sample, timestamp, feats, proba, trail)
+
+
+def window_covariances(filtered: np.ndarray, window: int, step: int) -> np.ndarray:
+    """
+    Offline counterpart of SlidingWindowEngine: covariances of every
+    `window`-sample window, advancing by `step`, over filtered epochs.
+
+    (..., n_bands, n_channels, n) -> (..., n_windows, n_bands, n_channels, n_channels)
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(filtered, window, axis=-1)[..., ::step, :]
+    # windows: (..., n_bands, n_channels, n_windows, window)
+    covs = np.einsum("...bcwn,...bdwn->...wbcd", windows, windows, optimize=True)
+    return covs / window
@@ -0,0 +1,205 @@
+# bci_app/core/instrumentation.py
+"""
+Lightweight hot-path instrumentation.
+
+    from bci_app.core import instrumentation as instr
+
+    t0 = instr.start()              # 0.0 when disabled
+    ...
+    instr.stop("filter.process", t0)
+    instr.count("board.samples", n)
+
+Metrics live in one process-wide registry:
+- timings: log-binned histograms (1 µs .. 100 s, 20 bins per decade), so
+  recording is O(1) and p50/p95/p99 come from the bins (±6% resolution)
+- counters: totals plus a rate since the first increment (throughput)
+
+Instrumentation is off by default. Disabled, every call is one global
+flag check and a return; hot loops can also test `instr.ENABLED` first.
+Turn it on with `enable()` or BCI_INSTRUMENT=1 in the environment.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("BCI_INSTRUMENT", "") not in ("", "0")
+
+_BINS_PER_DECADE = 20
+_MIN_EXP = -6            # 1 µs
+_N_BINS = 8 * _BINS_PER_DECADE
+
+_lock = threading.Lock()
+_timings = {}
+_counters = {}
+
+
+class Histogram:
+    __slots__ = ("bins", "n", "total", "min", "max")
+
+    def __init__(self):
+        self.bins = [0] * (_N_BINS + 2)   # + underflow / overflow
+        self.n = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds):
+        if seconds > 0.0:
+            i = int((math.log10(seconds) - _MIN_EXP) * _BINS_PER_DECADE) + 1
+            i = 0 if i < 0 else (_N_BINS + 1 if i > _N_BINS + 1 else i)
+        else:
+            i = 0
+        self.bins[i] += 1
+        self.n += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Geometric centre of the bin holding the q-quantile, clamped to the observed range."""
+        if not self.n:
+            return math.nan
+        target = q * self.n
+        seen = 0
+        for i, c in enumerate(self.bins):
+            seen += c
+            if seen >= target and c:
+                centre = 10.0 ** (_MIN_EXP + (i - 0.5) / _BINS_PER_DECADE)
+                return min(max(centre, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        ms = lambda s: round(s * 1e3, 4)
+        return {
+            "count": self.n,
+            "mean_ms": ms(self.total / self.n) if self.n else None,
+            "p50_ms": ms(self.quantile(0.50)) if self.n else None,
+            "p95_ms": ms(self.quantile(0.95)) if self.n else None,
+            "p99_ms": ms(self.quantile(0.99)) if self.n else None,
+            "max_ms": ms(self.max) if self.n else None,
+        }
+
+
+class Counter:
+    __slots__ = ("value", "first", "last")
+
+    def __init__(self):
+        self.value = 0
+        self.first = None
+        self.last = None
+
+    def add(self, n):
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        self.last = now
+        self.value += n
+
+    def summary(self) -> dict:
+        span = (self.last - self.first) if self.first is not None else 0.0
+        return {"value": self.value, "rate_per_s": round(self.value / span, 3) if span > 0 else None}
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def is_enabled() -> bool:
+    return ENABLED
+
+
+def start() -> float:
+    """Start a measurement; pass the result to `stop`."""
+    return time.perf_counter() if ENABLED else 0.0
+
+
+def stop(name, t0):
+    """Record the time since `t0` (from `start`) under `name`."""
+    if ENABLED and t0:
+        record(name, time.perf_counter() - t0)
+
+
+def record(name, seconds):
+    """Add one duration (seconds) to the `name` histogram."""
+    if not ENABLED:
+        return
+    with _lock:
+        h = _timings.get(name)
+        if h is None:
+            h = _timings[name] = Histogram()
+        h.add(seconds)
+
+
+def count(name, n=1):
+    """Increment counter `name` by `n`."""
+    if not ENABLED:
+        return
+    with _lock:
+        c = _counters.get(name)
+        if c is None:
+            c = _counters[name] = Counter()
+        c.add(n)
+
+
+class timed:
+    """Context manager / decorator form of start + stop, for code off the hot path."""
+
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = start()
+        return self
+
+    def __exit__(self, *exc):
+        stop(self.name, self.t0)
+
+    def __call__(self, fn):
+        def wrapper(*args, **kwargs):
+            t0 = start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stop(self.name, t0)
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        return wrapper
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+def snapshot() -> dict:
+    """Current metrics as plain dicts (timings in ms)."""
+    with _lock:
+        return {
+            "enabled": ENABLED,
+            "timings": {k: h.summary() for k, h in sorted(_timings.items())},
+            "counters": {k: c.summary() for k, c in sorted(_counters.items())},
+        }
+
+
+def export(path, extra=None) -> dict:
+    """Write `snapshot()` (plus `extra`, e.g. a session summary) to a JSON file."""
+    snap = snapshot()
+    snap["exported"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    if extra:
+        snap.update(extra)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snap, f, indent=2, default=str)
+    os.replace(tmp, path)
+    print(f"[Instrumentation] Wrote {path}")
+    return snap
@@ -0,0 +1,272 @@
+# bci_app/core/mlp.py
+"""
+Small MLP over log-variance features, and its int8-quantized counterpart
+for Pi Zero / MCU-class targets. Everything here runs on numpy alone.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .inference import log_variance_features
+
+QMAX = 127
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -500.0, 500.0)))
+
+
+class MLP:
+    """
+    Float MLP: standardize -> [dense + ReLU]* -> dense -> sigmoid, giving
+    P(class 1). Uses the same covariance -> log-variance front end as
+    LinearClassifier, so it drops into SlidingWindowEngine unchanged.
+    """
+
+    def __init__(self, weights, biases, mean, std, spatial_filters=None):
+        self.weights = [np.asarray(w, dtype=np.float64) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float64) for b in biases]
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.spatial_filters = None if spatial_filters is None else np.asarray(spatial_filters, dtype=np.float64)
+
+    def features(self, covs):
+        return log_variance_features(covs, self.spatial_filters)
+
+    def _forward(self, features):
+        h = (features - self.mean) / self.std
+        acts = [h]
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            h = h @ w + b
+            if i < len(self.weights) - 1:
+                h = np.maximum(h, 0.0)
+            acts.append(h)
+        return acts
+
+    def predict_proba(self, features):
+        return _sigmoid(self._forward(np.asarray(features, dtype=np.float64))[-1][..., 0])
+
+    @property
+    def nbytes(self):
+        return sum(w.nbytes + b.nbytes for w, b in zip(self.weights, self.biases))
+
+    def export_payload(self):
+        arrays = {"clf.mean": self.mean, "clf.std": self.std}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"clf.w{i}"], arrays[f"clf.b{i}"] = w, b
+        if self.spatial_filters is not None:
+            arrays["clf.spatial_filters"] = self.spatial_filters
+        return {"kind": "mlp", "n_layers": len(self.weights)}, arrays
+
+
+def fit_mlp(X, y, hidden=(16,), epochs=400, lr=0.01, l2=1e-4, seed=0, spatial_filters=None) -> MLP:
+    """Full-batch Adam on binary cross-entropy. X is (n, n_features), y in {0, 1}."""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    mean, std = X.mean(axis=0), X.std(axis=0) + 1e-8
+    sizes = [X.shape[1], *hidden, 1]
+    weights = [rng.standard_normal((a, b)) * np.sqrt(2.0 / a) for a, b in zip(sizes[:-1], sizes[1:])]
+    biases = [np.zeros(b) for b in sizes[1:]]
+    mlp = MLP(weights, biases, mean, std, spatial_filters)
+
+    params = mlp.weights + mlp.biases
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    b1, b2 = 0.9, 0.999
+    for t in range(1, epochs + 1):
+        acts = mlp._forward(X)
+        delta = (_sigmoid(acts[-1][:, 0]) - y)[:, None] / len(y)
+        grads_w, grads_b = [], []
+        for i in range(len(mlp.weights) - 1, -1, -1):
+            grads_w.insert(0, acts[i].T @ delta + l2 * mlp.weights[i])
+            grads_b.insert(0, delta.sum(axis=0))
+            if i:
+                delta = (delta @ mlp.weights[i].T) * (acts[i] > 0)
+        for j, (p, g) in enumerate(zip(params, grads_w + grads_b)):
+            m[j] = b1 * m[j] + (1 - b1) * g
+            v[j] = b2 * v[j] + (1 - b2) * g * g
+            p -= lr * (m[j] / (1 - b1 ** t)) / (np.sqrt(v[j] / (1 - b2 ** t)) + 1e-8)
+    return mlp
+
+
+class QuantizedMLP:
+    """
+    Int8 MLP with per-layer symmetric scales.
+
+    Layer i holds int8 weights W_q = round(W / w_scale[i]) and int32 biases
+    b_q = round(b / (in_scale[i] * w_scale[i])). Activations entering layer i
+    are int8 with scale in_scale[i] (taken from calibration data). The kernel
+    accumulates int8 x int8 products in int32, then rescales to the next
+    layer's int8 range with one float multiply per layer; only the final
+    logit is dequantized. Windows are processed as a batch.
+    """
+
+    def __init__(self, weights_q, biases_q, w_scales, in_scales, mean, std, spatial_filters=None):
+        self.weights_q = [np.asarray(w, dtype=np.int8) for w in weights_q]
+        self.biases_q = [np.asarray(b, dtype=np.int32) for b in biases_q]
+        self.w_scales = [float(s) for s in w_scales]
+        self.in_scales = [float(s) for s in in_scales]
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.spatial_filters = None if spatial_filters is None else np.asarray(spatial_filters, dtype=np.float64)
+        # widened once here instead of on every call
+        self._w32 = [w.astype(np.int32) for w in self.weights_q]
+
+    def features(self, covs):
+        return log_variance_features(covs, self.spatial_filters)
+
+    def _quantize_input(self, features):
+        x = (np.asarray(features, dtype=np.float32) - self.mean) / self.std
+        return np.clip(np.rint(x / self.in_scales[0]), -QMAX, QMAX).astype(np.int32)
+
+    def decision_function(self, features):
+        q = self._quantize_input(features)
+        last = len(self._w32) - 1
+        for i, (w, b) in enumerate(zip(self._w32, self.biases_q)):
+            acc = q @ w + b
+            scale = self.in_scales[i] * self.w_scales[i]
+            if i == last:
+                return acc[..., 0] * scale
+            acc = np.maximum(acc, 0)
+            q = np.minimum(np.rint(acc * (scale / self.in_scales[i + 1])), QMAX).astype(np.int32)
+
+    def predict_proba(self, features):
+        return _sigmoid(self.decision_function(features))
+
+    @property
+    def nbytes(self):
+        return sum(w.nbytes + b.nbytes for w, b in zip(self.weights_q, self.biases_q))
+
+    def export_payload(self):
+        arrays = {"clf.mean": self.mean, "clf.std": self.std}
+        for i, (w, b) in enumerate(zip(self.weights_q, self.biases_q)):
+            arrays[f"clf.w{i}"], arrays[f"clf.b{i}"] = w, b
+        if self.spatial_filters is not None:
+            arrays["clf.spatial_filters"] = self.spatial_filters
+        spec = {"kind": "mlp_int8", "n_layers": len(self.weights_q),
+                "w_scales": self.w_scales, "in_scales": self.in_scales}
+        return spec, arrays
+
+
+def quantize_mlp(mlp: MLP, calibration_features) -> QuantizedMLP:
+    """
+    Convert a float MLP to int8. Activation ranges are calibrated on
+    `calibration_features` (n, n_features), e.g. windows from recorded
+    sessions (see session_features).
+    """
+    acts = mlp._forward(np.asarray(calibration_features, dtype=np.float64))
+    in_scales, w_scales, weights_q, biases_q = [], [], [], []
+    for i, (w, b) in enumerate(zip(mlp.weights, mlp.biases)):
+        # 99.9th percentile rather than max, so one outlier window doesn't eat the range
+        a = np.abs(acts[i])
+        s_in = max(float(np.percentile(a, 99.9)), 1e-8) / QMAX
+        s_w = max(float(np.abs(w).max()), 1e-8) / QMAX
+        in_scales.append(s_in)
+        w_scales.append(s_w)
+        weights_q.append(np.clip(np.rint(w / s_w), -QMAX, QMAX).astype(np.int8))
+        biases_q.append(np.rint(b / (s_in * s_w)).astype(np.int32))
+    return QuantizedMLP(weights_q, biases_q, w_scales, in_scales, mlp.mean, mlp.std, mlp.spatial_filters)
+
+
+def load_payload(spec, arrays):
+    """Rebuild an MLP / QuantizedMLP from an exported model's arrays."""
+    n = spec["n_layers"]
+    weights = [arrays[f"clf.w{i}"] for i in range(n)]
+    biases = [arrays[f"clf.b{i}"] for i in range(n)]
+    sf = arrays.get("clf.spatial_filters")
+    if spec["kind"] == "mlp":
+        return MLP(weights, biases, arrays["clf.mean"], arrays["clf.std"], sf)
+    return QuantizedMLP(weights, biases, spec["w_scales"], spec["in_scales"],
+                        arrays["clf.mean"], arrays["clf.std"], sf)
+
+
+@dataclass
+class QuantizationReport:
+    float_accuracy: float
+    int8_accuracy: float
+    accuracy_delta: float      # int8 - float
+    agreement: float           # fraction of windows with the same decision
+    max_proba_error: float
+    float_us_per_window: float # batched
+    int8_us_per_window: float  # batched
+    int8_us_single: float      # one window at a time, as in the live loop
+    float_bytes: int
+    int8_bytes: int
+
+
+def _time_per_window(fn, X, repeat):
+    fn(X)
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - t) / (repeat * len(X)) * 1e6
+
+
+def evaluate_quantization(mlp: MLP, qmlp: QuantizedMLP, X, y, repeat=20) -> QuantizationReport:
+    """Accuracy delta, per-window latency and weight memory of int8 vs float."""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    pf, pq = mlp.predict_proba(X), qmlp.predict_proba(X)
+    acc_f = float(np.mean((pf >= 0.5) == y))
+    acc_q = float(np.mean((pq >= 0.5) == y))
+    single = X[:1]
+    t = time.perf_counter()
+    for _ in range(repeat * 10):
+        qmlp.predict_proba(single)
+    return QuantizationReport(
+        float_accuracy=acc_f,
+        int8_accuracy=acc_q,
+        accuracy_delta=acc_q - acc_f,
+        agreement=float(np.mean((pf >= 0.5) == (pq >= 0.5))),
+        max_proba_error=float(np.abs(pf - pq).max()),
+        float_us_per_window=_time_per_window(mlp.predict_proba, X, repeat),
+        int8_us_per_window=_time_per_window(qmlp.predict_proba, X, repeat),
+        int8_us_single=(time.perf_counter() - t) / (repeat * 10) * 1e6,
+        float_bytes=mlp.nbytes,
+        int8_bytes=qmlp.nbytes,
+    )
+
+
+def session_features(paths, sampling_rate, bands, window_s=2.0, step_s=0.25,
+                     spatial_filters=None, notch=60.0, order=4):
+    """
+    Log-variance features of sliding windows over recorded .npz sessions
+    (as written by save_npz_to_box), for training and calibration.
+    Returns (X, y) with one row per window, labelled with its trial's label.
+    """
+    from .inference import window_covariances
+    from .processing import filter_offline
+
+    window = int(round(window_s * sampling_rate))
+    step = max(1, int(round(step_s * sampling_rate)))
+    X, y = [], []
+    for path in paths:
+        with np.load(path) as npz:
+            data, labels = npz["data"], npz["labels"]
+        filtered = filter_offline(data, sampling_rate, bands, order=order, notch=notch)
+        covs = window_covariances(filtered, window, step)   # (trials, windows, bands, ch, ch)
+        feats = log_variance_features(covs, spatial_filters)
+        X.append(feats.reshape(-1, feats.shape[-1]))
+        y.append(np.repeat(labels, feats.shape[1]))
+    return np.concatenate(X), np.concatenate(y)
+
+
+def train_session_mlp(paths, sampling_rate, bands, hidden=(16,), window_s=2.0, step_s=0.25,
+                      notch=60.0, order=4, holdout=0.2, epochs=400, seed=0):
+    """
+    Train, quantize and report in one go, for the export path: fit an MLP
+    on windows of recorded sessions, calibrate the int8 version on the
+    same training windows, and evaluate both on the held-out last
+    `holdout` fraction of windows (the final trials).
+    Returns (mlp, qmlp, QuantizationReport).
+    """
+    X, y = session_features(paths, sampling_rate, bands, window_s, step_s, notch=notch, order=order)
+    split = int(round(len(y) * (1 - holdout)))
+    if split == 0 or split == len(y) or len(np.unique(y[:split])) < 2:
+        raise ValueError(f"need both classes and more windows to train (got {len(y)} windows)")
+    mlp = fit_mlp(X[:split], y[:split], hidden=hidden, epochs=epochs, seed=seed)
+    qmlp = quantize_mlp(mlp, X[:split])
+    return mlp, qmlp, evaluate_quantization(mlp, qmlp, X[split:], y[split:])
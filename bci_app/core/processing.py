@@ -0,0 +1,201 @@
+# bci_app/core/processing.py
+
+import numpy as np
+
+from . import instrumentation as instr
+
+# scipy.signal dominates headless start-up, so it is imported on first use
+_signal = None
+
+# mu (8-12 Hz) and beta (12-30 Hz) sub-bands used for motor imagery
+DEFAULT_BANDS = ((8, 12), (12, 16), (16, 20), (20, 24), (24, 30))
+
+
+def _scipy_signal():
+    """scipy.signal, imported on first use; None when scipy is not installed."""
+    global _signal
+    if _signal is None:
+        try:
+            from scipy import signal
+        except ImportError:  # embedded targets: filter with exported coefficients only
+            signal = False
+        _signal = signal
+    return _signal or None
+
+
+def design_filter_bank(sampling_rate, bands=DEFAULT_BANDS, order=4, notch=60.0, notch_q=30.0):
+    """
+    Design the SOS coefficients of the filter bank.
+    Returns (notch_sos, band_sos):
+    - notch_sos: (n_sections, 6) array, or None if notch is disabled
+    - band_sos:  (n_bands, n_sections, 6) array of Butterworth band-passes
+    """
+    signal = _scipy_signal()
+    if signal is None:
+        raise ImportError("scipy is required to design filters; load exported coefficients instead")
+    notch_sos = None
+    if notch:
+        b, a = signal.iirnotch(notch, notch_q, fs=sampling_rate)
+        notch_sos = signal.tf2sos(b, a)
+    band_sos = np.stack([
+        signal.butter(order, (lo, hi), btype="bandpass", output="sos", fs=sampling_rate)
+        for lo, hi in bands
+    ])
+    return notch_sos, band_sos
+
+
+def sosfilt_zi(sos):
+    """Steady-state SOS filter state for a unit step input (scipy's sosfilt_zi)."""
+    signal = _scipy_signal()
+    if signal is not None:
+        return signal.sosfilt_zi(sos)
+    zi = np.empty((sos.shape[0], 2))
+    scale = 1.0
+    for s, (b0, b1, b2, _, a1, a2) in enumerate(sos / sos[:, 3:4]):
+        # constant input `scale` through one section: output scale * dc_gain
+        g = (b0 + b1 + b2) / (1.0 + a1 + a2)
+        zi[s] = scale * (b1 + b2 - (a1 + a2) * g), scale * (b2 - a2 * g)
+        scale *= g
+    return zi
+
+
+def sosfilt(sos, x, zi):
+    """
+    Filter the last axis of `x` with SOS sections, starting from state `zi`
+    of shape (n_sections, ..., 2). Returns (y, zf).
+
+    Uses scipy's compiled kernel when scipy is installed (importing it on
+    the first call); otherwise falls back to a numpy transposed direct-form
+    II loop that is vectorized over all leading axes (channels) and
+    iterates over samples.
+    """
+    signal = _scipy_signal()
+    if signal is not None:
+        return signal.sosfilt(sos, x, axis=-1, zi=zi)
+    zf = np.array(zi, dtype=np.float64)
+    y = np.array(x, dtype=np.float64)
+    for s, (b0, b1, b2, _, a1, a2) in enumerate(sos / sos[:, 3:4]):
+        z0, z1 = zf[s, ..., 0], zf[s, ..., 1]
+        for k in range(y.shape[-1]):
+            xk = y[..., k]
+            yk = b0 * xk + z0
+            z0 = b1 * xk - a1 * yk + z1
+            z1 = b2 * xk - a2 * yk
+            y[..., k] = yk
+        zf[s, ..., 0], zf[s, ..., 1] = z0, z1
+    return y, zf
+
+
+class StreamingFilterBank:
+    """
+    Causal notch + band-pass filter bank that carries filter state across
+    chunks, so a stream filtered chunk by chunk is identical to filtering
+    the whole recording in one go.
+
+    `process` takes a (n_channels, n) chunk and returns
+    (n_bands, n_channels, n): each stage runs over all channels at once
+    (one `sosfilt` call for the notch, one per sub-band).
+
+    Tolerance: the streamed output matches `filter_offline(..., zero_phase=False)`
+    to float64 round-off (< 1e-9 relative). Being causal, it is not
+    sample-for-sample equal to the zero-phase `sosfiltfilt` output. For
+    components well inside a sub-band, per-epoch band power (log-variance of
+    a 2 s epoch) agrees with it to < 0.01 (natural-log units) once the initial
+    transient has passed; near the band edges and for broadband noise,
+    `sosfiltfilt` squares the magnitude response and reads up to 3 dB lower.
+    """
+
+    def __init__(self, sampling_rate, n_channels, bands=DEFAULT_BANDS,
+                 order=4, notch=60.0, notch_q=30.0, notch_sos=None, band_sos=None):
+        self.sampling_rate = sampling_rate
+        self.n_channels = n_channels
+        self.bands = tuple(tuple(b) for b in bands)
+        self.order = order
+        self.notch = notch
+        self.notch_q = notch_q
+        if band_sos is None:
+            notch_sos, band_sos = design_filter_bank(
+                sampling_rate, self.bands, order, notch, notch_q
+            )
+        # precomputed coefficients (e.g. from an exported model) need no scipy;
+        # copied because scipy's sosfilt rejects read-only (memory-mapped) input
+        self.notch_sos = None if notch_sos is None else np.array(notch_sos, dtype=np.float64)
+        self.band_sos = np.array(band_sos, dtype=np.float64)
+        # load the compiled kernel now, so its import lands in building the
+        # runtime (before it reports ready) and not in the first chunk
+        _scipy_signal()
+        self.reset()
+
+    @classmethod
+    def from_config(cls, cfg, sampling_rate, n_channels):
+        """Build from the `processing` section of a session config."""
+        cfg = cfg or {}
+        return cls(
+            sampling_rate, n_channels,
+            bands=cfg.get("bands", DEFAULT_BANDS),
+            order=cfg.get("order", 4),
+            notch=cfg.get("notch", 60.0),
+            notch_q=cfg.get("notch_q", 30.0),
+        )
+
+    @property
+    def n_bands(self):
+        return len(self.bands)
+
+    def reset(self):
+        """Forget the filter state; the next chunk re-initialises it."""
+        self._zi_notch = None
+        self._zi_bands = None
+
+    def _init_state(self, x0):
+        # steady state for a constant input equal to the first sample, so the
+        # electrode DC offset does not ring through the band-passes
+        if self.notch_sos is not None:
+            zi = sosfilt_zi(self.notch_sos)
+            self._zi_notch = zi[:, None, :] * x0[None, :, None]
+        self._zi_bands = np.stack([
+            sosfilt_zi(sos)[:, None, :] * x0[None, :, None]
+            for sos in self.band_sos
+        ])
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Filter a (n_channels, n) chunk. Returns (n_bands, n_channels, n)."""
+        t0 = instr.start()
+        x = np.asarray(chunk, dtype=np.float64)
+        if x.shape[1] == 0:
+            return np.zeros((self.n_bands, self.n_channels, 0))
+        if self._zi_bands is None:
+            self._init_state(x[:, 0])
+        if self.notch_sos is not None:
+            x, self._zi_notch = sosfilt(self.notch_sos, x, self._zi_notch)
+        out = np.empty((self.n_bands, self.n_channels, x.shape[1]))
+        for i, sos in enumerate(self.band_sos):
+            out[i], self._zi_bands[i] = sosfilt(sos, x, self._zi_bands[i])
+        instr.stop("filter.process", t0)
+        return out
+
+
+def filter_offline(data, sampling_rate, bands=DEFAULT_BANDS, order=4,
+                   notch=60.0, notch_q=30.0, zero_phase=False):
+    """
+    Filter a whole recording. `data` is (..., n_channels, n_samples);
+    returns (..., n_bands, n_channels, n_samples).
+
+    With zero_phase=False this is exactly what StreamingFilterBank produces
+    online (use it for training so features match the runtime); with
+    zero_phase=True it applies `sosfiltfilt` instead.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if not zero_phase:
+        # every (trial, channel) row is an independent stream
+        lead, (n_channels, n_samples) = data.shape[:-2], data.shape[-2:]
+        rows = data.reshape(-1, n_samples)
+        fb = StreamingFilterBank(sampling_rate, rows.shape[0], bands, order, notch, notch_q)
+        out = fb.process(rows).reshape((len(bands),) + lead + (n_channels, n_samples))
+        return np.moveaxis(out, 0, -3)
+
+    notch_sos, band_sos = design_filter_bank(sampling_rate, bands, order, notch, notch_q)
+    signal = _scipy_signal()
+    if notch_sos is not None:
+        data = signal.sosfiltfilt(notch_sos, data, axis=-1)
+    return np.stack([signal.sosfiltfilt(sos, data, axis=-1) for sos in band_sos], axis=-3)
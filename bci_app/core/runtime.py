@@ -0,0 +1,142 @@
+# bci_app/core/runtime.py
+"""
+Headless acquisition -> filter -> classify -> toggle loop.
+
+Only depends on numpy/scipy and the bci_app.hw / bci_app.core runtime
+modules, never on Qt, so it can run as a daemon on an embedded target.
+"""
+
+import time
+
+from .export import ExportedModel, load_model_file
+from .fsm import ToggleFSM
+from .inference import SlidingWindowEngine
+from .processing import StreamingFilterBank
+
+
+def load_model(path) -> ExportedModel:
+    """Load a model exported with bci_app.core.export.export_model."""
+    return load_model_file(path)
+
+
+class InferenceRuntime:
+    """
+    Drives a board through the sliding-window engine and the toggle FSM.
+
+    - channels: board rows fed to the engine (the model's channel map);
+      None passes every row through
+    - on_result(WindowResult) is called for every hop
+    - on_toggle(ToggleEvent) is called whenever the FSM flips state
+    """
+
+    def __init__(self, board, engine: SlidingWindowEngine, fsm: ToggleFSM,
+                 chunk_s=0.02, buffer_s=10.0, channels=None, on_result=None, on_toggle=None):
+        self.board = board
+        if channels is not None and list(channels) == list(range(board.n_channels)):
+            channels = None
+        self.channels = channels
+        self.engine = engine
+        self.fsm = fsm
+        self.chunk = max(1, int(round(chunk_s * board.sampling_rate)))
+        self.buffer = board.create_ring_buffer(seconds=buffer_s)
+        self.on_result = on_result
+        self.on_toggle = on_toggle
+        self.windows = 0
+        self.toggles = 0
+        self._running = False
+
+    def stop(self):
+        self._running = False
+
+    def step(self):
+        """Read one chunk and run it through the pipeline. Returns the toggle events."""
+        prev = self.buffer.head
+        head = self.board.read_into(self.buffer, self.chunk)
+        arrived = None if self.board.wall_clock_timestamps else time.time()
+        events = []
+        if head == prev:
+            return events
+        chunk = self.buffer.view(prev, head)
+        if self.channels is not None:
+            chunk = chunk[self.channels]
+        results = self.engine.push(chunk, self.buffer.timestamps(prev, head), arrived)
+        for r in results:
+            self.windows += 1
+            if self.on_result is not None:
+                self.on_result(r)
+            if r.proba is None:
+                continue
+            ev = self.fsm.update(r.proba, r.sample, r.trail)
+            if ev is not None:
+                self.toggles += 1
+                events.append(ev)
+                if self.on_toggle is not None:
+                    self.on_toggle(ev)
+        return events
+
+    def run(self, duration=None):
+        """Run until stop(), `duration` seconds, or the end of a replayed recording."""
+        self.board.connect()
+        self.board.start_stream()
+        self.buffer.reset()
+        self.engine.reset()
+        self._running = True
+        t_end = None if duration is None else time.perf_counter() + duration
+        try:
+            while self._running:
+                self.step()
+                if getattr(self.board, "finished", False):
+                    break
+                if t_end is not None and time.perf_counter() >= t_end:
+                    break
+        finally:
+            self._running = False
+            self.board.stop_stream()
+            self.board.disconnect()
+
+    def summary(self) -> dict:
+        return {
+            "windows": self.windows,
+            "toggles": self.toggles,
+            "state": self.fsm.state,
+            "latency_s": self.fsm.latency_summary(),
+        }
+
+
+def build_components(cfg, board, model=None):
+    """
+    Engine, FSM and the settings around them for `board`: returns
+    (engine, fsm, channels, chunk_s).
+
+    `model` is an ExportedModel (its filter coefficients, channel map and
+    FSM/inference settings win over the config), a bare classifier, or None
+    to only extract features. Anything the model does not carry comes from
+    the session config's `processing`, `train` and `infer` sections.
+    """
+    infer_cfg = dict(cfg.get("infer", {}))
+    fsm_cfg = dict(cfg.get("train", {}))
+    channels = None
+    if isinstance(model, ExportedModel):
+        if model.sampling_rate != board.sampling_rate:
+            raise ValueError(f"model expects {model.sampling_rate} Hz, board runs at {board.sampling_rate} Hz")
+        fb = model.build_filter_bank()
+        infer_cfg.update(model.infer_config)
+        fsm_cfg.update(model.fsm_config)
+        channels = model.channels
+        classifier = model.classifier
+    else:
+        fb = StreamingFilterBank.from_config(cfg.get("processing"), board.sampling_rate, board.n_channels)
+        classifier = model
+    engine = SlidingWindowEngine(
+        fb,
+        window_s=infer_cfg.get("window_s", 2.0),
+        step_s=infer_cfg.get("step_s", 0.04),
+        classifier=classifier,
+    )
+    return engine, ToggleFSM.from_config(fsm_cfg), channels, infer_cfg.get("chunk_s", 0.02)
+
+
+def build_runtime(cfg, board, model=None, **kwargs) -> InferenceRuntime:
+    """Wire a runtime for `board`; see build_components for how `model` is used."""
+    engine, fsm, channels, chunk_s = build_components(cfg, board, model)
+    return InferenceRuntime(board, engine, fsm, chunk_s=chunk_s, channels=channels, **kwargs)
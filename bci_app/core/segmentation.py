@@ -0,0 +1,54 @@
+# bci_app/core/segmentation.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Marker:
+    """A cue on the acquisition sample clock."""
+    sample: int        # absolute sample index of the cue onset
+    label: object      # class label (0 = REST, 1 = SWITCH) or None
+    name: str = ""
+    duration: int = 0  # epoch length in samples
+
+
+def cue_sample(ring) -> int:
+    """
+    Sample index of a cue shown now: the acquisition counter of `ring`
+    (the next sample to arrive).
+
+    Counting samples instead of extrapolating from time.time() keeps cues
+    on the stream's own clock, so markers stay right for accelerated,
+    free-running and replayed boards. A cue can lag the screen by up to
+    one read chunk.
+    """
+    return ring.head
+
+
+def cut_epochs(data: np.ndarray, markers, n_samples: int = None, offset: int = 0):
+    """
+    Cut epochs out of a continuous (n_channels, n) recording by sample index.
+
+    - markers: iterable of Marker (or dicts with the same keys)
+    - n_samples: epoch length; defaults to the shortest marker duration
+    - offset: absolute sample index of data[:, 0]
+
+    Markers whose epoch is not fully inside `data` are skipped.
+    Returns (epochs, labels, kept_markers), epochs shaped (n_trials, n_channels, n_samples).
+    """
+    markers = [m if isinstance(m, Marker) else Marker(**m) for m in markers]
+    if n_samples is None:
+        durations = [m.duration for m in markers if m.duration > 0]
+        n_samples = min(durations) if durations else 0
+    kept = [m for m in markers
+            if n_samples > 0 and m.sample >= offset and m.sample - offset + n_samples <= data.shape[1]]
+    if not kept:
+        return np.zeros((0, data.shape[0], n_samples), dtype=data.dtype), np.zeros(0, dtype=int), []
+    starts = np.array([m.sample - offset for m in kept])
+    # one gather for all epochs: (n_trials, n_samples) sample indices
+    idx = starts[:, None] + np.arange(n_samples)[None, :]
+    epochs = np.moveaxis(data[:, idx], 1, 0)
+    return epochs, np.array([m.label for m in kept]), kept
+
@@ -0,0 +1,367 @@
+# bci_app/core/session.py
+"""
+Threaded session pipeline.
+
+    acquire ──coalesce──> dsp ──block──> fsm ──> on_toggle, on_window
+       │                   └──drop_oldest──> monitor ──> on_result (GUI)
+       └──coalesce──> storage ──> RawSessionRecorder
+
+Every stage runs on its own thread and stages are connected by
+BoundedQueues with an explicit overflow policy:
+
+- block:       the producer waits (backpressure); used only on the
+               classification path, dsp -> fsm
+- drop_oldest: the oldest item is discarded; for consumers that only care
+               about the latest state (GUI feedback)
+- coalesce:    the new item is merged into the newest queued one
+
+Acquisition does not pass sample arrays around: it writes into the ring
+buffer and queues Spans (absolute sample ranges). Coalescing two spans is
+just widening the range, so a slow storage stage loses nothing as long as
+it stays within the ring buffer's capacity (overruns are counted), and
+acquisition never waits on anything but the board.
+
+Filtering, feature extraction and classification run together in the dsp
+stage (SlidingWindowEngine): they share the filter/covariance state and
+take tens of microseconds per hop, so splitting them across threads
+would only add hand-off latency.
+
+on_result sees only the newest result of each batch and may miss
+batches; consumers that need every output (an LSL outputs stream) use
+on_window instead, which the fsm stage calls for every result and which
+must therefore be cheap and never block.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from . import instrumentation as instr
+from .runtime import build_components
+
+POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+class QueueClosed(Exception):
+    pass
+
+
+@dataclass
+class Span:
+    start: int   # absolute sample indices into the session's ring buffer
+    stop: int
+    arrived: float = None   # wall-clock read time, for boards not stamping on time.time()
+
+    def merge(self, later: "Span") -> "Span":
+        return Span(self.start, later.stop, later.arrived)
+
+
+def _merge_spans(older, newer):
+    return older.merge(newer)
+
+
+class BoundedQueue:
+    """
+    Thread-safe FIFO of at most `maxsize` items with an overflow policy
+    (see module docstring). For "coalesce", `merge(older, newer)` combines
+    the newest queued item with the incoming one (default: keep the newer).
+    """
+
+    def __init__(self, name, maxsize=8, policy="block", merge=None):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.merge = merge or (lambda older, newer: newer)
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.puts = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.blocked_s = 0.0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item, timeout=None) -> bool:
+        """Enqueue `item`; only a blocking queue can wait (and time out, returning False)."""
+        with self._cond:
+            if self._closed:
+                raise QueueClosed(self.name)
+            if len(self._items) >= self.maxsize:
+                if self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                    instr.count(f"queue.{self.name}.dropped")
+                elif self.policy == "coalesce":
+                    self._items[-1] = self.merge(self._items[-1], item)
+                    self.coalesced += 1
+                    self.puts += 1
+                    return True
+                else:
+                    t = time.perf_counter()
+                    ok = self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed, timeout)
+                    self.blocked_s += time.perf_counter() - t
+                    if self._closed:
+                        raise QueueClosed(self.name)
+                    if not ok:
+                        return False
+            self._items.append(item)
+            self.puts += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Dequeue the oldest item. Raises QueueClosed once closed and drained, TimeoutError on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                raise TimeoutError(self.name)
+            if not self._items:
+                raise QueueClosed(self.name)
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Wake everyone; consumers drain what is left, producers get QueueClosed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "maxsize": self.maxsize,
+            "puts": self.puts,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "blocked_s": round(self.blocked_s, 6),
+        }
+
+
+class Stage(threading.Thread):
+    """
+    Worker thread: `fn(item)` for every item of `inbox`, with a non-None
+    result put on every queue in `outputs`. With inbox=None the stage is a
+    source and calls `fn()` in a loop until stopped.
+    """
+
+    def __init__(self, name, fn, inbox=None, outputs=()):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.inbox = inbox
+        self.outputs = list(outputs)
+        self.items = 0
+        self.busy_s = 0.0
+        self.max_s = 0.0
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                if self.inbox is None:
+                    item = None
+                else:
+                    try:
+                        item = self.inbox.get(timeout=0.1)
+                    except TimeoutError:
+                        continue
+                t = time.perf_counter()
+                out = self.fn() if self.inbox is None else self.fn(item)
+                dt = time.perf_counter() - t
+                self.items += 1
+                self.busy_s += dt
+                self.max_s = max(self.max_s, dt)
+                if out is not None:
+                    for q in self.outputs:
+                        q.put(out)
+        except QueueClosed:
+            pass
+        except Exception as e:
+            self.error = e
+            print(f"[Session] Stage {self.name} failed: {e!r}")
+        finally:
+            for q in self.outputs:
+                q.close()
+
+    def stats(self) -> dict:
+        return {
+            "items": self.items,
+            "busy_s": round(self.busy_s, 6),
+            "mean_ms": round(1e3 * self.busy_s / self.items, 4) if self.items else 0.0,
+            "max_ms": round(1e3 * self.max_s, 4),
+            "alive": self.is_alive(),
+            "error": None if self.error is None else repr(self.error),
+        }
+
+
+class Session:
+    """
+    Acquisition -> dsp -> FSM on worker threads, plus optional storage
+    (a RawSessionRecorder) and monitor (on_result, e.g. a Qt signal emit)
+    side branches that can never slow the classification path.
+    on_window(WindowResult) runs on the fsm thread for every hop, after
+    the FSM update, for lossless non-blocking publishers.
+
+    queue_sizes overrides the default maxsize of "dsp", "fsm", "storage"
+    and "monitor".
+    """
+
+    # coalescing queues stay short: when a consumer lags, spans merge instead of piling up
+    QUEUE_SIZES = {"dsp": 8, "fsm": 16, "storage": 4, "monitor": 4}
+
+    def __init__(self, board, engine, fsm, recorder=None, chunk_s=0.02, buffer_s=30.0,
+                 channels=None, on_result=None, on_toggle=None, on_window=None, queue_sizes=None):
+        self.board = board
+        self.engine = engine
+        self.fsm = fsm
+        self.recorder = recorder
+        if channels is not None and list(channels) == list(range(board.n_channels)):
+            channels = None
+        self.channels = channels
+        self.chunk = max(1, int(round(chunk_s * board.sampling_rate)))
+        self.buffer = board.create_ring_buffer(seconds=buffer_s)
+        self.on_result = on_result
+        self.on_toggle = on_toggle
+        self.on_window = on_window
+        self.windows = 0
+        self.toggles = 0
+        self.overruns = {"dsp": 0, "storage": 0}
+        self.finished = threading.Event()
+
+        sizes = dict(self.QUEUE_SIZES, **(queue_sizes or {}))
+        self.queues = {"dsp": BoundedQueue("dsp", sizes["dsp"], "coalesce", _merge_spans),
+                       "fsm": BoundedQueue("fsm", sizes["fsm"], "block")}
+        acquire_out = [self.queues["dsp"]]
+        dsp_out = [self.queues["fsm"]]
+        if recorder is not None:
+            self.queues["storage"] = BoundedQueue("storage", sizes["storage"], "coalesce", _merge_spans)
+            acquire_out.append(self.queues["storage"])
+        if on_result is not None:
+            self.queues["monitor"] = BoundedQueue("monitor", sizes["monitor"], "drop_oldest")
+            dsp_out.append(self.queues["monitor"])
+
+        self.stages = {
+            "acquire": Stage("acquire", self._acquire, None, acquire_out),
+            "dsp": Stage("dsp", self._dsp, self.queues["dsp"], dsp_out),
+            "fsm": Stage("fsm", self._fsm, self.queues["fsm"]),
+        }
+        if recorder is not None:
+            self.stages["storage"] = Stage("storage", self._store, self.queues["storage"])
+        if on_result is not None:
+            self.stages["monitor"] = Stage("monitor", self._monitor, self.queues["monitor"])
+
+    # -- stage functions ---------------------------------------------------
+
+    def _acquire(self):
+        prev = self.buffer.head
+        head = self.board.read_into(self.buffer, self.chunk)
+        arrived = None if self.board.wall_clock_timestamps else time.time()
+        if getattr(self.board, "finished", False):
+            self.stages["acquire"].stop()
+            self.finished.set()
+        return Span(prev, head, arrived) if head > prev else None
+
+    def _span(self, span, name):
+        # a consumer that fell further behind than the ring holds lost samples
+        if span.start < self.buffer.tail:
+            self.overruns[name] += self.buffer.tail - span.start
+            instr.count(f"session.{name}_overrun_samples", self.buffer.tail - span.start)
+            span = Span(self.buffer.tail, span.stop, span.arrived)
+        return span
+
+    def _dsp(self, span):
+        span = self._span(span, "dsp")
+        chunk = self.buffer.view(span.start, span.stop)
+        if self.channels is not None:
+            chunk = chunk[self.channels]
+        results = self.engine.push(chunk, self.buffer.timestamps(span.start, span.stop), span.arrived)
+        self.windows += len(results)
+        return results or None
+
+    def _fsm(self, results):
+        for r in results:
+            if r.proba is not None:
+                ev = self.fsm.update(r.proba, r.sample, r.trail)
+                if ev is not None:
+                    self.toggles += 1
+                    if self.on_toggle is not None:
+                        self.on_toggle(ev)
+            if self.on_window is not None:
+                self.on_window(r)
+
+    def _store(self, span):
+        span = self._span(span, "storage")
+        self.recorder.append(self.buffer.view(span.start, span.stop),
+                             self.buffer.timestamps(span.start, span.stop))
+
+    def _monitor(self, results):
+        self.on_result(results[-1])
+
+    # -- control -----------------------------------------------------------
+
+    def start(self):
+        self.board.connect()
+        self.board.start_stream()
+        self.buffer.reset()
+        self.engine.reset()
+        # consumers first, so nothing queued is ever waiting on a missing thread
+        for stage in reversed(list(self.stages.values())):
+            stage.start()
+
+    def stop(self):
+        """Stop acquiring; safe to call from any thread or a signal handler."""
+        self.stages["acquire"].stop()
+        self.finished.set()
+
+    def join(self, timeout=5.0):
+        """Wait for every stage to drain its queue, then release the board."""
+        for stage in self.stages.values():
+            stage.join(timeout)
+        self.board.stop_stream()
+        self.board.disconnect()
+
+    def run(self, duration=None):
+        """Start, wait for `duration` seconds, stop() or the end of a replay, then drain."""
+        self.start()
+        try:
+            self.finished.wait(duration)
+        finally:
+            self.stop()
+            self.join()
+
+    def queue_depths(self) -> dict:
+        return {name: len(q) for name, q in self.queues.items()}
+
+    def stats(self) -> dict:
+        return {
+            "queues": {name: q.stats() for name, q in self.queues.items()},
+            "stages": {name: s.stats() for name, s in self.stages.items()},
+            "overruns": dict(self.overruns),
+        }
+
+    def summary(self) -> dict:
+        return {
+            "windows": self.windows,
+            "toggles": self.toggles,
+            "state": self.fsm.state,
+            "latency_s": self.fsm.latency_summary(),
+            **self.stats(),
+        }
+
+
+def build_session(cfg, board, model=None, recorder=None, **kwargs) -> Session:
+    """Threaded counterpart of runtime.build_runtime."""
+    engine, fsm, channels, chunk_s = build_components(cfg, board, model)
+    return Session(board, engine, fsm, recorder=recorder, chunk_s=chunk_s, channels=channels, **kwargs)
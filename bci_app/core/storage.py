@@ -2,11 +2,41 @@
 
 from pathlib import Path
 import os
+import json
+import queue
+import shutil
+import threading
+import time
 import numpy as np
 import pickle
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from . import instrumentation as instr
+from .catalog import SessionCatalog
+from .segmentation import cut_epochs
 
 BOX_ROOT = "Prosthetic-MI-BCI-Data"
+# Local staging area, outside any sync folder (see StorageService)
+SPOOL_DIR = Path.home() / ".prosthetic-mi-bci" / "spool"
+
+_stamp_lock = threading.Lock()
+_last_stamp = None
+
+
+def session_stamp() -> str:
+    """
+    Time stamp for session file names, YYYYmmdd_HHMMSS_ffffff. Unique
+    within the process (bumped by 1 µs on a tie), so two saves in the same
+    second never share a name and silently replace each other.
+    """
+    global _last_stamp
+    with _stamp_lock:
+        now = datetime.now()
+        if _last_stamp is not None and now <= _last_stamp:
+            now = _last_stamp + timedelta(microseconds=1)
+        _last_stamp = now
+    return now.strftime("%Y%m%d_%H%M%S_%f")
+
 
 def get_box_drive_path():
     base_path = Path.home() / "Box"
@@ -29,20 +59,30 @@ def ensure_box_subfolder(*subfolders):
             folder.mkdir(parents=True)
     return folder
 
-def save_npz_to_box(data, labels, user_name, kind="training"):
+def open_box_catalog():
+    """The session catalog in the Box data root (see bci_app.core.catalog)."""
+    return SessionCatalog(ensure_box_subfolder())
+
+
+def save_npz_to_box(data, labels, user_name, kind="training", sampling_rate=None, raw_dir=None):
     """
     Save a labeled dataset to Box as a compressed .npz file.
     - data: numpy array
     - labels: numpy array
     - user_name: str (will create a subfolder for each user)
     - kind: str (e.g., 'training', 'test')
+    - sampling_rate, raw_dir: recorded in the session catalog
     """
     save_dir = ensure_box_subfolder(user_name, kind)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    fname = f"eegdata_{ts}.npz"
+    fname = f"eegdata_{session_stamp()}.npz"
     save_path = save_dir / fname
     np.savez_compressed(save_path, data=data, labels=labels)
     print(f"Saved EEG data to Box: {save_path}")
+    # the file is saved either way; a catalog miss is picked up by scan()
+    try:
+        open_box_catalog().register(save_path, user_name, kind, sampling_rate, labels, raw_dir)
+    except Exception as e:
+        print(f"[Catalog] Could not register {save_path}: {e}")
     return str(save_path)
 
 def save_pickle_to_box(obj, user_name, kind="training"):
@@ -57,3 +97,533 @@ def save_pickle_to_box(obj, user_name, kind="training"):
         pickle.dump(obj, f)
     print(f"Saved pickle to Box: {save_path}")
     return str(save_path)
+
+RAW_HEADER = "header.json"
+RAW_SAMPLES = "samples.f32"
+RAW_TIMESTAMPS = "timestamps.f64"
+RAW_EVENTS = "events.csv"
+# held locked by a live RawSessionRecorder; the OS drops the lock if the process dies
+RAW_LOCK = ".recording"
+
+
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock on open file `f`; False if another handle holds it."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def is_recording(directory, grace_s=60.0) -> bool:
+    """
+    Whether a RawSessionRecorder (in any process) is still writing to
+    `directory`. Directories without a lock file (a recorder just starting,
+    or one from before locks existed) count as live until nothing in them
+    has changed for `grace_s` seconds.
+    """
+    directory = Path(directory)
+    lock = directory / RAW_LOCK
+    if lock.exists():
+        with open(lock, "a+") as f:
+            if not _try_lock(f):
+                return True
+            _unlock(f)
+        return False
+    mtimes = [p.stat().st_mtime for p in directory.iterdir()] + [directory.stat().st_mtime]
+    return time.time() - max(mtimes) < grace_s
+
+
+def new_raw_session_dir(user_name, kind="training"):
+    """
+    Returns a fresh (not yet created) directory path for a raw recording
+    inside the user's Box folder, e.g. .../subject1/training/raw_20250101_120000_000000
+    """
+    save_dir = ensure_box_subfolder(user_name, kind)
+    return save_dir / f"raw_{session_stamp()}"
+
+
+class RawSessionRecorder:
+    """
+    Streaming, append-only recorder for continuous EEG plus events.
+
+    A session is a directory holding:
+    - header.json     : n_channels, sampling_rate, dtype and free-form metadata
+    - samples.f32     : little-endian float32, sample-major (n_samples, n_channels)
+    - timestamps.f64  : little-endian float64, one per sample
+    - events.csv      : sample,duration,label,name (one line per event)
+
+    Every file is only ever appended to, so a session cut short by a crash
+    is still readable up to the last flushed sample (see `open_raw_session`).
+    While open, the recorder holds a lock on `.recording` in the directory,
+    so other processes can tell a live session from a crashed one
+    (`is_recording`).
+    Chunks are handed to a background writer thread through a bounded queue:
+    memory stays bounded at `max_pending` chunks and `append` blocks (applies
+    backpressure) only if the disk falls that far behind.
+    """
+
+    def __init__(self, directory, n_channels: int, sampling_rate: int,
+                 max_pending: int = 64, metadata: dict = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = open(self.directory / RAW_LOCK, "a+")
+        if not _try_lock(self._lock):
+            self._lock.close()
+            raise FileExistsError(f"{self.directory} is already being recorded")
+        self._lock.write(f"{os.getpid()}\n")
+        self._lock.flush()
+        self.n_channels = n_channels
+        self.sampling_rate = sampling_rate
+        self.n_samples = 0
+
+        header = {
+            "n_channels": n_channels,
+            "sampling_rate": sampling_rate,
+            "dtype": "<f4",
+            "layout": "sample-major",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "metadata": metadata or {},
+        }
+        with open(self.directory / RAW_HEADER, "w") as f:
+            json.dump(header, f, indent=2)
+
+        self._samples = open(self.directory / RAW_SAMPLES, "ab")
+        self._timestamps = open(self.directory / RAW_TIMESTAMPS, "ab")
+        self._events = open(self.directory / RAW_EVENTS, "a")
+        if self._events.tell() == 0:
+            self._events.write("sample,duration,label,name\n")
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._writer = threading.Thread(target=self._run, name="RawSessionWriter", daemon=True)
+        self._writer.start()
+
+    def append(self, data: np.ndarray, timestamps: np.ndarray = None):
+        """Queue a (n_channels, n) chunk for writing. The chunk is copied."""
+        if self._error is not None:
+            raise self._error
+        n = data.shape[1]
+        if timestamps is None:
+            timestamps = np.full(n, np.nan)
+        # transpose to sample-major while copying, so the writer can dump raw bytes
+        block = np.ascontiguousarray(data.T, dtype="<f4")
+        self._queue.put(("samples", block, np.asarray(timestamps, dtype="<f8").copy()))
+        self.n_samples += n
+
+    def add_event(self, sample: int, label, name: str = "", duration: int = 0):
+        """Record an event (e.g. a cue onset) at an absolute sample index."""
+        self._queue.put(("event", f"{int(sample)},{int(duration)},{label},{name}\n", None))
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self):
+        """Flush and stop the writer thread. Safe to call more than once."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        for f in (self._samples, self._timestamps, self._events):
+            if not f.closed:
+                f.close()
+        # only now, with everything on disk, may the session be picked up;
+        # the (unlocked) file stays so the directory reads as finished
+        if not self._lock.closed:
+            _unlock(self._lock)
+            self._lock.close()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                kind, payload, extra = item
+                if kind == "samples":
+                    t0 = instr.start()
+                    self._samples.write(payload.tobytes())
+                    self._timestamps.write(extra.tobytes())
+                    instr.stop("storage.write", t0)
+                    instr.count("storage.samples", len(extra))
+                else:
+                    self._events.write(payload)
+                # flush once the queue is drained, not after every chunk
+                if self._queue.empty():
+                    for f in (self._samples, self._timestamps, self._events):
+                        f.flush()
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+
+class RawSession:
+    """Read-only, memory-mapped view of a session written by RawSessionRecorder."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / RAW_HEADER) as f:
+            self.header = json.load(f)
+        self.n_channels = self.header["n_channels"]
+        self.sampling_rate = self.header["sampling_rate"]
+
+        samples_path = self.directory / RAW_SAMPLES
+        ts_path = self.directory / RAW_TIMESTAMPS
+        # ignore a partially written trailing sample left by a crash
+        n = min(os.path.getsize(samples_path) // (4 * self.n_channels),
+                os.path.getsize(ts_path) // 8)
+        self.n_samples = n
+        if n:
+            raw = np.memmap(samples_path, dtype="<f4", mode="r", shape=(n, self.n_channels))
+            self.timestamps = np.memmap(ts_path, dtype="<f8", mode="r", shape=(n,))
+        else:
+            raw = np.zeros((0, self.n_channels), dtype="<f4")
+            self.timestamps = np.zeros(0, dtype="<f8")
+        # (n_channels, n_samples) view over the sample-major file, no copy
+        self.data = raw.T
+        self.events = self._read_events()
+
+    def _read_events(self):
+        events = []
+        path = self.directory / RAW_EVENTS
+        if not path.exists():
+            return events
+        with open(path) as f:
+            next(f, None)
+            for line in f:
+                parts = line.rstrip("\n").split(",", 3)
+                if len(parts) < 4:
+                    continue  # torn last line
+                sample, duration, label, name = parts
+                events.append({
+                    "sample": int(sample),
+                    "duration": int(duration),
+                    "label": int(label) if label.lstrip("-").isdigit() else label,
+                    "name": name,
+                })
+        return events
+
+    def epochs(self, labels=(0, 1)):
+        """
+        Cut labeled epochs by each event's sample index and duration.
+        Epochs that run past the end of the recording are dropped.
+        Returns (data, labels) with shapes (n_trials, n_channels, n) and (n_trials,).
+        """
+        picked = [e for e in self.events if e["label"] in labels and e["duration"] > 0]
+        data, labs, _ = cut_epochs(self.data, picked)
+        return data, labs
+
+
+def open_raw_session(directory):
+    """Open a raw session directory for memory-mapped reading."""
+    return RawSession(directory)
+
+
+RAW_COMPLETE = ".complete"
+_SIDECAR = ".json"
+
+
+def _write_atomic(path: Path, write):
+    """Write via a temp file in the same directory, fsync, then rename over `path`."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class StorageFull(RuntimeError):
+    """StorageService.save_npz was called while `max_pending` saves were still queued."""
+
+
+class StorageService:
+    """
+    Non-blocking session storage.
+
+    Saves go through a bounded queue to a dedicated writer thread, which
+    writes them into a local spool (mirroring the Box layout
+    <user>/<kind>/...) with temp-file + rename, so a file is either absent
+    or complete. Completed files, and raw session directories handed over
+    with `submit_raw`, are then migrated into Box, again through a hidden
+    temp name + rename, so the sync client never sees a partial file.
+    While Box is unavailable everything stays in the spool and migration
+    is retried every `retry_s` seconds; nothing is lost.
+
+    Raw directories that were never submitted are left behind by a crash.
+    They are marked complete and migrated once no recorder holds them any
+    more (see `is_recording`), so a session another process is still
+    recording into the same spool is never moved away.
+
+    Producers never wait. At most `max_pending` datasets (held in memory
+    until written) can be queued; `save_npz` beyond that raises
+    StorageFull and is counted as `rejected` in `stats()`. Jobs that carry
+    no data (`finish_raw`, `submit_raw`) are always accepted, since their
+    samples are already on disk.
+
+    `stats()` reports queue and spool depth, rejected saves and write
+    throughput.
+    """
+
+    def __init__(self, spool_dir=SPOOL_DIR, max_pending=16, retry_s=5.0, box_root=None, grace_s=60.0):
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.retry_s = retry_s
+        self.grace_s = grace_s
+        self._box_root = Path(box_root) if box_root is not None else None
+        self.max_pending = max_pending
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending_saves = 0
+        self._stats = {"saved": 0, "migrated": 0, "rejected": 0, "bytes_written": 0, "write_s": 0.0,
+                       "last_error": None}
+        self._recovered = self._recover_raw()
+        self._writer = threading.Thread(target=self._run, name="StorageService", daemon=True)
+        self._writer.start()
+
+    # -- producer side (any thread, never touches Box) ---------------------
+
+    def new_raw_session_dir(self, user_name, kind="training"):
+        """Spool directory for a RawSessionRecorder; pass it to `submit_raw` when closed."""
+        return self.spool_dir / user_name / kind / f"raw_{session_stamp()}"
+
+    def save_npz(self, data, labels, user_name, kind="training", sampling_rate=None, raw_dir=None):
+        """
+        Queue a labeled dataset for saving. Returns the spool path the file
+        will be written to; it moves to the same relative path under Box.
+        Raises StorageFull instead of waiting when the writer is behind.
+        """
+        with self._lock:
+            if self._pending_saves >= self.max_pending:
+                self._stats["rejected"] += 1
+                self._stats["last_error"] = f"save for {user_name}/{kind} rejected: {self.max_pending} saves pending"
+                raise StorageFull(f"{self.max_pending} saves are still waiting for the disk")
+            self._pending_saves += 1
+        path = self._npz_path(user_name, kind)
+        info = {"subject": user_name, "kind": kind, "sampling_rate": sampling_rate,
+                "raw_dir": None if raw_dir is None else self._relative(raw_dir)}
+        self._queue.put_nowait(("npz", path, (np.asarray(data), np.asarray(labels), info)))
+        return path
+
+    def finish_raw(self, recorder, user_name, kind="training", on_done=None):
+        """
+        Close `recorder`, cut its labeled epochs and save them as with
+        `save_npz`, then hand the directory over as with `submit_raw`, all
+        on the writer thread, so the caller never waits on the disk.
+        `on_done(result)` is called from the writer thread with a dict:
+        path (None without epochs), n_trials, n_rest, n_switch, error.
+        """
+        self._queue.put_nowait(("finish", Path(recorder.directory), (recorder, user_name, kind, on_done)))
+
+    def submit_raw(self, directory):
+        """Mark a closed raw session directory as complete and queue its migration."""
+        self._queue.put_nowait(("raw", Path(directory), None))
+
+    def flush(self, timeout=None, migrate=False):
+        """
+        Wait until every queued save is in the spool (and, with
+        migrate=True, until the spool is empty). Returns True on success.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        if migrate:
+            self._queue.put(("migrate", None, None))
+        while migrate and (self._queue.unfinished_tasks or self._pending_migrations()):
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout=10.0):
+        self.flush(timeout)
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        s["queued"] = self._queue.qsize()
+        s["spooled"] = len(self._pending_migrations())
+        s["write_mb_s"] = s["bytes_written"] / s["write_s"] / 1e6 if s["write_s"] else 0.0
+        s["box_available"] = self._box() is not None
+        return s
+
+    # -- writer thread -----------------------------------------------------
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.retry_s)
+            except queue.Empty:
+                item = False
+            if item is None:
+                self._queue.task_done()
+                return
+            if item:
+                try:
+                    self._handle(*item)
+                except Exception as e:
+                    self._error(f"{item[0]} {item[1]}: {e}")
+                finally:
+                    if item[0] == "npz":
+                        with self._lock:
+                            self._pending_saves -= 1
+                    self._queue.task_done()
+            # drain saves before spending time on (possibly slow) sync copies
+            if self._queue.empty():
+                self._recover_raw()
+                self._migrate()
+
+    def _handle(self, kind, path, payload):
+        if kind == "migrate":
+            self._recover_raw()   # so flush(migrate=True) also waits for recovered sessions
+            return
+        if kind == "raw":
+            (path / RAW_COMPLETE).touch()
+            return
+        if kind == "finish":
+            self._finish(path, *payload)
+            return
+        data, labels, info = payload
+        path.parent.mkdir(parents=True, exist_ok=True)
+        t = time.perf_counter()
+        _write_atomic(path.with_suffix(_SIDECAR), lambda f: f.write(json.dumps(info).encode()))
+        _write_atomic(path, lambda f: np.savez_compressed(f, data=data, labels=labels))
+        with self._lock:
+            self._stats["saved"] += 1
+            self._stats["bytes_written"] += path.stat().st_size
+            self._stats["write_s"] += time.perf_counter() - t
+        print(f"[Storage] Spooled {path}")
+
+    def _finish(self, directory, recorder, user_name, kind, on_done):
+        result = {"path": None, "n_trials": 0, "n_rest": 0, "n_switch": 0, "error": None}
+        try:
+            recorder.close()
+            data, labels = open_raw_session(directory).epochs()
+            if len(labels):
+                path = self._npz_path(user_name, kind)
+                info = {"subject": user_name, "kind": kind, "sampling_rate": recorder.sampling_rate,
+                        "raw_dir": self._relative(directory)}
+                self._handle("npz", path, (data, labels, info))
+                result.update(path=path, n_trials=len(labels), n_rest=int(np.sum(labels == 0)),
+                              n_switch=int(np.sum(labels == 1)))
+        except Exception as e:
+            result["error"] = str(e)
+            self._error(f"finishing {directory}: {e}")
+        # whatever made it to disk is kept and migrated
+        (directory / RAW_COMPLETE).touch()
+        if on_done is not None:
+            on_done(result)
+
+    def _box(self):
+        if self._box_root is not None:
+            return self._box_root if self._box_root.exists() else None
+        try:
+            return get_box_drive_path() / BOX_ROOT
+        except FileNotFoundError:
+            return None
+
+    def _npz_path(self, user_name, kind):
+        return self.spool_dir / user_name / kind / f"eegdata_{session_stamp()}.npz"
+
+    def _relative(self, path):
+        path = Path(path)
+        try:
+            return path.relative_to(self.spool_dir).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _pending_migrations(self):
+        done = [p for p in self.spool_dir.glob("*/*/eegdata_*.npz")]
+        done += [p.parent for p in self.spool_dir.glob(f"*/*/raw_*/{RAW_COMPLETE}")]
+        return done
+
+    def _recover_raw(self):
+        # unmarked raw sessions nobody is recording into any more were cut
+        # short by a crash and are complete as-is
+        found = [d for d in self.spool_dir.glob("*/*/raw_*")
+                 if d.is_dir() and not (d / RAW_COMPLETE).exists() and not is_recording(d, self.grace_s)]
+        for d in found:
+            print(f"[Storage] Recovered unfinished session {d.name}")
+            (d / RAW_COMPLETE).touch()
+        return len(found)
+
+    def _migrate(self):
+        box = self._box()
+        if box is None:
+            return
+        # raw directories first, so catalog entries can point at them
+        for src in sorted(self._pending_migrations(), key=lambda p: p.suffix == ".npz"):
+            dest = box / src.relative_to(self.spool_dir)
+            try:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dest.with_name(f".{dest.name}.part")
+                if src.is_dir():
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    shutil.copytree(src, tmp, ignore=shutil.ignore_patterns(RAW_COMPLETE, RAW_LOCK))
+                    os.replace(tmp, dest)
+                    shutil.rmtree(src)
+                else:
+                    shutil.copyfile(src, tmp)
+                    os.replace(tmp, dest)
+                    self._register(box, dest, src.with_suffix(_SIDECAR))
+                    src.unlink()
+                    src.with_suffix(_SIDECAR).unlink(missing_ok=True)
+                with self._lock:
+                    self._stats["migrated"] += 1
+                print(f"[Storage] Moved {src.name} to {dest.parent}")
+            except Exception as e:
+                self._error(f"migrating {src}: {e}")
+                return
+
+    def _register(self, box, dest, sidecar):
+        try:
+            info = json.loads(sidecar.read_text()) if sidecar.exists() else {}
+            raw = info.get("raw_dir")
+            SessionCatalog(box).register(
+                dest, info.get("subject", dest.parent.parent.name), info.get("kind", dest.parent.name),
+                info.get("sampling_rate"), raw_dir=None if raw is None else box / raw,
+            )
+        except Exception as e:
+            # the file is in Box either way; scan() can index it later
+            self._error(f"cataloguing {dest}: {e}")
+
+    def _error(self, msg):
+        print(f"[Storage] Error {msg}")
+        with self._lock:
+            self._stats["last_error"] = msg
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def storage_service() -> StorageService:
+    """The process-wide StorageService, started on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = StorageService()
+        return _service
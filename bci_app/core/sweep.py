@@ -0,0 +1,280 @@
+# bci_app/core/sweep.py
+"""
+Cross-validated hyperparameter sweep over recorded sessions.
+
+The grid is split into settings that change the covariances (bands,
+window length) and settings that only change the fit (CSP components,
+shrinkage, decision threshold). Work runs as two kinds of tasks:
+
+- covariance task: one session x covariance setting. Computes the
+  covariances once and writes them to .npy files in the work directory.
+- fold task: one session x covariance setting x CV fold. Memory-maps
+  those covariances and runs every fit-only combination on that fold.
+
+Fold tasks are queued as soon as their covariances exist, so even a small
+grid gives the pool sessions x settings x folds independent tasks, and the
+expensive stage is still never repeated.
+
+Epoch and covariance arrays are never pickled to workers: they live in
+.npy files that workers open with mmap_mode="r", so all processes share
+the same page-cache pages.
+
+Sessions are identified by their resolved path, not their file name:
+per-subject folders reuse names like eegdata_<timestamp>.npz.
+"""
+
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .processing import DEFAULT_BANDS
+from .training import CovarianceSet, CovarianceSettings, compute_covariances, fit_csp_lda
+
+RESULT_FIELDS = [
+    "session", "bands", "window_s", "n_components", "shrinkage", "threshold",
+    "accuracy", "accuracy_std", "tpr", "fpr", "n_trials", "folds", "task_s",
+]
+
+# BLAS threads per worker; the pool provides the parallelism
+_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+@dataclass
+class SweepGrid:
+    bands: list = field(default_factory=lambda: [DEFAULT_BANDS])
+    window_s: list = field(default_factory=lambda: [2.0])
+    n_components: list = field(default_factory=lambda: [2, 4, 6])
+    shrinkage: list = field(default_factory=lambda: ["auto"])
+    threshold: list = field(default_factory=lambda: [0.5, 0.7, 0.8, 0.9])
+
+    @classmethod
+    def from_config(cls, cfg):
+        """From the `sweep` section of a session config (missing keys keep the defaults)."""
+        cfg = dict(cfg or {})
+        if "bands" in cfg:
+            cfg["bands"] = [tuple(tuple(b) for b in bs) for bs in cfg["bands"]]
+        return cls(**{k: v for k, v in cfg.items() if k in cls.__dataclass_fields__})
+
+    def covariance_settings(self, sampling_rate, order=4, notch=60.0, step_s=0.25):
+        return [CovarianceSettings(sampling_rate, tuple(tuple(b) for b in bands), order, notch, w, step_s)
+                for bands, w in itertools.product(self.bands, self.window_s)]
+
+    def fit_params(self):
+        return list(itertools.product(self.n_components, self.shrinkage))
+
+    @property
+    def size(self):
+        return (len(self.bands) * len(self.window_s) * len(self.n_components)
+                * len(self.shrinkage) * len(self.threshold))
+
+
+def stratified_folds(labels, n_folds, seed=0):
+    """Trial indices of each test fold, with classes spread evenly across folds."""
+    rng = np.random.default_rng(seed)
+    folds = [[] for _ in range(n_folds)]
+    for c in np.unique(labels):
+        idx = rng.permutation(np.flatnonzero(labels == c))
+        for i, j in enumerate(idx):
+            folds[i % n_folds].append(j)
+    return [np.sort(f) for f in folds]
+
+
+def share_session(path, workdir, index=0) -> dict:
+    """
+    Write an .npz session's arrays to .npy files workers can memory-map,
+    in a directory made unique by `index` (the session's position in the sweep).
+    """
+    path = Path(path).resolve()
+    out = Path(workdir) / f"{index:04d}-{path.stem}"
+    out.mkdir(parents=True, exist_ok=True)
+    with np.load(path) as z:
+        data, labels = z["data"], z["labels"]
+    np.save(out / "data.npy", np.ascontiguousarray(data, dtype=np.float64))
+    np.save(out / "labels.npy", labels)
+    return {"session": str(path), "data": str(out / "data.npy"), "labels": str(out / "labels.npy")}
+
+
+def covariance_task(session: dict, settings: CovarianceSettings, index: int) -> dict:
+    """One session x covariance setting -> paths of the memory-mappable covariances."""
+    t = time.perf_counter()
+    data = np.load(session["data"], mmap_mode="r")
+    labels = np.load(session["labels"])
+    cs = compute_covariances(data, labels, settings)
+    out = Path(session["data"]).parent / f"cov-{index:02d}"
+    out.mkdir(exist_ok=True)
+    np.save(out / "trials.npy", cs.trials)
+    np.save(out / "windows.npy", cs.windows)
+    return {"trials": str(out / "trials.npy"), "windows": str(out / "windows.npy"),
+            "seconds": time.perf_counter() - t}
+
+
+def fold_task(session: dict, settings: CovarianceSettings, cov: dict, test, fit_params, thresholds):
+    """
+    One CV fold on precomputed covariances -> ({fit params: (3, n_thresholds)
+    accuracy/TPR/FPR}, seconds).
+    """
+    t = time.perf_counter()
+    labels = np.load(session["labels"])
+    trials = np.load(cov["trials"], mmap_mode="r")
+    windows = np.load(cov["windows"], mmap_mode="r")
+    thresholds = np.asarray(thresholds)
+    train = np.setdiff1d(np.arange(len(labels)), test)
+    sub = CovarianceSet(trials[train], windows[train], labels[train], settings)
+    test_windows = windows[test]
+    y = np.repeat(labels[test], windows.shape[1]) == 1
+    scores = {}
+    for params in fit_params:
+        clf = fit_csp_lda(sub, *params)
+        p = clf.predict_proba(clf.features(test_windows)).ravel()
+        hit = p[:, None] >= thresholds
+        acc = np.mean(hit == y[:, None], axis=0)
+        tpr = hit[y].mean(axis=0) if y.any() else np.full(len(thresholds), np.nan)
+        fpr = hit[~y].mean(axis=0) if (~y).any() else np.full(len(thresholds), np.nan)
+        scores[params] = np.stack([acc, tpr, fpr])
+    return scores, time.perf_counter() - t
+
+
+def _result_rows(session, settings, n_trials, fold_scores, thresholds, elapsed):
+    """Rows for one session x covariance setting from its per-fold scores (in fold order)."""
+    rows = []
+    for n_components, shrinkage in fold_scores[0]:
+        per_fold = np.stack([f[(n_components, shrinkage)] for f in fold_scores])   # (folds, 3, thresholds)
+        mean = per_fold.mean(axis=0)
+        for k, thr in enumerate(thresholds):
+            rows.append({
+                "session": session,
+                "bands": " ".join(f"{lo:g}-{hi:g}" for lo, hi in settings.bands),
+                "window_s": settings.window_s,
+                "n_components": n_components,
+                "shrinkage": shrinkage,
+                "threshold": float(thr),
+                "accuracy": round(float(mean[0, k]), 4),
+                "accuracy_std": round(float(per_fold[:, 0, k].std()), 4),
+                "tpr": round(float(mean[1, k]), 4),
+                "fpr": round(float(mean[2, k]), 4),
+                "n_trials": n_trials,
+                "folds": len(fold_scores),
+                "task_s": round(elapsed, 3),
+            })
+    return rows
+
+
+@contextmanager
+def _single_threaded_blas():
+    saved = {k: os.environ.get(k) for k in _THREAD_VARS}
+    os.environ.update({k: "1" for k in _THREAD_VARS})
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def run_sweep(sessions, sampling_rate, grid: SweepGrid = None, n_folds=5, workers=None,
+              order=4, notch=60.0, workdir=None, out=None, seed=0, progress=None):
+    """
+    Run the grid on every .npz session. workers=0 runs in-process;
+    otherwise tasks go to a process pool of `workers` (default: CPU count).
+    Returns the result rows, also written as CSV to `out` when given.
+    `progress(done, total)` is called after each task. The `task_s` column
+    is the worker time spent on a session x covariance setting, summed over
+    its covariance and fold tasks.
+    """
+    grid = grid or SweepGrid()
+    thresholds = list(grid.threshold)
+    fit_params = grid.fit_params()
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="bci-sweep-")
+        workdir = tmp.name
+    try:
+        unique = dict.fromkeys(Path(p).resolve() for p in sessions)
+        shared = [share_session(p, workdir, i) for i, p in enumerate(unique)]
+        folds = [stratified_folds(np.load(s["labels"]), n_folds, seed) for s in shared]
+        jobs = [(i, j, cs) for i in range(len(shared))
+                for j, cs in enumerate(grid.covariance_settings(sampling_rate, order, notch))]
+        total = len(jobs) * (1 + n_folds)
+        elapsed = {(i, j): 0.0 for i, j, _ in jobs}
+        scores = {(i, j): [None] * n_folds for i, j, _ in jobs}
+        done = 0
+
+        def finished_task():
+            nonlocal done
+            done += 1
+            if progress:
+                progress(done, total)
+
+        if workers == 0:
+            for i, j, cs in jobs:
+                cov = covariance_task(shared[i], cs, j)
+                elapsed[i, j] += cov["seconds"]
+                finished_task()
+                for k, test in enumerate(folds[i]):
+                    scores[i, j][k], dt = fold_task(shared[i], cs, cov, test, fit_params, thresholds)
+                    elapsed[i, j] += dt
+                    finished_task()
+        else:
+            # spawned workers start with fresh, single-threaded BLAS
+            with _single_threaded_blas(), ProcessPoolExecutor(
+                max_workers=workers or os.cpu_count(), mp_context=mp.get_context("spawn")
+            ) as pool:
+                pending = {pool.submit(covariance_task, shared[i], cs, j): (i, j, cs, None)
+                           for i, j, cs in jobs}
+                while pending:
+                    ready, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in ready:
+                        i, j, cs, k = pending.pop(fut)
+                        if k is None:
+                            cov = fut.result()
+                            elapsed[i, j] += cov["seconds"]
+                            for k, test in enumerate(folds[i]):
+                                f = pool.submit(fold_task, shared[i], cs, cov, test, fit_params, thresholds)
+                                pending[f] = (i, j, cs, k)
+                        else:
+                            scores[i, j][k], dt = fut.result()
+                            elapsed[i, j] += dt
+                        finished_task()
+        rows = []
+        for i, j, cs in jobs:
+            rows.extend(_result_rows(shared[i]["session"], cs, len(np.load(shared[i]["labels"])),
+                                     scores[i, j], thresholds, elapsed[i, j]))
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    rows.sort(key=lambda r: (r["session"], r["bands"], r["window_s"], r["n_components"],
+                             str(r["shrinkage"]), r["threshold"]))
+    if out is not None:
+        write_results(rows, out)
+    return rows
+
+
+def write_results(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"[sweep] Wrote {len(rows)} rows to {path}")
+
+
+def best(rows, metric="accuracy", per_session=True):
+    """Best row by `metric`, per session or overall."""
+    if not per_session:
+        return max(rows, key=lambda r: r[metric])
+    out = {}
+    for r in rows:
+        if r["session"] not in out or r[metric] > out[r["session"]][metric]:
+            out[r["session"]] = r
+    return out
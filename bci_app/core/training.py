@@ -0,0 +1,248 @@
+# bci_app/core/training.py
+"""
+CSP / filter-bank CSP + shrinkage LDA training over stacked epochs.
+
+Training is split into two stages:
+
+- covariances: filter every trial through the same causal filter bank the
+  runtime uses and reduce it to per-trial and per-window band covariances,
+  all in batched einsum calls. This is the only stage that touches raw EEG.
+- fitting: CSP filters from the class-mean trial covariances and a
+  shrinkage LDA on the log-variance features of the runtime-sized windows.
+
+Covariances are cached keyed on the data and the filter/window settings,
+so re-fitting with different CSP components or shrinkage only repeats the
+second stage (milliseconds).
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .inference import LinearClassifier, log_variance_features, window_covariances
+from .processing import DEFAULT_BANDS, filter_offline
+
+
+@dataclass(frozen=True)
+class CovarianceSettings:
+    sampling_rate: float
+    bands: tuple = DEFAULT_BANDS
+    order: int = 4
+    notch: float = 60.0
+    window_s: float = 2.0
+    step_s: float = 0.25   # hop between training windows; coarser than the live hop
+    skip_s: float = 0.0    # drop the start of each trial (filter settling / cue response)
+
+    @classmethod
+    def from_config(cls, cfg, sampling_rate, step_s=0.25):
+        """From a session config's `processing` and `infer` sections."""
+        proc, infer = cfg.get("processing") or {}, cfg.get("infer") or {}
+        return cls(
+            sampling_rate,
+            bands=tuple(tuple(b) for b in proc.get("bands", DEFAULT_BANDS)),
+            order=proc.get("order", 4),
+            notch=proc.get("notch", 60.0),
+            window_s=infer.get("window_s", 2.0),
+            step_s=step_s,
+        )
+
+    def key(self) -> str:
+        return json.dumps([self.sampling_rate, [list(b) for b in self.bands], self.order,
+                           self.notch, self.window_s, self.step_s, self.skip_s])
+
+
+@dataclass
+class CovarianceSet:
+    trials: np.ndarray     # (n_trials, n_bands, n_channels, n_channels)
+    windows: np.ndarray    # (n_trials, n_windows, n_bands, n_channels, n_channels)
+    labels: np.ndarray     # (n_trials,)
+    settings: CovarianceSettings
+    compute_s: float = 0.0
+
+
+def compute_covariances(data, labels, settings: CovarianceSettings) -> CovarianceSet:
+    """
+    (n_trials, n_channels, n_samples) epochs -> band covariances of every
+    trial and of every `window_s` window inside it.
+    """
+    t = time.perf_counter()
+    data = np.asarray(data, dtype=np.float64)
+    fs = settings.sampling_rate
+    filtered = filter_offline(data, fs, settings.bands, order=settings.order, notch=settings.notch)
+    filtered = filtered[..., int(round(settings.skip_s * fs)):]
+    n = filtered.shape[-1]
+    window = min(n, int(round(settings.window_s * fs)))
+    step = max(1, int(round(settings.step_s * fs)))
+    trials = np.einsum("tbcn,tbdn->tbcd", filtered, filtered, optimize=True) / n
+    windows = window_covariances(filtered, window, step)
+    return CovarianceSet(trials, windows, np.asarray(labels), settings, time.perf_counter() - t)
+
+
+class CovarianceCache:
+    """
+    Covariance sets keyed on (data, labels, settings).
+
+    Keeps the `max_entries` most recent sets in memory; with `directory`
+    set they are also stored as .npz files there and survive restarts.
+    """
+
+    def __init__(self, directory=None, max_entries=8):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(data, labels, settings: CovarianceSettings) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for a in (np.ascontiguousarray(data), np.ascontiguousarray(labels)):
+            h.update(f"{a.dtype.str}{a.shape}".encode())
+            h.update(a.data)
+        h.update(settings.key().encode())
+        return h.hexdigest()
+
+    def get(self, data, labels, settings: CovarianceSettings) -> CovarianceSet:
+        key = self.key(data, labels, settings)
+        cs = self._entries.get(key)
+        if cs is None and self.directory is not None:
+            cs = self._load(key, settings)
+        if cs is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            cs = compute_covariances(data, labels, settings)
+            if self.directory is not None:
+                self._store(key, cs)
+        self._entries[key] = cs
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cs
+
+    def clear(self):
+        self._entries.clear()
+
+    def _path(self, key):
+        return self.directory / f"cov_{key}.npz"
+
+    def _load(self, key, settings):
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with np.load(path) as z:
+            return CovarianceSet(z["trials"], z["windows"], z["labels"], settings)
+
+    def _store(self, key, cs):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(key).with_suffix(".tmp.npz")
+        np.savez(tmp, trials=cs.trials, windows=cs.windows, labels=cs.labels)
+        tmp.replace(self._path(key))
+
+
+def csp_filters(trial_covs, labels, n_components=4):
+    """
+    Per-band CSP. trial_covs is (n_trials, n_bands, n_channels, n_channels);
+    returns (n_bands, n_channels, n_components) filters, half maximising
+    class-1 variance and half class-0 variance. All bands are solved in one
+    batched eigendecomposition.
+    """
+    labels = np.asarray(labels)
+    # trace-normalise so loud trials don't dominate the class means
+    tr = np.trace(trial_covs, axis1=-2, axis2=-1)[..., None, None]
+    normed = trial_covs / tr
+    c0 = normed[labels == 0].mean(axis=0)
+    c1 = normed[labels == 1].mean(axis=0)
+    # whiten the composite covariance, then diagonalise class 1 in that space
+    d, u = np.linalg.eigh(c0 + c1)
+    p = u / np.sqrt(np.maximum(d, 1e-12))[..., None, :]
+    s1 = np.swapaxes(p, -1, -2) @ c1 @ p
+    _, v = np.linalg.eigh(s1)                  # ascending: class 0 first, class 1 last
+    w = p @ v
+    n_channels = w.shape[-1]
+    n_components = min(n_components, n_channels)
+    lo = n_components // 2
+    idx = np.r_[np.arange(lo), np.arange(n_channels - (n_components - lo), n_channels)]
+    return w[..., idx]
+
+
+def shrinkage_lda(X, y, shrinkage="auto"):
+    """
+    Two-class LDA with a shrunk pooled covariance. shrinkage="auto" picks
+    the Ledoit-Wolf coefficient; a float in [0, 1] fixes it. Returns
+    (coef, intercept) such that coef @ x + intercept is the log-odds of
+    class 1 under the shared-covariance Gaussian model.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    m0, m1 = X[y == 0].mean(axis=0), X[y == 1].mean(axis=0)
+    Xc = np.where((y == 1)[:, None], X - m1, X - m0)
+    n, d = Xc.shape
+    s = Xc.T @ Xc / n
+    mu = np.trace(s) / d
+    if shrinkage == "auto":
+        # Ledoit-Wolf: shrink toward mu * I by the estimated estimation error
+        x2 = Xc ** 2
+        beta = np.sum(x2.T @ x2 / n - s ** 2) / n
+        delta = np.sum((s - mu * np.eye(d)) ** 2)
+        shrinkage = 0.0 if delta == 0 else float(np.clip(beta / delta, 0.0, 1.0))
+    cov = (1 - shrinkage) * s + shrinkage * mu * np.eye(d)
+    coef = np.linalg.solve(cov, m1 - m0)
+    prior = np.log(np.mean(y == 1) / np.mean(y == 0))
+    intercept = float(-coef @ (m0 + m1) / 2 + prior)
+    return coef, intercept
+
+
+@dataclass
+class TrainingResult:
+    classifier: LinearClassifier
+    train_accuracy: float           # window-level, on the training data
+    covariance_s: float             # 0 when the covariances came from the cache
+    fit_s: float
+    cached: bool
+    params: dict = field(default_factory=dict)
+
+
+def fit_csp_lda(covariances: CovarianceSet, n_components=4, shrinkage="auto", bands=None) -> LinearClassifier:
+    """
+    Fit filter-bank CSP + shrinkage LDA from cached covariances. `bands`
+    optionally selects a subset of band indices (plain CSP is one band).
+    """
+    trials, windows = covariances.trials, covariances.windows
+    if bands is not None:
+        trials, windows = trials[:, bands], windows[:, :, bands]
+    labels = covariances.labels
+    w = csp_filters(trials, labels, n_components)
+    feats = log_variance_features(windows, w)
+    X = feats.reshape(-1, feats.shape[-1])
+    y = np.repeat(labels, feats.shape[1])
+    coef, intercept = shrinkage_lda(X, y, shrinkage)
+    return LinearClassifier(coef, intercept, w)
+
+
+def train_csp_lda(data, labels, settings: CovarianceSettings, n_components=4,
+                  shrinkage="auto", cache: CovarianceCache = None) -> TrainingResult:
+    """
+    Train from (n_trials, n_channels, n_samples) epochs with labels in {0, 1}.
+    Passing the same `cache` across calls makes parameter changes cheap.
+    """
+    misses = cache.misses if cache is not None else 0
+    t = time.perf_counter()
+    cs = cache.get(data, labels, settings) if cache is not None else compute_covariances(data, labels, settings)
+    cached = cache is not None and cache.misses == misses
+    t_cov = time.perf_counter() - t
+
+    t = time.perf_counter()
+    clf = fit_csp_lda(cs, n_components, shrinkage)
+    t_fit = time.perf_counter() - t
+
+    feats = clf.features(cs.windows)
+    pred = clf.predict_proba(feats) >= 0.5
+    acc = float(np.mean(pred == (cs.labels[:, None] == 1)))
+    return TrainingResult(clf, acc, 0.0 if cached else t_cov, t_fit, cached,
+                          {"n_components": n_components, "shrinkage": shrinkage})
@@ -0,0 +1,50 @@
+# bci_app/hw/clock.py
+
+import time
+import numpy as np
+
+CLOCKS = ("realtime", "accelerated", "free")
+
+
+class SampleClock:
+    """
+    Paces a simulated stream and stamps its samples.
+
+    mode:
+    - "realtime":    pace() sleeps so samples come out at the sampling rate
+    - "accelerated": same, but `speed` times faster
+    - "free":        pace() never sleeps
+
+    Pacing is scheduled against the stream start rather than sleeping a fixed
+    time per chunk, so it does not drift. Timestamps follow the sample clock
+    (start + n / sampling_rate) in every mode.
+    """
+
+    def __init__(self, sampling_rate: int, mode: str = "realtime", speed: float = 1.0):
+        if mode not in CLOCKS:
+            raise ValueError(f"clock must be one of {CLOCKS}, got {mode!r}")
+        self.sampling_rate = sampling_rate
+        self.mode = mode
+        self.speed = speed if mode == "accelerated" else 1.0
+        self.start()
+
+    @property
+    def wall_clock(self) -> bool:
+        """Whether timestamps track time.time(): only when paced in real time."""
+        return self.mode == "realtime"
+
+    def start(self):
+        self._t0 = time.time()
+        self._wall0 = time.perf_counter()
+
+    def timestamps(self, start_sample: int, n: int) -> np.ndarray:
+        return self._t0 + (start_sample + np.arange(n)) / self.sampling_rate
+
+    def pace(self, end_sample: int):
+        """Block until sample `end_sample` is due."""
+        if self.mode == "free":
+            return
+        deadline = self._wall0 + end_sample / (self.sampling_rate * self.speed)
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
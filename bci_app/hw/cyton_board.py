@@ -0,0 +1,144 @@
+# bci_app/hw/cyton_board.py
+
+import time
+import numpy as np
+from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
+
+from bci_app.core import instrumentation as instr
+
+from .interface import EEGBoard
+
+
+class CytonBoard(EEGBoard):
+    """
+    OpenBCI Cyton (or any other BrainFlow board) behind the EEGBoard interface.
+
+    - board_id: BrainFlow board id; BoardIds.SYNTHETIC_BOARD (-1) runs the
+      whole driver offline without hardware (port is then ignored)
+    - poll_interval: how long to sleep between checks of BrainFlow's ring
+      buffer while waiting for a chunk, so the host drains it in batches
+      instead of spinning
+    - timeout: give up waiting after this many seconds and return whatever
+      has arrived (the read is counted as late)
+
+    Chunks are returned as row views into the array BrainFlow hands back
+    (no extra copy when the EEG rows are contiguous, as on the Cyton) and
+    timestamps come from BrainFlow's timestamp channel.
+
+    Stream health is tracked from the package counter (0-255, wrapping):
+    `dropped_packets` counts gaps in it, `late_reads` counts reads that
+    waited longer than the chunk's own duration + `late_slack` seconds.
+    """
+
+    def __init__(self, port: str, sampling_rate: int = None, board_id: int = BoardIds.CYTON_BOARD.value,
+                 n_channels: int = None, poll_interval: float = 0.005, timeout: float = 2.0,
+                 late_slack: float = 0.05, buffer_size: int = 45000):
+        self.port = port
+        self.board_id = int(board_id)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.late_slack = late_slack
+        self.buffer_size = buffer_size
+
+        native_rate = BoardShim.get_sampling_rate(self.board_id)
+        if sampling_rate and sampling_rate != native_rate:
+            print(f"[CytonBoard] Config says {sampling_rate} Hz but board {self.board_id} runs at {native_rate} Hz; using {native_rate}")
+        self.sampling_rate = native_rate
+
+        eeg = BoardShim.get_eeg_channels(self.board_id)
+        if n_channels:
+            eeg = eeg[:n_channels]
+        self.n_channels = len(eeg)
+        if eeg == list(range(eeg[0], eeg[0] + len(eeg))):
+            self._eeg_rows = slice(eeg[0], eeg[0] + len(eeg))   # basic slice -> view
+        else:
+            self._eeg_rows = np.asarray(eeg)
+        self._ts_row = BoardShim.get_timestamp_channel(self.board_id)
+        self._pkg_row = BoardShim.get_package_num_channel(self.board_id)
+
+        self.board = None
+        self.is_streaming = False
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.samples_read = 0
+        self.dropped_packets = 0
+        self.late_reads = 0
+        self.last_wait = 0.0
+        self._last_pkg = None
+
+    def connect(self):
+        params = BrainFlowInputParams()
+        params.serial_port = self.port or ""
+        self.board = BoardShim(self.board_id, params)
+        self.board.prepare_session()
+        print(f"[CytonBoard] Connected to board {self.board_id} on {self.port or '(synthetic)'}")
+
+    def start_stream(self):
+        self._reset_stats()
+        self.board.start_stream(self.buffer_size)
+        self.is_streaming = True
+        print(f"[CytonBoard] Streaming at {self.sampling_rate} Hz")
+
+    def _wait_for(self, num_samples: int) -> int:
+        t0 = time.perf_counter()
+        deadline = t0 + self.timeout
+        available = self.board.get_board_data_count()
+        while available < num_samples and time.perf_counter() < deadline:
+            time.sleep(self.poll_interval)
+            available = self.board.get_board_data_count()
+        self.last_wait = time.perf_counter() - t0
+        if self.last_wait > num_samples / self.sampling_rate + self.late_slack:
+            self.late_reads += 1
+            instr.count("cyton.late_reads")
+        return min(available, num_samples)
+
+    def _track_packets(self, pkg: np.ndarray):
+        if pkg.size == 0:
+            return
+        pkg = pkg.astype(np.int64)
+        if self._last_pkg is not None:
+            pkg = np.concatenate(([self._last_pkg], pkg))
+        gaps = (np.diff(pkg) - 1) % 256
+        dropped = int(gaps.sum())
+        self.dropped_packets += dropped
+        if dropped:
+            instr.count("cyton.dropped_packets", dropped)
+        self._last_pkg = int(pkg[-1])
+
+    def read_timestamped(self, num_samples: int):
+        n = self._wait_for(num_samples)
+        raw = self.board.get_board_data(n) if n else np.zeros((BoardShim.get_num_rows(self.board_id), 0))
+        self._track_packets(raw[self._pkg_row])
+        self.samples_read += raw.shape[1]
+        return raw[self._eeg_rows], raw[self._ts_row]
+
+    def read_available(self):
+        """Drain everything BrainFlow has buffered right now, without waiting."""
+        raw = self.board.get_board_data()
+        self._track_packets(raw[self._pkg_row])
+        self.samples_read += raw.shape[1]
+        return raw[self._eeg_rows], raw[self._ts_row]
+
+    def read_buffer(self, num_samples: int) -> np.ndarray:
+        return self.read_timestamped(num_samples)[0]
+
+    def stats(self) -> dict:
+        return {
+            "samples_read": self.samples_read,
+            "dropped_packets": self.dropped_packets,
+            "late_reads": self.late_reads,
+            "last_wait_s": self.last_wait,
+        }
+
+    def stop_stream(self):
+        if self.board is not None and self.is_streaming:
+            self.board.stop_stream()
+        self.is_streaming = False
+        print("[CytonBoard] Stream stopped")
+
+    def disconnect(self):
+        if self.board is not None and self.board.is_prepared():
+            self.board.release_session()
+        self.board = None
+        print("[CytonBoard] Disconnected")
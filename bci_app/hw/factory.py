@@ -0,0 +1,43 @@
+# bci_app/hw/factory.py
+
+from .interface import EEGBoard
+
+BOARD_TYPES = ("fake", "cyton", "synthetic", "replay", "lsl")
+
+
+def create_board(board_cfg: dict) -> EEGBoard:
+    """
+    Build the EEGBoard selected by the `board` section of a session config.
+    - fake:      FakeBoard (seed, clock, speed)
+    - cyton:     CytonBoard on BrainFlow (board_id, default Cyton)
+    - synthetic: CytonBoard driving BrainFlow's synthetic board (no hardware)
+    - replay:    ReplayBoard over a recorded session at `path`
+    - lsl:       LSLBoard reading the LSL stream named `port` (e.g. published by
+                 another process with `infer.py --lsl`)
+    Hardware drivers are imported lazily so BrainFlow / pylsl are only needed when used.
+    """
+    kind = board_cfg.get("type", "fake")
+    port = board_cfg.get("port", "")
+    fs = board_cfg.get("sampling_rate")
+    n_channels = board_cfg.get("n_channels")
+
+    if kind == "fake":
+        from .fake_board import FakeBoard
+        return FakeBoard(port, fs, n_channels or 8, seed=board_cfg.get("seed"),
+                         clock=board_cfg.get("clock", "realtime"), speed=board_cfg.get("speed", 1.0))
+    if kind in ("cyton", "synthetic"):
+        from brainflow.board_shim import BoardIds
+        from .cyton_board import CytonBoard
+        if kind == "synthetic":
+            board_id = BoardIds.SYNTHETIC_BOARD.value
+        else:
+            board_id = board_cfg.get("board_id", BoardIds.CYTON_BOARD.value)
+        return CytonBoard(port, fs, board_id=board_id, n_channels=n_channels)
+    if kind == "replay":
+        from .replay_board import ReplayBoard
+        return ReplayBoard(board_cfg["path"], fs, clock=board_cfg.get("clock", "realtime"),
+                           speed=board_cfg.get("speed", 1.0), loop=board_cfg.get("loop", False))
+    if kind == "lsl":
+        from .lsl_bridge import LSLBoard
+        return LSLBoard(port, fs, n_channels, resolve_timeout=board_cfg.get("resolve_timeout", 5.0))
+    raise ValueError(f"Unknown board type {kind!r}, expected one of {BOARD_TYPES}")
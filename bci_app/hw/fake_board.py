@@ -1,31 +1,84 @@
 # bci_app/hw/fake_board.py
 
 import numpy as np
-import time
 from .interface import EEGBoard
+from .clock import SampleClock
+
 
 class FakeBoard(EEGBoard):
-    def __init__(self, port: str, sampling_rate: int, n_channels: int = 8):
+    """
+    Synthetic EEG source: slow drift + mu (10 Hz) and beta (20 Hz) rhythms +
+    white noise, generated from a seeded RNG and a running sample counter so
+    consecutive chunks are phase-continuous and every run with the same seed
+    yields the same samples, however the stream is chunked.
+
+    clock / speed select how read_buffer is paced ("realtime", "accelerated"
+    or "free"); see SampleClock.
+
+    `set_class(1)` simulates SWITCH imagery: mu/beta amplitude on
+    `motor_channels` drops by `erd` (event-related desynchronization);
+    `set_class(0)` or `set_class(None)` restores it.
+    """
+
+    def __init__(self, port: str, sampling_rate: int, n_channels: int = 8,
+                 seed: int = None, clock: str = "realtime", speed: float = 1.0,
+                 motor_channels=(0, 1), erd: float = 0.5):
         self.sampling_rate = sampling_rate
         self.n_channels = n_channels
+        self.seed = seed
+        self.clock = SampleClock(sampling_rate, clock, speed)
+        self.motor_channels = list(motor_channels)
+        self.erd = erd
         self.is_streaming = False
+        self.label = None
+
+        rng = np.random.default_rng(seed)
+        self._mu_phase = rng.uniform(0, 2 * np.pi, (n_channels, 1))
+        self._beta_phase = rng.uniform(0, 2 * np.pi, (n_channels, 1))
+        self._mu_amp = rng.uniform(0.8, 1.2, (n_channels, 1))
+        self._rng = rng
+        self._n = 0
+
+    @property
+    def wall_clock_timestamps(self) -> bool:
+        return self.clock.wall_clock
 
     def connect(self):
         print(f"[FakeBoard] Connected (port ignored)")
 
     def start_stream(self):
         self.is_streaming = True
-        print(f"[FakeBoard] Streaming at {self.sampling_rate} Hz")
+        self._n = 0
+        self._rng = np.random.default_rng(self.seed)
+        self.clock.start()
+        print(f"[FakeBoard] Streaming at {self.sampling_rate} Hz ({self.clock.mode} clock)")
 
-    def read_buffer(self, num_samples: int) -> np.ndarray:
-        # simulate a sine wave + noise
-        t = np.arange(num_samples) / self.sampling_rate
-        data = np.sin(2*np.pi*1.0*t)[None, :]           # 1 Hz sine
-        data = np.repeat(data, self.n_channels, axis=0)
-        data += 0.1 * np.random.randn(self.n_channels, num_samples)
-        time.sleep(num_samples / self.sampling_rate)   # simulate real-time
+    def set_class(self, label):
+        """Select the simulated mental state for the following samples."""
+        self.label = label
+
+    def _generate(self, num_samples: int) -> np.ndarray:
+        t = (self._n + np.arange(num_samples)) / self.sampling_rate
+        gain = np.ones((self.n_channels, 1))
+        if self.label == 1:
+            gain[self.motor_channels] = 1.0 - self.erd
+        data = np.sin(2 * np.pi * 1.0 * t)[None, :].repeat(self.n_channels, axis=0)
+        data += gain * self._mu_amp * np.sin(2 * np.pi * 10.0 * t + self._mu_phase)
+        data += gain * 0.5 * np.sin(2 * np.pi * 20.0 * t + self._beta_phase)
+        # drawn sample-major so the noise does not depend on the chunk size
+        data += 0.1 * self._rng.standard_normal((num_samples, self.n_channels)).T
         return data
 
+    def read_timestamped(self, num_samples: int):
+        data = self._generate(num_samples)
+        timestamps = self.clock.timestamps(self._n, num_samples)
+        self._n += num_samples
+        self.clock.pace(self._n)
+        return data, timestamps
+
+    def read_buffer(self, num_samples: int) -> np.ndarray:
+        return self.read_timestamped(num_samples)[0]
+
     def stop_stream(self):
         self.is_streaming = False
         print("[FakeBoard] Stream stopped")
@@ -1,9 +1,18 @@
 # bci_app/hw/interface.py
 
 from abc import ABC, abstractmethod
+import time
 import numpy as np
 
+from bci_app.core import instrumentation as instr
+
+from .ring_buffer import SampleRingBuffer
+
 class EEGBoard(ABC):
+    # True when read_timestamped() stamps samples on the time.time() clock;
+    # simulated boards on an accelerated / free clock stamp them on their own
+    wall_clock_timestamps = True
+
     @abstractmethod
     def __init__(self, port: str, sampling_rate: int):
         pass
@@ -26,6 +35,47 @@ class EEGBoard(ABC):
         """
         pass
 
+    def read_timestamped(self, num_samples: int):
+        """
+        Read the next chunk together with per-sample timestamps (seconds).
+        Returns (data, timestamps) with shapes (n_channels, n) and (n,).
+        Boards without hardware timestamps get them back-filled from the
+        host clock at the moment the chunk arrived.
+        """
+        data = self.read_buffer(num_samples)
+        n = data.shape[1]
+        now = time.time()
+        timestamps = now - (np.arange(n, 0, -1) - 1) / self.sampling_rate
+        return data, timestamps
+
+    def create_ring_buffer(self, seconds: float = 30.0) -> SampleRingBuffer:
+        """Allocate a ring buffer sized for `seconds` of this board's data."""
+        return SampleRingBuffer(self.n_channels, int(seconds * self.sampling_rate),
+                                sampling_rate=self.sampling_rate)
+
+    def read_into(self, ring: SampleRingBuffer, num_samples: int) -> int:
+        """
+        Read the next chunk straight into `ring`.
+        Returns the ring's new head index.
+        """
+        t0 = instr.start()
+        data, timestamps = self.read_timestamped(num_samples)
+        if instr.ENABLED:
+            instr.stop("board.read", t0)
+            n = data.shape[1]
+            instr.count("board.samples", n)
+            if n < num_samples:
+                instr.count("board.short_reads")
+            if n and self.wall_clock_timestamps and np.isfinite(timestamps[-1]):
+                # how long after its newest sample was taken the chunk reached us;
+                # only defined when the board stamps on the same clock as ours
+                lag = time.time() - float(timestamps[-1])
+                if lag < 0:
+                    instr.count("board.read_lag_negative")
+                else:
+                    instr.record("board.read_lag", lag)
+        return ring.write(data, timestamps)
+
     @abstractmethod
     def stop_stream(self) -> None:
         """Stop data streaming."""
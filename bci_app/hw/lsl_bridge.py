@@ -0,0 +1,213 @@
+# bci_app/hw/lsl_bridge.py
+"""
+Lab Streaming Layer bridge, for splitting acquisition, GUI, recording and
+inference across processes (and cores) instead of threads under one GIL.
+
+- LSLOutlet publishes three streams named after `name`:
+    <name>          EEG, float32, one channel per electrode, nominal rate
+    <name>-markers  Markers, string (cue onsets, toggles)
+    <name>-outputs  classifier output P(SWITCH), float32, irregular rate
+  It has the RawSessionRecorder interface (append / add_event / close), so
+  a Session can publish from its storage branch, off the classification
+  path. push_result is meant for Session's on_window hook, so every
+  output reaches the stream (pushes never block).
+- LSLBoard is an EEGBoard over an inlet of such a stream (or any LSL EEG
+  stream), so the existing runtime, recorder and scope work unchanged in
+  a second process.
+
+Timestamps stay in the time.time() domain used by the rest of the
+pipeline: the outlet shifts them onto the LSL clock, and the inlet shifts
+them back after LSL's clock-offset correction, so LatencyTrail numbers
+remain comparable across processes on one host.
+
+pylsl is imported lazily; it also needs the native liblsl library.
+"""
+
+import time
+
+import numpy as np
+
+from .interface import EEGBoard
+
+
+def _lsl():
+    try:
+        import pylsl
+    except (ImportError, RuntimeError) as e:   # RuntimeError: pylsl present but liblsl missing
+        raise ImportError(f"The LSL bridge needs pylsl and liblsl: {e}") from e
+    return pylsl
+
+
+def _clock_offset(pylsl):
+    """time.time() - pylsl.local_clock(), sampled back to back."""
+    return time.time() - pylsl.local_clock()
+
+
+class LSLOutlet:
+    """
+    Publish acquisition chunks, markers and classifier outputs.
+
+    - chunk_size: samples per network packet (0 = one packet per push)
+    - max_buffered_s: how much data the outlet keeps for slow consumers
+    """
+
+    def __init__(self, name, n_channels, sampling_rate, source_id=None, chunk_size=0,
+                 max_buffered_s=10, channel_labels=None):
+        pylsl = _lsl()
+        self.name = name
+        self.n_channels = n_channels
+        self.sampling_rate = sampling_rate
+        source_id = source_id or f"prosthetic-mi-bci-{name}"
+
+        info = pylsl.StreamInfo(name, "EEG", n_channels, sampling_rate, "float32", source_id)
+        chans = info.desc().append_child("channels")
+        for label in channel_labels or [f"Ch{i + 1}" for i in range(n_channels)]:
+            ch = chans.append_child("channel")
+            ch.append_child_value("label", label)
+            ch.append_child_value("unit", "microvolts")
+            ch.append_child_value("type", "EEG")
+        self.data = pylsl.StreamOutlet(info, chunk_size, max_buffered_s)
+
+        markers = pylsl.StreamInfo(f"{name}-markers", "Markers", 1, pylsl.IRREGULAR_RATE,
+                                   "string", f"{source_id}-markers")
+        self.markers = pylsl.StreamOutlet(markers)
+        outputs = pylsl.StreamInfo(f"{name}-outputs", "Classifier", 1, pylsl.IRREGULAR_RATE,
+                                   "float32", f"{source_id}-outputs")
+        self.outputs = pylsl.StreamOutlet(outputs)
+
+        self._offset = _clock_offset(pylsl)
+        self._local_clock = pylsl.local_clock
+        self._block = np.empty((0, n_channels), dtype=np.float32)
+        self.n_samples = 0
+        self._last_ts = None
+        print(f"[LSL] Publishing {name!r}: {n_channels} ch @ {sampling_rate} Hz (+ markers, outputs)")
+
+    def _lsl_time(self, t):
+        return self._local_clock() if t is None or not np.isfinite(t) else float(t) - self._offset
+
+    def append(self, data: np.ndarray, timestamps: np.ndarray = None):
+        """Push a (n_channels, n) chunk; LSL derives per-sample stamps from the newest one."""
+        n = data.shape[1]
+        if not n:
+            return
+        if self._block.shape[0] < n:
+            self._block = np.empty((n, self.n_channels), dtype=np.float32)
+        # LSL wants sample-major float32; transpose while copying into a reused buffer
+        block = self._block[:n]
+        np.copyto(block, data.T, casting="unsafe")
+        last = None if timestamps is None else timestamps[-1]
+        self.data.push_chunk(block, self._lsl_time(last))
+        self.n_samples += n
+        self._last_ts = last
+
+    def add_event(self, sample: int, label, name: str = "", duration: int = 0):
+        """Publish a marker "<label>[,<name>]" at the time of absolute sample `sample`."""
+        t = None
+        if self._last_ts is not None and np.isfinite(self._last_ts):
+            t = self._last_ts + (sample - (self.n_samples - 1)) / self.sampling_rate
+        self.push_marker(f"{label},{name}" if name else str(label), t)
+
+    def push_marker(self, text, timestamp=None):
+        """Publish a string marker; `timestamp` in time.time() seconds (default: now)."""
+        self.markers.push_sample([str(text)], self._lsl_time(timestamp))
+
+    def push_result(self, result):
+        """Publish a WindowResult's P(SWITCH), stamped with its newest sample's acquisition time."""
+        if result.proba is not None:
+            self.outputs.push_sample([float(result.proba)], self._lsl_time(result.timestamp))
+
+    def push_toggle(self, event):
+        """Publish a ToggleEvent as an "OPEN"/"CLOSED"-style marker."""
+        self.push_marker(event.state.upper(), event.trail.acquired if event.trail else None)
+
+    def have_consumers(self) -> bool:
+        return self.data.have_consumers()
+
+    def wait_for_consumers(self, timeout: float) -> bool:
+        return self.data.wait_for_consumers(timeout)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Unpublish the streams. Safe to call more than once."""
+        self.data = self.markers = self.outputs = None
+
+
+class LSLBoard(EEGBoard):
+    """
+    EEGBoard backed by an LSL inlet.
+
+    `port` selects the stream by name (empty: the first stream of
+    `stream_type`). The stream is resolved at construction, so
+    `sampling_rate` and `n_channels` come from the stream description when
+    not given. `read_timestamped` pulls chunks straight into a preallocated
+    buffer and waits at most `read_timeout` seconds for a full chunk; a
+    short (possibly empty) chunk means the outlet fell silent.
+    """
+
+    def __init__(self, port: str = "", sampling_rate: int = None, n_channels: int = None,
+                 stream_type: str = "EEG", resolve_timeout: float = 5.0, read_timeout: float = 1.0,
+                 max_buflen: int = 30):
+        pylsl = _lsl()
+        self._pylsl = pylsl
+        self.port = port
+        prop, value = ("name", port) if port else ("type", stream_type)
+        found = pylsl.resolve_byprop(prop, value, 1, resolve_timeout)
+        if not found:
+            raise ConnectionError(f"No LSL stream with {prop}={value!r} found within {resolve_timeout} s")
+        self.info = found[0]
+        self.sampling_rate = sampling_rate or int(round(self.info.nominal_srate()))
+        self.n_channels = n_channels or self.info.channel_count()
+        if self.n_channels > self.info.channel_count():
+            raise ValueError(f"stream {self.info.name()!r} has only {self.info.channel_count()} channels")
+        self.read_timeout = read_timeout
+        self.max_buflen = max_buflen
+        self.inlet = None
+        self.is_streaming = False
+        self._buf = np.empty((0, self.info.channel_count()), dtype=np.float32)
+        self._offset = 0.0
+
+    def connect(self):
+        self.inlet = self._pylsl.StreamInlet(self.info, max_buflen=self.max_buflen,
+                                             processing_flags=self._pylsl.proc_clocksync)
+        print(f"[LSLBoard] Connected to {self.info.name()!r} ({self.info.hostname()})")
+
+    def start_stream(self):
+        self.inlet.open_stream(timeout=self.read_timeout)
+        self.inlet.flush()   # start from live data, not the outlet's backlog
+        self._offset = _clock_offset(self._pylsl)
+        self.is_streaming = True
+        print(f"[LSLBoard] Streaming at {self.sampling_rate} Hz")
+
+    def read_timestamped(self, num_samples: int):
+        if self._buf.shape[0] < num_samples:
+            self._buf = np.empty((num_samples, self.info.channel_count()), dtype=np.float32)
+        got = 0
+        stamps = []
+        deadline = time.perf_counter() + self.read_timeout
+        while got < num_samples:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            # pull_chunk fills rows got.. in place; the wait is inside liblsl, without the GIL
+            _, ts = self.inlet.pull_chunk(timeout=remaining, max_samples=num_samples - got,
+                                          dest_obj=self._buf[got:])
+            got += len(ts)
+            stamps.extend(ts)
+        data = self._buf[:got, :self.n_channels].T.astype(np.float64)
+        timestamps = np.asarray(stamps, dtype=np.float64) + self._offset
+        return data, timestamps
+
+    def read_buffer(self, num_samples: int) -> np.ndarray:
+        return self.read_timestamped(num_samples)[0]
+
+    def stop_stream(self):
+        if self.inlet is not None and self.is_streaming:
+            self.inlet.close_stream()
+        self.is_streaming = False
+        print("[LSLBoard] Stream stopped")
+
+    def disconnect(self):
+        self.inlet = None
+        print("[LSLBoard] Disconnected")
@@ -0,0 +1,219 @@
+# bci_app/hw/replay_board.py
+
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from .interface import EEGBoard
+from .clock import SampleClock
+from bci_app.core.storage import RAW_HEADER, open_raw_session
+
+REPLAY_CACHE = Path(tempfile.gettempdir()) / "prosthetic-mi-bci-replay"
+REPLAY_CACHE_MAX_BYTES = 4 << 30
+
+
+def _npz_member_memmap(path: Path, member: str, cache_dir: Path, max_bytes=REPLAY_CACHE_MAX_BYTES) -> np.ndarray:
+    """
+    Memory-map one array of an .npz archive.
+
+    Members of `np.savez_compressed` archives are deflated and cannot be
+    mapped in place, so the member (itself a complete .npy file) is streamed
+    once into an on-disk cache and mapped from there. Nothing is ever
+    decompressed into RAM as a whole.
+
+    Cache files are named after the archive's path and its size/mtime:
+    copies of an older version of the same archive are deleted, and the
+    least recently used files are evicted once the cache exceeds
+    `max_bytes` (the file just mapped is always kept).
+    """
+    st = path.stat()
+    path_key = hashlib.sha1(f"{path.resolve()}:{member}".encode()).hexdigest()[:12]
+    version = hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:8]
+    cache = cache_dir / f"{path.stem}_{member}_{path_key}_{version}.npy"
+    if cache.exists():
+        os.utime(cache)   # recently used
+    else:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"*_{path_key}_*.npy"):
+            _remove(stale)
+        tmp = cache.with_suffix(".tmp")
+        with zipfile.ZipFile(path) as zf, zf.open(f"{member}.npy") as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=1 << 20)
+        os.replace(tmp, cache)
+        _evict(cache_dir, max_bytes, keep=cache)
+    return np.load(cache, mmap_mode="r")
+
+
+def _remove(path: Path):
+    try:
+        path.unlink()
+    except OSError:   # still mapped by another board (Windows) or already gone
+        pass
+
+
+def _evict(cache_dir: Path, max_bytes: int, keep: Path):
+    """Delete least recently used cache files until the cache fits in `max_bytes`."""
+    files = []
+    for f in cache_dir.glob("*.npy"):
+        try:
+            st = f.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, f))
+    total = sum(size for _, size, _ in files)
+    for _, size, f in sorted(files, key=lambda x: x[0]):
+        if total <= max_bytes:
+            break
+        if f != keep:
+            _remove(f)
+            total -= size
+
+
+class ReplayBoard(EEGBoard):
+    """
+    Streams a recorded session back through the live pipeline.
+
+    `port` is the path to either
+    - a raw session directory written by RawSessionRecorder, or
+    - an epoched .npz written by save_npz_to_box (trials are played back to
+      back; `sampling_rate` must be given since the file does not store it).
+      The trials are decompressed into `cache_dir` (shared and size-capped,
+      see _npz_member_memmap); cache_dir=None uses a private temporary
+      directory that is removed with the board.
+
+    Samples are served from memory-mapped storage, paced by a SampleClock
+    ("realtime", "accelerated" x `speed`, or "free"). The recording's
+    labels are exposed as an event stream: `read_events()` returns the
+    events whose onset fell in the samples delivered since the last call.
+    When the recording runs out, chunks come back short and `finished`
+    is set, unless `loop` is enabled.
+    """
+
+    def __init__(self, port: str, sampling_rate: int = None, clock: str = "realtime",
+                 speed: float = 1.0, loop: bool = False, cache_dir=REPLAY_CACHE):
+        self.path = Path(port)
+        self.loop = loop
+        if (self.path / RAW_HEADER).exists():
+            session = open_raw_session(self.path)
+            self._data = session.data
+            self.events = session.events
+            self.sampling_rate = sampling_rate or session.sampling_rate
+        elif self.path.suffix == ".npz":
+            if not sampling_rate:
+                raise ValueError("sampling_rate is required to replay an .npz file")
+            if cache_dir is None:
+                self._tmp = tempfile.TemporaryDirectory(prefix="bci-replay-")
+                cache_dir = self._tmp.name
+            trials = _npz_member_memmap(self.path, "data", Path(cache_dir))
+            with np.load(self.path) as npz:
+                labels = npz["labels"]
+            n_trials, n_channels, n_per = trials.shape
+            # trials played back to back as one (n_channels, n_trials * n_per) stream
+            self._data = _TrialStream(trials)
+            self.events = [
+                {"sample": i * n_per, "duration": n_per, "label": int(lbl), "name": ""}
+                for i, lbl in enumerate(labels)
+            ]
+            self.sampling_rate = sampling_rate
+        else:
+            raise ValueError(f"Don't know how to replay {self.path}")
+
+        self.n_channels = self._data.shape[0]
+        self.n_samples = self._data.shape[1]
+        if not self.n_samples:
+            raise ValueError(f"{self.path} contains no samples to replay")
+        self.clock = SampleClock(self.sampling_rate, clock, speed)
+        self.is_streaming = False
+        self.finished = False
+        self._pos = 0        # samples delivered in total
+        self._event_pos = 0  # samples already scanned for events
+
+    @property
+    def wall_clock_timestamps(self) -> bool:
+        return self.clock.wall_clock
+
+    def connect(self):
+        print(f"[ReplayBoard] Opened {self.path} ({self.n_channels} ch, {self.n_samples} samples)")
+
+    def start_stream(self):
+        self.is_streaming = True
+        self.finished = False
+        self._pos = 0
+        self._event_pos = 0
+        self.clock.start()
+        print(f"[ReplayBoard] Streaming at {self.sampling_rate} Hz ({self.clock.mode} clock)")
+
+    def _slice(self, start: int, n: int) -> np.ndarray:
+        if not self.loop:
+            return self._data[:, start:min(start + n, self.n_samples)]
+        parts = []
+        while n > 0:
+            lo = start % self.n_samples
+            take = min(n, self.n_samples - lo)
+            parts.append(self._data[:, lo:lo + take])
+            start += take
+            n -= take
+        return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1)
+
+    def read_timestamped(self, num_samples: int):
+        data = np.asarray(self._slice(self._pos, num_samples), dtype=np.float64)
+        n = data.shape[1]
+        timestamps = self.clock.timestamps(self._pos, n)
+        self._pos += n
+        if n < num_samples:
+            self.finished = True
+        self.clock.pace(self._pos)
+        return data, timestamps
+
+    def read_buffer(self, num_samples: int) -> np.ndarray:
+        return self.read_timestamped(num_samples)[0]
+
+    def read_events(self):
+        """Events (dicts with absolute stream sample index) up to the current position."""
+        out = []
+        start, stop = self._event_pos, self._pos
+        lap = start // self.n_samples if self.n_samples else 0
+        while self.n_samples and lap * self.n_samples < stop:
+            base = lap * self.n_samples
+            for ev in self.events:
+                s = base + ev["sample"]
+                if start <= s < stop:
+                    out.append(dict(ev, sample=s))
+            lap += 1
+        self._event_pos = stop
+        return out
+
+    def stop_stream(self):
+        self.is_streaming = False
+        print("[ReplayBoard] Stream stopped")
+
+    def disconnect(self):
+        print("[ReplayBoard] Closed")
+
+
+class _TrialStream:
+    """Presents (n_trials, n_channels, n) epochs as one (n_channels, n_trials * n) stream."""
+
+    def __init__(self, trials):
+        self._trials = trials
+        n_trials, n_channels, self._per = trials.shape
+        self.shape = (n_channels, n_trials * self._per)
+
+    def __getitem__(self, key):
+        _, sl = key
+        start, stop = sl.start, min(sl.stop, self.shape[1])
+        first, last = start // self._per, (stop - 1) // self._per
+        if stop <= start:
+            return np.zeros((self.shape[0], 0), dtype=self._trials.dtype)
+        if first == last:
+            lo = start - first * self._per
+            return self._trials[first, :, lo:lo + (stop - start)]
+        parts = [self._trials[first, :, start - first * self._per:]]
+        parts.extend(self._trials[i] for i in range(first + 1, last))
+        parts.append(self._trials[last, :, :stop - last * self._per])
+        return np.concatenate(parts, axis=1)
@@ -0,0 +1,113 @@
+# bci_app/hw/ring_buffer.py
+
+import threading
+import numpy as np
+
+
+class SampleRingBuffer:
+    """
+    Preallocated, thread-safe ring buffer for multichannel samples plus
+    per-sample timestamps.
+
+    Samples are addressed by an absolute, monotonically increasing sample
+    index (0 = first sample ever written). Any window of up to `capacity`
+    samples that is still held in the buffer can be read as a zero-copy
+    (n_channels, n) view: every sample is written twice (at `i % capacity`
+    and `i % capacity + capacity`), so a window never wraps.
+
+    Views alias the underlying storage. A reader that falls more than
+    `capacity` samples behind the writer will see its view overwritten, so
+    callers that keep data around (e.g. epochs) must `.copy()` it.
+    """
+
+    def __init__(self, n_channels: int, capacity: int, dtype=np.float64,
+                 sampling_rate: float = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.n_channels = n_channels
+        self.capacity = capacity
+        self.sampling_rate = sampling_rate
+        self._data = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self._ts = np.zeros(2 * capacity, dtype=np.float64)
+        self._head = 0
+        self._cond = threading.Condition()
+
+    @property
+    def head(self) -> int:
+        """Absolute index one past the newest sample."""
+        return self._head
+
+    @property
+    def tail(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self._head - self.capacity)
+
+    def reset(self):
+        with self._cond:
+            self._head = 0
+            self._cond.notify_all()
+
+    def write(self, data: np.ndarray, timestamps: np.ndarray = None) -> int:
+        """
+        Append a (n_channels, n) chunk and its n timestamps.
+        Returns the new head index.
+        """
+        if data.shape[0] != self.n_channels:
+            raise ValueError(f"expected {self.n_channels} channels, got {data.shape[0]}")
+        with self._cond:
+            n = data.shape[1]
+            if n > self.capacity:
+                # only the newest `capacity` samples can be kept
+                self._head += n - self.capacity
+                data = data[:, -self.capacity:]
+                if timestamps is not None:
+                    timestamps = timestamps[-self.capacity:]
+                n = self.capacity
+
+            start = self._head % self.capacity
+            first = min(n, self.capacity - start)
+            rest = n - first
+            for lo in (start, start + self.capacity):
+                self._data[:, lo:lo + first] = data[:, :first]
+                if timestamps is not None:
+                    self._ts[lo:lo + first] = timestamps[:first]
+            if rest:
+                for lo in (0, self.capacity):
+                    self._data[:, lo:lo + rest] = data[:, first:]
+                    if timestamps is not None:
+                        self._ts[lo:lo + rest] = timestamps[first:]
+            self._head += n
+            self._cond.notify_all()
+            return self._head
+
+    def _slice(self, start: int, stop: int) -> slice:
+        if stop < start:
+            raise ValueError("stop must be >= start")
+        if start < self.tail or stop > self._head:
+            raise IndexError(
+                f"samples [{start}, {stop}) not in buffer [{self.tail}, {self._head})"
+            )
+        lo = start % self.capacity
+        return slice(lo, lo + (stop - start))
+
+    def view(self, start: int, stop: int) -> np.ndarray:
+        """Zero-copy (n_channels, stop - start) view of samples [start, stop)."""
+        with self._cond:
+            return self._data[:, self._slice(start, stop)]
+
+    def timestamps(self, start: int, stop: int) -> np.ndarray:
+        """Zero-copy view of the timestamps of samples [start, stop)."""
+        with self._cond:
+            return self._ts[self._slice(start, stop)]
+
+    def latest(self, n: int):
+        """Return (start_index, view) for the newest `n` samples (or fewer)."""
+        with self._cond:
+            stop = self._head
+            start = max(self.tail, stop - n)
+            return start, self._data[:, self._slice(start, stop)]
+
+    def wait_for(self, index: int, timeout: float = None) -> bool:
+        """Block until `head >= index`. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._head >= index, timeout)
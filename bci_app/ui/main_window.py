@@ -7,6 +7,7 @@ from .widgets.data_collection   import DataCollectionWidget
 from .widgets.online_training   import OnlineTrainingWidget
 from .widgets.export_model      import ExportModelWidget
 from .widgets.inference_widget  import InferenceWidget
+from .widgets.diagnostics       import DiagnosticsWidget
 
 class MainMenuWidget(QWidget):
     def __init__(self, parent=None):
@@ -18,7 +19,8 @@ class MainMenuWidget(QWidget):
         self.trainBtn  = QPushButton("2. Online Training")
         self.exportBtn = QPushButton("3. Export Model")
         self.inferBtn  = QPushButton("4. Run Inference")
-        for btn in (self.dataBtn, self.trainBtn, self.exportBtn, self.inferBtn):
+        self.diagBtn   = QPushButton("5. Diagnostics")
+        for btn in (self.dataBtn, self.trainBtn, self.exportBtn, self.inferBtn, self.diagBtn):
             btn.setFixedHeight(50)
             layout.addWidget(btn)
         layout.setSpacing(20)
@@ -38,6 +40,7 @@ class MainWindow(QMainWindow):
         self.trainPage   = OnlineTrainingWidget()
         self.exportPage  = ExportModelWidget()
         self.inferPage   = InferenceWidget()
+        self.diagPage    = DiagnosticsWidget()
 
         # Add pages to stack
         self.stack.addWidget(self.mainMenu)
@@ -45,15 +48,20 @@ class MainWindow(QMainWindow):
         self.stack.addWidget(self.trainPage)
         self.stack.addWidget(self.exportPage)
         self.stack.addWidget(self.inferPage)
+        self.stack.addWidget(self.diagPage)
 
         # Wire main menu buttons
         self.mainMenu.dataBtn.clicked.connect(lambda: self.stack.setCurrentWidget(self.collectPage))
         self.mainMenu.trainBtn.clicked.connect(lambda: self.stack.setCurrentWidget(self.trainPage))
         self.mainMenu.exportBtn.clicked.connect(lambda: self.stack.setCurrentWidget(self.exportPage))
         self.mainMenu.inferBtn.clicked.connect(lambda: self.stack.setCurrentWidget(self.inferPage))
+        self.mainMenu.diagBtn.clicked.connect(lambda: self.stack.setCurrentWidget(self.diagPage))
+
+        # Online training hands its adapted model to the export page
+        self.trainPage.modelReady.connect(self.exportPage.set_model)
 
         # Add back buttons
-        for page in (self.collectPage, self.trainPage, self.exportPage, self.inferPage):
+        for page in (self.collectPage, self.trainPage, self.exportPage, self.inferPage, self.diagPage):
             if hasattr(page, 'add_back_button'):
                 page.add_back_button(self.show_main)
 
@@ -1,6 +1,3 @@
-import os
-import numpy as np
-from datetime import datetime
 
 from PyQt6.QtWidgets import (
     QWidget, QPushButton, QLabel, QHBoxLayout, QVBoxLayout,
@@ -11,14 +8,26 @@ from PyQt6.QtGui import QFont
 
 from bci_app.core.config import get_session_cfg
 from bci_app.hw.fake_board import FakeBoard
-from bci_app.core.storage import save_npz_to_box
+from bci_app.hw.factory import create_board
+from bci_app.core.storage import RawSessionRecorder, storage_service
+from bci_app.core.segmentation import Marker, cue_sample
+from .eeg_scope import EEGScopeWidget
+
+# Acquisition chunk length. Cue markers are placed on the sample counter,
+# so a cue lags the screen by at most one chunk.
+ACQ_CHUNK_S = 0.05
 
 class DataCollectionThread(QThread):
-    dataReady = pyqtSignal(object)
+    # Emits the ring buffer's head index; consumers read samples from
+    # `self.buffer` by index instead of receiving a copy of every chunk.
+    samplesReady = pyqtSignal(int)
 
     def __init__(self, board, parent=None):
         super().__init__(parent)
         self.board = board
+        self.buffer = board.create_ring_buffer(seconds=30.0)
+        self.recorder = None
+        self.error = None
         self._running = False
 
     def run(self):
@@ -26,11 +35,16 @@ class DataCollectionThread(QThread):
             self.board.connect()
             self.board.start_stream()
             self._running = True
-            chunk = int(self.board.sampling_rate * 0.5)
+            chunk = max(1, int(self.board.sampling_rate * ACQ_CHUNK_S))
+            head = self.buffer.head
             while self._running:
-                buf = self.board.read_buffer(chunk)
-                self.dataReady.emit(buf)
+                prev, head = head, self.board.read_into(self.buffer, chunk)
+                if self.recorder is not None:
+                    self.recorder.append(self.buffer.view(prev, head),
+                                         self.buffer.timestamps(prev, head))
+                self.samplesReady.emit(head)
         except Exception as e:
+            self.error = e
             print(f"Board error: {e}")
         finally:
             self.board.stop_stream()
@@ -41,13 +55,16 @@ class DataCollectionThread(QThread):
         self.wait()
 
 class DataCollectionWidget(QWidget):
+    # result dict of StorageService.finish_raw, emitted from the storage writer thread
+    collectionSaved = pyqtSignal(dict)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         cfg = get_session_cfg("demo")
         bc = cfg["board"]
-        self.board = FakeBoard(bc["port"], bc["sampling_rate"])
+        self.board = create_board(bc)
         self.thread = DataCollectionThread(self.board)
-        self.thread.dataReady.connect(self._record_chunk)
+        self.storage = storage_service()
 
         # UI
         self._create_ui()
@@ -72,22 +89,31 @@ class DataCollectionWidget(QWidget):
         self.trials_done = 0
         self.phase_idx = 0
         self.current_label = None
-        self._trial_bufs = []
-        self.data_records = []
+        self.recorder = None
         self.paused = False
-        self._phase_waiting = False
-        self._remaining = 0
 
-        # Timers
+        # Phase timing runs on the acquisition sample clock: the tick timer
+        # only polls it, so UI load cannot stretch or shorten a phase.
         self.tick_timer = QTimer(self)
         self.tick_timer.setInterval(50)
         self.tick_timer.timeout.connect(self._on_tick)
-        self._phase_ms, self._elapsed_ms = 0, 0
+        self._phase_ms = 0
+        self._phase_onset = 0      # sample index the current cue was shown at
+        self._phase_samples = 0
+        self._paused_at = None
+        self._marker = None        # epoch marker of the current labeled phase
+
+        # Storage service status (queue / spool depth, throughput)
+        self.storage_timer = QTimer(self)
+        self.storage_timer.setInterval(1000)
+        self.storage_timer.timeout.connect(self._on_storage_stats)
+        self.storage_timer.start()
 
         # Connect controls
         self.startBtn.clicked.connect(self._on_start)
         self.pauseBtn.clicked.connect(self._on_pause)
         self.stopBtn.clicked.connect(self._on_stop)
+        self.collectionSaved.connect(self._on_collection_saved)
 
     def _create_ui(self):
         intro_text = (
@@ -153,6 +179,16 @@ class DataCollectionWidget(QWidget):
 
         self.statusLabel = QLabel("Ready to start")
         self.statusLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.storageLabel = QLabel("")
+        self.storageLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        # Live signal view for the operator, hidden until asked for
+        self.scope = EEGScopeWidget(self.thread.buffer, self.board.sampling_rate, self.board.n_channels)
+        self.scope.setMinimumHeight(250)
+        self.scope.setVisible(False)
+        self.scopeBtn = QPushButton("Show Signal")
+        self.scopeBtn.setCheckable(True)
+        self.scopeBtn.toggled.connect(self._on_scope_toggled)
 
         self.startBtn = QPushButton("Start Collection")
         self.pauseBtn = QPushButton("Pause")
@@ -164,11 +200,14 @@ class DataCollectionWidget(QWidget):
         btns.addWidget(self.startBtn)
         btns.addWidget(self.pauseBtn)
         btns.addWidget(self.stopBtn)
+        btns.addWidget(self.scopeBtn)
 
         layout = QVBoxLayout(self)
         layout.addWidget(self.introLabel)
         layout.addWidget(self.centralFrame)
+        layout.addWidget(self.scope)
         layout.addWidget(self.statusLabel)
+        layout.addWidget(self.storageLabel)
         layout.addLayout(btns)
 
     def _on_start(self):
@@ -192,20 +231,33 @@ class DataCollectionWidget(QWidget):
         if not ok:
             return
 
+        # Stream raw samples + cue events to the local spool as they arrive;
+        # the storage service moves the session into Box once it is closed
+        try:
+            self.recorder = RawSessionRecorder(
+                self.storage.new_raw_session_dir(self.subject_name, kind="training"),
+                self.board.n_channels, self.board.sampling_rate,
+                metadata={"subject": self.subject_name, "blocks": n},
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Recording Failed", f"Cannot start recording:\n{e}")
+            return
+        self.thread.recorder = self.recorder
+
         self.introLabel.hide()
         self.trials_total = n
         self.trials_done = 0
         self.phase_idx = 0
         self.current_label = None
-        self._trial_bufs.clear()
-        self.data_records.clear()
         self.paused = False
+        self._marker = None
 
         self.startBtn.setEnabled(False)
         self.pauseBtn.setEnabled(True)
         self.stopBtn.setEnabled(True)
         self.statusLabel.setText(f"Collection in progress: 0/{self.trials_total} blocks completed")
 
+        self.thread.buffer.reset()
         self.thread.start()
         self._next_phase()
 
@@ -214,8 +266,17 @@ class DataCollectionWidget(QWidget):
         self.pauseBtn.setText("Resume" if self.paused else "Pause")
         if self.paused:
             self.tick_timer.stop()
+            self._paused_at = cue_sample(self.thread.buffer)
             self.statusLabel.setText("Collection paused - press Resume when ready")
         else:
+            now = cue_sample(self.thread.buffer)
+            if self._marker is not None:
+                # an imagery epoch must be uninterrupted: restart it
+                self._phase_onset = self._marker.sample = now
+                self.progressBar.setValue(0)
+            else:
+                self._phase_onset += now - self._paused_at
+            self._paused_at = None
             self.tick_timer.start()
             self.statusLabel.setText(f"Collection in progress: {self.trials_done}/{self.trials_total} blocks completed")
 
@@ -224,19 +285,11 @@ class DataCollectionWidget(QWidget):
         self._finish_collection()
 
     def _next_phase(self):
-        self._elapsed_ms = 0
         if self.paused or self.trials_done >= self.trials_total:
             self._finish_collection()
             return
 
-        prev_lbl = self.current_label
         name, ms, rec_lbl, color = self.phases[self.phase_idx]
-        if prev_lbl in (0, 1) and self._trial_bufs:
-            trial = np.concatenate(self._trial_bufs, axis=1)
-            expected_len = int(self.board.sampling_rate * (self._phase_ms / 1000))
-            trial = trial[:, :expected_len]
-            self.data_records.append((prev_lbl, trial))
-            self._trial_bufs.clear()
 
         self.phaseLabel.setStyleSheet(f"color: {color};")
         self.focusSymbol.setVisible(name == "Focus")
@@ -246,14 +299,20 @@ class DataCollectionWidget(QWidget):
 
         self.progressInfo.setText(f"Block {self.trials_done+1} of {self.trials_total}")
         self.current_label = rec_lbl
+        if isinstance(self.board, FakeBoard):
+            self.board.set_class(rec_lbl)
 
+        # cue onset on the acquisition sample clock
+        self._phase_ms = ms
+        self._phase_onset = cue_sample(self.thread.buffer)
+        self._phase_samples = int(round(self.board.sampling_rate * ms / 1000))
         if rec_lbl in (0, 1):
-            self._phase_ms = ms
+            self._marker = Marker(self._phase_onset, rec_lbl, name, self._phase_samples)
             self.progressBar.setRange(0, ms)
             self.progressBar.setValue(0)
             self.progressBar.setVisible(True)
         else:
-            self._phase_ms = ms
+            self._marker = None
             self.progressBar.setVisible(False)
 
         self.tick_timer.start()
@@ -267,19 +326,43 @@ class DataCollectionWidget(QWidget):
     def _on_tick(self):
         if self.paused:
             return
+        if not self.thread.isRunning():
+            # phases advance on the sample counter, which stops with acquisition
+            self.tick_timer.stop()
+            reason = self.thread.error or "the acquisition thread exited"
+            self._finish_collection()
+            QMessageBox.warning(self, "Acquisition Stopped",
+                                f"The board stopped delivering samples:\n{reason}\n\n"
+                                f"Blocks completed so far are being saved.")
+            return
 
-        self._elapsed_ms += 50
-        progress = min(self._elapsed_ms, self._phase_ms)
+        elapsed = cue_sample(self.thread.buffer) - self._phase_onset
         if self.current_label in (0, 1):
+            progress = int(1000 * min(elapsed, self._phase_samples) / self.board.sampling_rate)
             self.progressBar.setValue(progress)
 
-        if self._elapsed_ms >= self._phase_ms:
+        if elapsed >= self._phase_samples:
             self.tick_timer.stop()
-            QTimer.singleShot(350, self._next_phase)
-
-    def _record_chunk(self, buf):
-        if self.current_label in (0, 1):
-            self._trial_bufs.append(buf.copy())
+            if self._marker is not None and self.recorder is not None:
+                m = self._marker
+                self.recorder.add_event(m.sample, m.label, m.name, duration=m.duration)
+            self._marker = None
+            self._next_phase()
+
+    def _on_scope_toggled(self, on):
+        self.scope.setVisible(on)
+        self.scopeBtn.setText("Hide Signal" if on else "Show Signal")
+
+    def _on_storage_stats(self):
+        s = self.storage.stats()
+        text = f"Storage: {s['queued']} queued, {s['spooled']} waiting for Box"
+        if s["saved"]:
+            text += f", {s['write_mb_s']:.1f} MB/s"
+        if s["rejected"]:
+            text += f", {s['rejected']} saves rejected (disk too slow)"
+        if not s["box_available"]:
+            text += " (Box Drive not found: keeping data in the local spool)"
+        self.storageLabel.setText(text)
 
     def _finish_collection(self):
         self.thread.stop()
@@ -292,17 +375,24 @@ class DataCollectionWidget(QWidget):
         self.progressBar.setVisible(False)
         self.statusLabel.setText(f"Completed {self.trials_done} blocks of SWITCH/REST data")
 
-        # Save collected data to Box using subject name!
-        if self.data_records:
-            labs = np.array([l for l, _ in self.data_records])
-            dat = np.stack([d for _, d in self.data_records], axis=0)
-            try:
-                path = save_npz_to_box(dat, labs, self.subject_name, kind="training")
-                stats = f"Saved {len(self.data_records)} trials ({len(labs[labs==0])} REST, {len(labs[labs==1])} SWITCH)"
-                QMessageBox.information(self, "Data Saved", f"Collection complete!\n\n{stats}\n\nFile saved to:\n{path}")
-            except Exception as e:
-                QMessageBox.warning(self, "Box Save Failed", f"Data collection finished but could not save to Box:\n{e}")
+        # Closing the recording and cutting the epoched dataset from disk run
+        # on the storage writer thread; the result comes back via collectionSaved
+        if self.recorder is None:
+            self.introLabel.show()
+            return
+        recorder, self.recorder = self.recorder, None
+        self.thread.recorder = None
+        self.statusLabel.setText(f"Completed {self.trials_done} blocks - saving…")
+        self.storage.finish_raw(recorder, self.subject_name, kind="training",
+                                on_done=self.collectionSaved.emit)
+
+    def _on_collection_saved(self, result):
+        self.statusLabel.setText(f"Completed {self.trials_done} blocks of SWITCH/REST data")
+        if result["error"]:
+            QMessageBox.warning(self, "Recording Failed", f"Could not read back the raw recording:\n{result['error']}")
+        elif result["n_trials"]:
+            stats = f"Saved {result['n_trials']} trials ({result['n_rest']} REST, {result['n_switch']} SWITCH)"
+            QMessageBox.information(self, "Data Saved", f"Collection complete!\n\n{stats}\n\nSpooled to:\n{result['path']}\n\nIt is moved into Box as soon as Box Drive is available.")
         else:
             QMessageBox.warning(self, "No Data", "No data was collected.")
-
         self.introLabel.show()
@@ -0,0 +1,85 @@
+# bci_app/ui/widgets/diagnostics.py
+from PyQt6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox, QTableWidget,
+    QTableWidgetItem, QHeaderView, QFileDialog
+)
+from PyQt6.QtCore import QTimer
+
+from bci_app.core import instrumentation as instr
+
+_COLUMNS = ("Metric", "Count", "Mean ms", "p50 ms", "p95 ms", "p99 ms", "Max ms", "Rate /s")
+
+
+class DiagnosticsWidget(QWidget):
+    """
+    Live view of the instrumentation registry: stage latency percentiles
+    and counters (samples, drops, late reads), refreshed once a second
+    while the page is visible.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enableBox = QCheckBox("Enable instrumentation")
+        self.enableBox.setChecked(instr.is_enabled())
+        self.enableBox.toggled.connect(instr.enable)
+        self.resetBtn = QPushButton("Reset")
+        self.resetBtn.clicked.connect(self._on_reset)
+        self.exportBtn = QPushButton("Export…")
+        self.exportBtn.clicked.connect(self._on_export)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.enableBox)
+        controls.addStretch(1)
+        controls.addWidget(self.resetBtn)
+        controls.addWidget(self.exportBtn)
+
+        self._layout = QVBoxLayout(self)
+        self._layout.addWidget(QLabel("<h2>Diagnostics</h2>"))
+        self._layout.addLayout(controls)
+        self._layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def add_back_button(self, callback):
+        btn = QPushButton("Back")
+        btn.clicked.connect(callback)
+        self._layout.addWidget(btn)
+
+    def showEvent(self, event):
+        self.enableBox.setChecked(instr.is_enabled())
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        snap = instr.snapshot()
+        rows = [(name, [t["count"], t["mean_ms"], t["p50_ms"], t["p95_ms"], t["p99_ms"], t["max_ms"], None])
+                for name, t in snap["timings"].items()]
+        rows += [(name, [c["value"], None, None, None, None, None, c["rate_per_s"]])
+                 for name, c in snap["counters"].items()]
+        self.table.setRowCount(len(rows))
+        for r, (name, values) in enumerate(rows):
+            self.table.setItem(r, 0, QTableWidgetItem(name))
+            for c, v in enumerate(values, start=1):
+                self.table.setItem(r, c, QTableWidgetItem("" if v is None else f"{v:g}"))
+
+    def _on_reset(self):
+        instr.reset()
+        self.refresh()
+
+    def _on_export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Diagnostics", "diagnostics.json", "JSON (*.json)")
+        if path:
+            instr.export(path)
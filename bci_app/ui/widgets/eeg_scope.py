@@ -0,0 +1,127 @@
+# bci_app/ui/widgets/eeg_scope.py
+import time
+
+import numpy as np
+import pyqtgraph as pg
+
+from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
+from PyQt6.QtCore import QTimer
+
+
+def minmax_decimate(data, n_bins, out=None):
+    """
+    Reduce (n_channels, n) samples to (n_channels, 2 * n_bins) by keeping
+    each bin's min and max, interleaved. Drawn as a connected line this
+    looks the same as the full-rate trace at `n_bins` pixels: spikes and
+    railed stretches survive, unlike plain subsampling.
+    """
+    n_channels, n = data.shape
+    n_bins = min(n_bins, n)
+    if out is None:
+        out = np.empty((n_channels, 2 * n_bins), dtype=data.dtype)
+    edges = (np.arange(n_bins) * n) // n_bins
+    np.minimum.reduceat(data, edges, axis=1, out=out[:, 0::2])
+    np.maximum.reduceat(data, edges, axis=1, out=out[:, 1::2])
+    return out
+
+
+class EEGScopeWidget(QWidget):
+    """
+    Live multi-channel scope over a SampleRingBuffer.
+
+    The scope polls the buffer on its own timer (it is never fed through
+    Qt signals), decimates the visible window to the plot's pixel width and
+    writes into preallocated arrays, so the per-frame cost depends on the
+    screen width, not on sampling rate or channel count. It only runs while
+    visible. Channels with a flat or railed signal are drawn in red.
+    """
+
+    def __init__(self, buffer, sampling_rate, n_channels, window_s=5.0, fps=30,
+                 spacing_uv=100.0, rail_uv=1000.0, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.sampling_rate = sampling_rate
+        self.n_channels = n_channels
+        self.window = int(round(window_s * sampling_rate))
+        self.spacing = spacing_uv
+        self.rail = rail_uv
+
+        self.plot = pg.PlotWidget()
+        self.plot.setMouseEnabled(x=False, y=False)
+        self.plot.hideButtons()
+        self.plot.setBackground("w")
+        self.plot.setXRange(-window_s, 0, padding=0)
+        self.plot.setYRange(-self.spacing, self.spacing * n_channels, padding=0)
+        self.plot.getAxis("left").setTicks([[(i * self.spacing, f"Ch{i + 1}") for i in range(n_channels)]])
+        self.plot.setLabel("bottom", "s")
+        self._ok_pen = pg.mkPen("k", width=1)
+        self._bad_pen = pg.mkPen("r", width=1)
+        self.curves = [self.plot.plot(pen=self._ok_pen, skipFiniteCheck=True) for _ in range(n_channels)]
+        self._bad = np.zeros(n_channels, dtype=bool)
+
+        self.frameLabel = QLabel("")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.plot)
+        layout.addWidget(self.frameLabel)
+
+        # preallocated for the widest screen we expect; frames use a prefix
+        self._max_bins = 4096
+        self._y = np.empty((n_channels, 2 * self._max_bins))
+        self._x = np.empty(2 * self._max_bins)
+        self._x_key = None
+        self._offsets = (np.arange(n_channels) * self.spacing)[:, None]
+        self._frame_ms = 0.0
+        self._last_tick = None
+        self._interval_ms = 0.0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(1000 / fps))
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        t0 = time.perf_counter()
+        head = self.buffer.head
+        n = min(self.window, head - self.buffer.tail)
+        if n >= 2:
+            data = self.buffer.view(head - n, head)[:self.n_channels]
+            bins = min(self._max_bins, max(1, self.plot.width()), n)
+            y = minmax_decimate(data, bins, out=self._y[:, :2 * bins])
+            # the decimated trace keeps every bin's extremes, so this is the raw spread
+            spread = y.max(axis=1) - y.min(axis=1)
+            bad = (spread == 0) | (spread > 2 * self.rail)
+            # remove each channel's DC so channels sit on their own baseline
+            y -= y.mean(axis=1, keepdims=True)
+            np.clip(y, -self.spacing, self.spacing, out=y)
+            y += self._offsets
+            x = self._x[:2 * bins]
+            if self._x_key != (bins, n):
+                self._x_key = (bins, n)
+                x[0::2] = x[1::2] = (np.arange(bins) * n // bins - n) / self.sampling_rate
+            for i, curve in enumerate(self.curves):
+                if bad[i] != self._bad[i]:
+                    curve.setPen(self._bad_pen if bad[i] else self._ok_pen)
+                curve.setData(x, y[i])
+            self._bad = bad
+
+        # exponential averages of the work per frame and of the frame interval
+        self._frame_ms += 0.1 * ((time.perf_counter() - t0) * 1e3 - self._frame_ms)
+        if self._last_tick is not None:
+            self._interval_ms += 0.1 * ((t0 - self._last_tick) * 1e3 - self._interval_ms)
+        self._last_tick = t0
+        fps = 1000.0 / self._interval_ms if self._interval_ms else 0.0
+        bad_txt = ", ".join(f"Ch{i + 1}" for i in np.flatnonzero(self._bad))
+        self.frameLabel.setText(f"frame {self._frame_ms:.1f} ms · {fps:.0f} fps"
+                                + (f" · check {bad_txt}" if bad_txt else ""))
+
+    @property
+    def frame_ms(self):
+        return self._frame_ms
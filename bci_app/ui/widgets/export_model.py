@@ -1,7 +1,284 @@
 # bci_app/ui/widgets/export_model.py
-from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
+import pickle
+from pathlib import Path
+
+from PyQt6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QMessageBox, QCheckBox
+)
+from PyQt6.QtCore import QThread, Qt, pyqtSignal
+
+from bci_app.core.config import get_session_cfg
+from bci_app.core.export import export_model
+from bci_app.core.mlp import train_session_mlp
+from bci_app.core.processing import DEFAULT_BANDS, StreamingFilterBank
+from bci_app.core.storage import ensure_box_subfolder
+
+
+class MLPTrainingThread(QThread):
+    """
+    Runs train_session_mlp (load, filter, fit, quantize, evaluate) off the
+    GUI thread. Emits `done(mlp, qmlp, report)` or `failed(message)`.
+    """
+    done = pyqtSignal(object, object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, paths, sampling_rate, bands, window_s, notch, order, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.sampling_rate = sampling_rate
+        self.bands = bands
+        self.window_s = window_s
+        self.notch = notch
+        self.order = order
+
+    def run(self):
+        try:
+            mlp, qmlp, report = train_session_mlp(self.paths, self.sampling_rate, self.bands,
+                                                  window_s=self.window_s, notch=self.notch, order=self.order)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(mlp, qmlp, report)
+
+
 class ExportModelWidget(QWidget):
+    """
+    Writes the current model to the pickle-free .bcim format used by the
+    headless runtime and reports the artifact size and load time.
+
+    The model comes from the training page via `set_model`, from an MLP
+    trained here on recorded sessions, or from a legacy pickle written by
+    save_pickle_to_box. Unpickling runs code from the file, so a pickle is
+    only opened after an explicit confirmation and is converted to .bcim
+    right away. A session-trained MLP can be exported quantized to int8;
+    the page then reports the held-out accuracy change and the weight
+    memory saved.
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        l = QVBoxLayout(self)
-        l.addWidget(QLabel("Export Model — coming soon"))
+        self.cfg = get_session_cfg("demo")
+        self.classifier = None
+        self.filter_bank = None
+        self.metadata = {}
+        self.fsm_overrides = {}
+        self.quantized = None   # (QuantizedMLP, QuantizationReport) for a session-trained MLP
+        self.training = None
+
+        self.infoLabel = QLabel("No model loaded. Train one or load a pickled model.")
+        self.infoLabel.setWordWrap(True)
+        self.infoLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.reportLabel = QLabel("")
+        self.reportLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.loadBtn = QPushButton("Load Pickled Model…")
+        self.trainBtn = QPushButton("Train MLP from Sessions…")
+        self.exportBtn = QPushButton("Export…")
+        self.exportBtn.setEnabled(False)
+        self.int8Check = QCheckBox("Quantize to int8")
+        self.int8Check.setEnabled(False)
+        self.loadBtn.clicked.connect(self._on_load)
+        self.trainBtn.clicked.connect(self._on_train_mlp)
+        self.exportBtn.clicked.connect(self._on_export)
+
+        btns = QHBoxLayout()
+        btns.addWidget(self.loadBtn)
+        btns.addWidget(self.trainBtn)
+        btns.addWidget(self.int8Check)
+        btns.addWidget(self.exportBtn)
+
+        self._layout = QVBoxLayout(self)
+        self._layout.addWidget(QLabel("<h2>Export Model</h2>"))
+        self._layout.addWidget(self.infoLabel)
+        self._layout.addWidget(self.reportLabel)
+        self._layout.addStretch(1)
+        self._layout.addLayout(btns)
+
+    def add_back_button(self, callback):
+        btn = QPushButton("Back")
+        btn.clicked.connect(callback)
+        self._layout.addWidget(btn)
+
+    def set_model(self, classifier, filter_bank=None, metadata=None, fsm_config=None):
+        """
+        Hand a trained classifier (and the filter bank it was trained with) to
+        the page. `fsm_config` overrides the config's FSM settings, e.g. a
+        threshold adapted during online training.
+        """
+        bc = self.cfg["board"]
+        self.classifier = classifier
+        self.filter_bank = filter_bank or StreamingFilterBank.from_config(
+            self.cfg.get("processing"), bc["sampling_rate"], bc.get("n_channels", 8)
+        )
+        self.metadata = dict(metadata or {})
+        self.fsm_overrides = dict(fsm_config or {})
+        self.quantized = None
+        self.int8Check.setChecked(False)
+        self.int8Check.setEnabled(False)
+        self.infoLabel.setText(
+            f"Model ready: {type(classifier).__name__}, "
+            f"{self.filter_bank.n_channels} channels, {self.filter_bank.n_bands} bands"
+        )
+        self.reportLabel.setText("")
+        self.exportBtn.setEnabled(True)
+
+    def _default_dir(self):
+        try:
+            return str(ensure_box_subfolder("models"))
+        except FileNotFoundError:
+            return str(Path.home())
+
+    def _on_load(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Load Pickled Model", self._default_dir(), "Pickle (*.pkl)")
+        if not path:
+            return
+        target = Path(path).with_suffix(".bcim")
+        assumed = self._filter_settings()
+        answer = QMessageBox.question(
+            self, "Load Legacy Pickle",
+            f"Opening {Path(path).name} runs any code stored in the pickle. "
+            f"Only continue if you created the file or trust where it came from.\n\n"
+            f"Unless the pickle stores its own settings, the model is assumed to be trained with "
+            f"the current config: {self._settings_text(assumed)}. A model trained with other "
+            f"settings would convert to a file that loads but classifies wrongly.\n\n"
+            f"The model will be converted once to {target.name}; use that file from now on.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            with open(path, "rb") as f:
+                obj = pickle.load(f)
+        except Exception as e:
+            QMessageBox.warning(self, "Load Failed", f"Could not load {path}:\n{e}")
+            return
+        classifier, stored = obj, {}
+        if isinstance(obj, dict):   # {"classifier"/"model": ..., plus optional filter settings}
+            classifier = obj.get("classifier", obj.get("model"))
+            stored = {k: obj[k] for k in assumed if k in obj}
+        if stored:
+            stored["bands"] = [list(b) for b in stored.get("bands", assumed["bands"])]
+        differ = {k: v for k, v in stored.items() if v != assumed[k]}
+        if differ:
+            QMessageBox.warning(
+                self, "Load Refused",
+                f"{Path(path).name} was trained with {self._settings_text(dict(assumed, **differ))}, "
+                f"but the current config uses {self._settings_text(assumed)}. "
+                f"Switch the config to the model's settings to convert it.",
+            )
+            return
+        metadata = {"source": Path(path).name, "converted_from": "pickle"}
+        missing = {k: v for k, v in assumed.items() if k not in stored}
+        if missing:
+            metadata["assumed_filter_settings"] = missing
+        self.set_model(classifier, metadata=metadata)
+        try:
+            report = self._export(target)
+        except Exception as e:
+            QMessageBox.warning(self, "Conversion Failed", f"Could not convert {path} to .bcim:\n{e}")
+            return
+        text = f"Converted to {report.path} ({report.size_bytes / 1024:.1f} KiB)"
+        if missing:
+            text += f"\nAssumed from the config: {', '.join(missing)}"
+        self.reportLabel.setText(text)
+
+    def _filter_settings(self):
+        """Filter settings of the current config, as a converted pickle's filter bank uses them."""
+        proc = self.cfg.get("processing") or {}
+        return {
+            "sampling_rate": self.cfg["board"]["sampling_rate"],
+            "bands": [list(b) for b in proc.get("bands", DEFAULT_BANDS)],
+            "notch": proc.get("notch", 60.0),
+            "order": proc.get("order", 4),
+        }
+
+    @staticmethod
+    def _settings_text(s):
+        bands = ", ".join(f"{lo:g}-{hi:g}" for lo, hi in s["bands"])
+        return f"{s['sampling_rate']} Hz, bands {bands} Hz, notch {s['notch']} Hz, order {s['order']}"
+
+    def _on_train_mlp(self):
+        try:
+            start = str(ensure_box_subfolder())
+        except FileNotFoundError:
+            start = str(Path.home())
+        paths, _ = QFileDialog.getOpenFileNames(self, "Training Sessions", start, "Sessions (*.npz)")
+        if not paths:
+            return
+        proc = self.cfg.get("processing") or {}
+        self.training = MLPTrainingThread(
+            paths, self.cfg["board"]["sampling_rate"], proc.get("bands", DEFAULT_BANDS),
+            self.cfg.get("infer", {}).get("window_s", 2.0), proc.get("notch", 60.0), proc.get("order", 4), self,
+        )
+        self.training.done.connect(self._on_mlp_trained)
+        self.training.failed.connect(self._on_mlp_failed)
+        self._set_busy(True)
+        self.reportLabel.setText(f"Training an MLP on {len(paths)} sessions…")
+        self.training.start()
+
+    def _set_busy(self, busy):
+        self.loadBtn.setEnabled(not busy)
+        self.trainBtn.setEnabled(not busy)
+        self.exportBtn.setEnabled(not busy and self.classifier is not None)
+
+    def _on_mlp_failed(self, message):
+        self._set_busy(False)
+        self.reportLabel.setText("")
+        QMessageBox.warning(self, "Training Failed", f"Could not train an MLP:\n{message}")
+
+    def _on_mlp_trained(self, mlp, qmlp, report):
+        self._set_busy(False)
+        proc = self.cfg.get("processing") or {}
+        bands = self.training.bands
+        fb = StreamingFilterBank.from_config(proc, self.training.sampling_rate, mlp.mean.shape[0] // len(bands))
+        self.set_model(mlp, fb, metadata={"source": f"MLP on {len(self.training.paths)} sessions"})
+        self.quantized = (qmlp, report)
+        self.int8Check.setEnabled(True)
+        self.int8Check.setChecked(True)
+        self.reportLabel.setText(self._quantization_text(report))
+
+    @staticmethod
+    def _quantization_text(q):
+        return (
+            f"Held-out accuracy: float {q.float_accuracy:.1%}, int8 {q.int8_accuracy:.1%} "
+            f"({q.accuracy_delta:+.1%}), {q.agreement:.1%} agreement\n"
+            f"Weights {q.float_bytes / 1024:.1f} -> {q.int8_bytes / 1024:.1f} KiB, "
+            f"{q.float_us_per_window:.1f} -> {q.int8_us_per_window:.1f} us per window"
+        )
+
+    def _int8(self):
+        return self.quantized is not None and self.int8Check.isChecked()
+
+    def _export(self, path):
+        train = self.cfg.get("train", {})
+        fsm_cfg = {k: train[k] for k in ("threshold", "refractory_ms", "debounce", "hysteresis") if k in train}
+        fsm_cfg.update(self.fsm_overrides)
+        classifier, metadata = self.classifier, dict(self.metadata)
+        if self._int8():
+            classifier = self.quantized[0]
+            metadata["quantized"] = True
+        return export_model(
+            path, classifier, self.filter_bank,
+            fsm_config=fsm_cfg, infer_config=self.cfg.get("infer", {}), metadata=metadata,
+        )
+
+    def _on_export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Model", str(Path(self._default_dir()) / "model.bcim"), "BCI model (*.bcim)"
+        )
+        if not path:
+            return
+        int8 = self._int8()
+        try:
+            report = self._export(path)
+        except Exception as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not export model:\n{e}")
+            return
+        text = (
+            f"Saved {report.path}{' (int8)' if int8 else ''}\n"
+            f"{report.size_bytes / 1024:.1f} KiB, {report.n_arrays} arrays, loads in {report.load_ms:.2f} ms"
+        )
+        if int8:
+            text += "\n" + self._quantization_text(self.quantized[1])
+        self.reportLabel.setText(text)
@@ -1,7 +1,321 @@
 # bci_app/ui/widgets/online_training.py
-from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
+import time
+
+import numpy as np
+
+from PyQt6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QProgressBar, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import QThread, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QFont
+
+from bci_app.core.adaptive import AdaptiveLDA, AdaptiveThreshold
+from bci_app.core.config import get_session_cfg
+from bci_app.core.inference import SlidingWindowEngine
+from bci_app.core.processing import StreamingFilterBank
+from bci_app.core.segmentation import Marker, cue_sample
+from bci_app.core.storage import ensure_box_subfolder
+from bci_app.core.training import CovarianceCache, CovarianceSettings, train_csp_lda
+from bci_app.hw.fake_board import FakeBoard
+from bci_app.hw.factory import create_board
+
+# Feedback signals are throttled to this interval; the classifier itself
+# sees every window.
+FEEDBACK_INTERVAL_S = 0.05
+STATS_INTERVAL_S = 1.0
+
+
+class OnlineTrainingThread(QThread):
+    """
+    Acquisition + sliding-window classification + adaptation, off the GUI
+    thread. The GUI sets the current cue with `set_cue`, as a Marker on the
+    acquisition sample clock; every window that lies entirely inside a
+    labeled cue (after `skip_s`) updates the classifier and the threshold.
+    """
+    confidence = pyqtSignal(float, float)   # P(SWITCH), threshold
+    stats = pyqtSignal(dict)
+
+    def __init__(self, board, engine, threshold: AdaptiveThreshold, chunk_s=0.02, skip_s=0.5, parent=None):
+        super().__init__(parent)
+        self.board = board
+        self.engine = engine
+        self.classifier = engine.classifier
+        self.threshold = threshold
+        self.buffer = board.create_ring_buffer(seconds=10.0)
+        self.chunk = max(1, int(round(chunk_s * board.sampling_rate)))
+        self.skip = int(round(skip_s * board.sampling_rate))
+        self._cue = Marker(0, None)
+        self._running = False
+
+    def set_cue(self, label, name=""):
+        """Start a cue now (label 0/1, or None for an unlabeled phase)."""
+        self._cue = Marker(cue_sample(self.buffer), label, name)
+
+    def run(self):
+        n_updates, n_correct, n_scored = [0, 0], 0, 0
+        last_emit = last_stats = 0.0
+        try:
+            self.board.connect()
+            self.board.start_stream()
+            self.buffer.reset()
+            self.engine.reset()
+            self._running = True
+            while self._running:
+                prev = self.buffer.head
+                head = self.board.read_into(self.buffer, self.chunk)
+                if head == prev:
+                    continue
+                arrived = None if self.board.wall_clock_timestamps else time.time()
+                results = self.engine.push(self.buffer.view(prev, head), self.buffer.timestamps(prev, head), arrived)
+                cue = self._cue
+                label = cue.label
+                for r in results:
+                    if label is None or r.sample - self.engine.window < cue.sample + self.skip:
+                        continue
+                    n_scored += 1
+                    n_correct += int((r.proba >= 0.5) == bool(label))
+                    self.threshold.update(r.proba, label)
+                    self.classifier.update(r.features, label)
+                    n_updates[label] += 1
+
+                now = time.perf_counter()
+                if results and now - last_emit >= FEEDBACK_INTERVAL_S:
+                    last_emit = now
+                    self.confidence.emit(float(results[-1].proba), self.threshold.value)
+                if now - last_stats >= STATS_INTERVAL_S:
+                    last_stats = now
+                    self.stats.emit({
+                        "updates": tuple(n_updates),
+                        "accuracy": n_correct / n_scored if n_scored else float("nan"),
+                        "threshold": self.threshold.value,
+                        "tpr": self.threshold.rate_above(1),
+                        "fpr": self.threshold.rate_above(0),
+                    })
+        except Exception as e:
+            print(f"Board error: {e}")
+        finally:
+            self.board.stop_stream()
+            self.board.disconnect()
+
+    def stop(self):
+        self._running = False
+        self.wait()
+
+
+class CalibrationThread(QThread):
+    """
+    Fits CSP+LDA on recorded sessions and seeds an AdaptiveLDA from it, off
+    the GUI thread. Emits `done(classifier, train_accuracy, n_trials)` or
+    `failed(message)`.
+    """
+    done = pyqtSignal(object, float, int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, paths, settings, cache, forgetting, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.settings = settings
+        self.cache = cache
+        self.forgetting = forgetting
+
+    def run(self):
+        try:
+            data, labels = [], []
+            for p in self.paths:
+                with np.load(p) as z:
+                    data.append(z["data"])
+                    labels.append(z["labels"])
+            data, labels = np.concatenate(data), np.concatenate(labels)
+            result = train_csp_lda(data, labels, self.settings, cache=self.cache)
+            cs = self.cache.get(data, labels, self.settings)
+            feats = result.classifier.features(cs.windows)
+            classifier = AdaptiveLDA.from_features(
+                feats.reshape(-1, feats.shape[-1]), np.repeat(cs.labels, feats.shape[1]),
+                forgetting=self.forgetting, spatial_filters=result.classifier.spatial_filters,
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(classifier, float(result.train_accuracy), len(labels))
+
+
 class OnlineTrainingWidget(QWidget):
+    """
+    Online calibration: alternating SWITCH / REST cues with a live
+    confidence bar while the classifier adapts window by window.
+
+    Starts from a CSP+LDA fit of recorded sessions when loaded, otherwise
+    from a cold per-channel band-power model. `modelReady` hands the
+    adapted model to the export page.
+    """
+    modelReady = pyqtSignal(object, object, dict, dict)   # classifier, filter bank, metadata, FSM overrides
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        l = QVBoxLayout(self)
-        l.addWidget(QLabel("Online Training — coming soon"))
+        self.cfg = get_session_cfg("demo")
+        self.train_cfg = self.cfg.get("train", {})
+        self.board = create_board(self.cfg["board"])
+        self.cache = CovarianceCache()
+        self.classifier = None
+        self.thread = None
+        self.calibration = None
+        self.source = "cold start"
+
+        # Cue tuples: (display, seconds, label, color)
+        block_s = self.train_cfg.get("block_s", 6.0)
+        self.cues = [
+            ("Get ready: SWITCH", 2.0,     None, "darkblue"),
+            ("Imagine SWITCH",    block_s, 1,    "blue"),
+            ("Get ready: REST",   2.0,     None, "darkgreen"),
+            ("Imagine REST",      block_s, 0,    "green"),
+        ]
+        self.cue_idx = 0
+        self.cue_timer = QTimer(self)
+        self.cue_timer.setSingleShot(True)
+        self.cue_timer.timeout.connect(self._next_cue)
+
+        self._create_ui()
+
+    def _create_ui(self):
+        self.infoLabel = QLabel("Model: cold start (load recorded sessions to start from CSP+LDA)")
+        self.infoLabel.setWordWrap(True)
+        self.infoLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.cueLabel = QLabel("")
+        self.cueLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        font = QFont()
+        font.setPointSize(32)
+        font.setBold(True)
+        self.cueLabel.setFont(font)
+
+        self.confidenceBar = QProgressBar()
+        self.confidenceBar.setRange(0, 1000)
+        self.confidenceBar.setFormat("P(SWITCH) %p%")
+        self.confidenceBar.setFixedHeight(30)
+        self.thresholdLabel = QLabel("")
+        self.thresholdLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.statsLabel = QLabel("")
+        self.statsLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.loadBtn = QPushButton("Load Recorded Sessions…")
+        self.startBtn = QPushButton("Start")
+        self.stopBtn = QPushButton("Stop")
+        self.stopBtn.setEnabled(False)
+        self.exportBtn = QPushButton("Send to Export")
+        self.exportBtn.setEnabled(False)
+        self.loadBtn.clicked.connect(self._on_load)
+        self.startBtn.clicked.connect(self._on_start)
+        self.stopBtn.clicked.connect(self._on_stop)
+        self.exportBtn.clicked.connect(self._on_export)
+
+        btns = QHBoxLayout()
+        for b in (self.loadBtn, self.startBtn, self.stopBtn, self.exportBtn):
+            btns.addWidget(b)
+
+        self._layout = QVBoxLayout(self)
+        self._layout.addWidget(QLabel("<h2>Online Training</h2>"))
+        self._layout.addWidget(self.infoLabel)
+        self._layout.addStretch(1)
+        self._layout.addWidget(self.cueLabel)
+        self._layout.addWidget(self.confidenceBar)
+        self._layout.addWidget(self.thresholdLabel)
+        self._layout.addWidget(self.statsLabel)
+        self._layout.addStretch(1)
+        self._layout.addLayout(btns)
+
+    def add_back_button(self, callback):
+        btn = QPushButton("Back")
+        btn.clicked.connect(callback)
+        self._layout.addWidget(btn)
+
+    def _filter_bank(self):
+        return StreamingFilterBank.from_config(self.cfg.get("processing"), self.board.sampling_rate,
+                                               self.board.n_channels)
+
+    def _on_load(self):
+        try:
+            start = str(ensure_box_subfolder())
+        except FileNotFoundError:
+            start = ""
+        paths, _ = QFileDialog.getOpenFileNames(self, "Recorded Sessions", start, "EEG sessions (*.npz)")
+        if not paths:
+            return
+        settings = CovarianceSettings.from_config(self.cfg, self.board.sampling_rate)
+        self.calibration = CalibrationThread(paths, settings, self.cache,
+                                             self.train_cfg.get("forgetting", 0.998), self)
+        self.calibration.done.connect(self._on_calibrated)
+        self.calibration.failed.connect(self._on_calibration_failed)
+        self.loadBtn.setEnabled(False)
+        self.startBtn.setEnabled(False)
+        self.infoLabel.setText(f"Training CSP+LDA on {len(paths)} sessions…")
+        self.calibration.start()
+
+    def _on_calibrated(self, classifier, accuracy, n_trials):
+        self.classifier = classifier
+        self.source = f"CSP+LDA on {n_trials} trials"
+        self.infoLabel.setText(f"Model: {self.source} ({accuracy:.0%} window accuracy), adapting online")
+        self.loadBtn.setEnabled(True)
+        self.startBtn.setEnabled(True)
+
+    def _on_calibration_failed(self, message):
+        self.infoLabel.setText(f"Model: {self.source}")
+        self.loadBtn.setEnabled(True)
+        self.startBtn.setEnabled(True)
+        QMessageBox.warning(self, "Training Failed", f"Could not train from the selected sessions:\n{message}")
+
+    def _on_start(self):
+        if self.classifier is None:
+            fb = self._filter_bank()
+            self.classifier = AdaptiveLDA.cold(fb.n_bands * fb.n_channels,
+                                               forgetting=self.train_cfg.get("forgetting", 0.998))
+        infer = self.cfg.get("infer", {})
+        engine = SlidingWindowEngine(self._filter_bank(), window_s=infer.get("window_s", 2.0),
+                                     step_s=infer.get("step_s", 0.04), classifier=self.classifier)
+        self.thread = OnlineTrainingThread(self.board, engine, AdaptiveThreshold.from_config(self.train_cfg),
+                                           chunk_s=infer.get("chunk_s", 0.02))
+        self.thread.confidence.connect(self._on_confidence)
+        self.thread.stats.connect(self._on_stats)
+        self.thread.start()
+
+        self.loadBtn.setEnabled(False)
+        self.startBtn.setEnabled(False)
+        self.stopBtn.setEnabled(True)
+        self.exportBtn.setEnabled(False)
+        self.cue_idx = 0
+        self._next_cue()
+
+    def _next_cue(self):
+        name, seconds, label, color = self.cues[self.cue_idx]
+        self.cue_idx = (self.cue_idx + 1) % len(self.cues)
+        self.cueLabel.setText(name)
+        self.cueLabel.setStyleSheet(f"color: {color};")
+        if isinstance(self.board, FakeBoard) and label is not None:
+            self.board.set_class(label)
+        self.thread.set_cue(label, name)
+        self.cue_timer.start(int(seconds * 1000))
+
+    def _on_stop(self):
+        self.cue_timer.stop()
+        if self.thread is not None:
+            self.thread.stop()
+        self.cueLabel.setText("Stopped")
+        self.cueLabel.setStyleSheet("color: black;")
+        self.loadBtn.setEnabled(True)
+        self.startBtn.setEnabled(True)
+        self.stopBtn.setEnabled(False)
+        self.exportBtn.setEnabled(True)
+
+    def _on_confidence(self, proba, threshold):
+        self.confidenceBar.setValue(int(proba * 1000))
+        self.thresholdLabel.setText(f"Threshold {threshold:.2f}" + ("  ▲" if proba >= threshold else ""))
+
+    def _on_stats(self, s):
+        self.statsLabel.setText(
+            f"Updates SWITCH {s['updates'][1]} / REST {s['updates'][0]}   "
+            f"accuracy {s['accuracy']:.0%}   TPR {s['tpr']:.0%}   FPR {s['fpr']:.0%}"
+        )
+
+    def _on_export(self):
+        metadata = {"source": self.source, "adapted_windows": self.classifier.n_updates}
+        fsm = {"threshold": round(self.thread.threshold.value, 3)} if self.thread is not None else {}
+        self.modelReady.emit(self.classifier.to_linear(), self._filter_bank(), metadata, fsm)
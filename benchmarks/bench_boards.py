@@ -0,0 +1,72 @@
+# benchmarks/bench_boards.py
+"""
+Sustained throughput and read latency of the board drivers.
+
+    python -m benchmarks.bench_boards [--seconds 5] [--chunk 25]
+
+Each board is read for `--seconds` of wall time in `--chunk`-sample reads.
+Reported per board: samples/s, read latency p50/p95/max (ms) and, for
+BrainFlow boards, dropped packets / late reads.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bci_app.hw.fake_board import FakeBoard
+
+
+def bench_board(board, seconds, chunk):
+    ring = board.create_ring_buffer(seconds=10)
+    board.connect()
+    board.start_stream()
+    lat = []
+    try:
+        t_end = time.perf_counter() + seconds
+        t0 = time.perf_counter()
+        while time.perf_counter() < t_end:
+            t = time.perf_counter()
+            board.read_into(ring, chunk)
+            lat.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - t0
+    finally:
+        board.stop_stream()
+        board.disconnect()
+    lat = np.asarray(lat) * 1e3
+    result = {
+        "samples_per_s": ring.head / elapsed,
+        "read_ms_p50": float(np.percentile(lat, 50)),
+        "read_ms_p95": float(np.percentile(lat, 95)),
+        "read_ms_max": float(lat.max()),
+    }
+    if hasattr(board, "stats"):
+        result.update(board.stats())
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--chunk", type=int, default=25)
+    args = ap.parse_args()
+
+    boards = {
+        "fake-realtime": lambda: FakeBoard("", 250, 8, seed=0, clock="realtime"),
+        "fake-free": lambda: FakeBoard("", 250, 8, seed=0, clock="free"),
+    }
+    try:
+        from brainflow.board_shim import BoardShim, BoardIds
+        from bci_app.hw.cyton_board import CytonBoard
+        BoardShim.disable_board_logger()
+        boards["brainflow-synthetic"] = lambda: CytonBoard("", board_id=BoardIds.SYNTHETIC_BOARD.value, n_channels=8)
+    except ImportError:
+        print("brainflow not installed, skipping CytonBoard")
+
+    results = {name: bench_board(make(), args.seconds, args.chunk) for name, make in boards.items()}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_lsl.py
+"""
+Loopback throughput and latency of the LSL bridge.
+
+    python -m benchmarks.bench_lsl [--channels 8 16 32] [--rate 250] [--chunks 5 25]
+                                   [--seconds 5]
+
+A spawned producer process streams FakeBoard data through an LSLOutlet.
+This process reads it back with LSLBoard in chunks. Every combination is
+run twice:
+- free:     the producer pushes as fast as it can (throughput, samples/s)
+- realtime: the producer is paced at the sampling rate (latency from push
+            to the inlet's read returning, p50/p95/max ms)
+Samples lost or duplicated on the way are counted.
+
+Needs pylsl with the native liblsl library.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from bci_app.hw.fake_board import FakeBoard
+from bci_app.hw.lsl_bridge import LSLBoard, LSLOutlet
+
+
+def produce(name, n_channels, fs, chunk, n_samples, clock):
+    board = FakeBoard("", fs, n_channels, seed=0, clock=clock)
+    outlet = LSLOutlet(name, n_channels, fs)
+    if not outlet.wait_for_consumers(30):
+        return
+    time.sleep(0.2)   # let the consumer open and flush its inlet
+    board.start_stream()
+    for _ in range(n_samples // chunk):
+        # no timestamps: the outlet stamps each chunk with the push time
+        outlet.append(board.read_buffer(chunk))
+    time.sleep(2.0)   # keep the outlet alive until the consumer has drained it
+    outlet.close()
+
+
+def bench(n_channels, fs, chunk, seconds, clock):
+    name = f"bench-lsl-{n_channels}-{chunk}-{clock}-{time.time_ns()}"
+    n_samples = int(seconds * fs) // chunk * chunk
+    ctx = mp.get_context("spawn")
+    proc = ctx.Process(target=produce, args=(name, n_channels, fs, chunk, n_samples, clock), daemon=True)
+    proc.start()
+    try:
+        board = LSLBoard(name, resolve_timeout=30.0, read_timeout=1.0)
+        board.connect()
+        board.start_stream()
+        got, lat, t_first, t_last = 0, [], None, None
+        while got < n_samples:
+            data, ts = board.read_timestamped(chunk)
+            now = time.time()
+            if not data.shape[1]:
+                break   # producer finished (or stalled for read_timeout)
+            if t_first is None:
+                t_first = now
+            t_last = now
+            got += data.shape[1]
+            lat.append(now - ts[-1])
+        board.stop_stream()
+        board.disconnect()
+    finally:
+        proc.join(10)
+        if proc.is_alive():
+            proc.terminate()
+    lat = np.asarray(lat) * 1e3
+    span = (t_last - t_first) if t_first is not None and t_last > t_first else float("nan")
+    return {
+        "samples": got,
+        "missing": n_samples - got,
+        "samples_per_s": round(got / span, 1) if span == span else None,
+        "latency_ms_p50": round(float(np.percentile(lat, 50)), 3) if len(lat) else None,
+        "latency_ms_p95": round(float(np.percentile(lat, 95)), 3) if len(lat) else None,
+        "latency_ms_max": round(float(lat.max()), 3) if len(lat) else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--channels", type=int, nargs="+", default=[8, 16, 32])
+    ap.add_argument("--rate", type=int, default=250)
+    ap.add_argument("--chunks", type=int, nargs="+", default=[5, 25])
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args()
+
+    results = {}
+    for n_channels in args.channels:
+        for chunk in args.chunks:
+            key = f"{n_channels}ch/{chunk}"
+            results[key] = {clock: bench(n_channels, args.rate, chunk, args.seconds, clock)
+                            for clock in ("free", "realtime")}
+    print(json.dumps({"rate": args.rate, "loopback": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark of the acquisition -> inference pipeline.
+
+    python -m benchmarks.bench_pipeline [--channels 8 16 32] [--rates 250 500 1000]
+                                        [--steps 0.02 0.04 0.1] [--seconds 20]
+                                        [--replay path/to/raw_session]
+                                        [--out results.json] [--baseline old.json]
+
+Every (channels, sampling rate, hop) configuration streams `--seconds` of
+FakeBoard data (or a recorded session with --replay, looped) through the
+same stages as InferenceRuntime plus a RawSessionRecorder:
+
+    board.read_into -> ring buffer -> filter bank -> window covariance
+      -> features -> classifier -> ToggleFSM, and recorder.append
+
+with the board on a free-running clock, so the numbers measure compute,
+not pacing. Reported per configuration:
+- throughput: samples/s and real-time factor (stream seconds per wall second)
+- per-chunk end-to-end latency p50/p95/p99/max (exact, ms)
+- per-stage p50/p95/p99 from the instrumentation histograms (±6%)
+- peak traced memory (tracemalloc, measured in a separate shorter pass
+  because tracing slows allocation-heavy code down)
+
+With --baseline, configurations whose throughput drops or whose p95
+latency grows by more than --tolerance are listed and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from bci_app.core import instrumentation as instr
+from bci_app.core.fsm import ToggleFSM
+from bci_app.core.inference import LinearClassifier, SlidingWindowEngine
+from bci_app.core.processing import StreamingFilterBank
+from bci_app.core.storage import RawSessionRecorder
+from bci_app.hw.fake_board import FakeBoard
+from bci_app.hw.replay_board import ReplayBoard
+
+CHUNK_S = 0.02
+WINDOW_S = 2.0
+STAGES = {
+    "board.read": "acquire",
+    "filter.process": "filter",
+    "engine.push": "engine",
+    "engine.classify": "classify",
+    "fsm.update": "fsm",
+    "storage.write": "storage",
+}
+
+
+def make_board(n_channels, fs, replay=None):
+    if replay:
+        return ReplayBoard(replay, sampling_rate=fs, clock="free", loop=True)
+    return FakeBoard("", fs, n_channels, seed=0, clock="free")
+
+
+def run_pipeline(board, n_channels, step_s, seconds, out_dir):
+    """Stream `seconds` of `board` through every stage; returns per-chunk latencies (s) and wall time."""
+    fs = board.sampling_rate
+    fb = StreamingFilterBank(fs, n_channels)
+    coef = np.random.default_rng(0).standard_normal(fb.n_bands * n_channels) * 0.1
+    engine = SlidingWindowEngine(fb, window_s=WINDOW_S, step_s=step_s, classifier=LinearClassifier(coef))
+    fsm = ToggleFSM(threshold=0.8, refractory_ms=500)
+    ring = board.create_ring_buffer(seconds=10.0)
+    recorder = RawSessionRecorder(out_dir, n_channels, fs)
+    chunk = max(1, int(round(CHUNK_S * fs)))
+    n_chunks = int(seconds * fs) // chunk
+
+    board.connect()
+    board.start_stream()
+    latencies = np.empty(n_chunks)
+    try:
+        t_start = time.perf_counter()
+        for k in range(n_chunks):
+            t0 = time.perf_counter()
+            prev = ring.head
+            head = board.read_into(ring, chunk)
+            arrived = None if board.wall_clock_timestamps else time.time()
+            data = ring.view(prev, head)[:n_channels]
+            ts = ring.timestamps(prev, head)
+            recorder.append(data, ts)
+            for r in engine.push(data, ts, arrived):
+                fsm.update(r.proba, r.sample, r.trail)
+            latencies[k] = time.perf_counter() - t0
+        wall = time.perf_counter() - t_start
+        recorder.close()
+    finally:
+        board.stop_stream()
+        board.disconnect()
+    return latencies, wall, n_chunks * chunk
+
+
+def bench_config(n_channels, fs, step_s, seconds, memory_s, replay=None):
+    with tempfile.TemporaryDirectory() as d:
+        instr.reset()
+        instr.enable()
+        try:
+            latencies, wall, n_samples = run_pipeline(make_board(n_channels, fs, replay), n_channels,
+                                                      step_s, seconds, os.path.join(d, "timed"))
+            snap = instr.snapshot()
+        finally:
+            instr.enable(False)
+            instr.reset()
+
+        tracemalloc.start()
+        try:
+            run_pipeline(make_board(n_channels, fs, replay), n_channels, step_s, memory_s,
+                         os.path.join(d, "traced"))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    lat_ms = latencies * 1e3
+    stages = {}
+    for metric, stage in STAGES.items():
+        t = snap["timings"].get(metric)
+        if t:
+            stages[stage] = {k: t[k] for k in ("count", "p50_ms", "p95_ms", "p99_ms")}
+    return {
+        "n_channels": n_channels,
+        "sampling_rate": fs,
+        "step_s": step_s,
+        "samples_per_s": round(n_samples / wall, 1),
+        "realtime_factor": round(n_samples / fs / wall, 2),
+        "chunk_ms": {
+            "p50": round(float(np.percentile(lat_ms, 50)), 4),
+            "p95": round(float(np.percentile(lat_ms, 95)), 4),
+            "p99": round(float(np.percentile(lat_ms, 99)), 4),
+            "max": round(float(lat_ms.max()), 4),
+        },
+        "stages": stages,
+        "peak_mb": round(peak / 1e6, 3),
+    }
+
+
+def config_key(r):
+    return f"{r['n_channels']}ch/{r['sampling_rate']}Hz/{r['step_s']}s"
+
+
+def compare(results, baseline, tolerance):
+    """Configurations that got slower than `baseline` by more than `tolerance` (fraction)."""
+    old = {config_key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        b = old.get(config_key(r))
+        if b is None:
+            continue
+        if r["samples_per_s"] < b["samples_per_s"] * (1 - tolerance):
+            regressions.append(f"{config_key(r)} throughput {b['samples_per_s']:.0f} -> {r['samples_per_s']:.0f} samples/s")
+        if r["chunk_ms"]["p95"] > b["chunk_ms"]["p95"] * (1 + tolerance):
+            regressions.append(f"{config_key(r)} p95 {b['chunk_ms']['p95']:.3f} -> {r['chunk_ms']['p95']:.3f} ms")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--channels", type=int, nargs="+", default=[8, 16, 32])
+    ap.add_argument("--rates", type=int, nargs="+", default=[250, 500, 1000])
+    ap.add_argument("--steps", type=float, nargs="+", default=[0.02, 0.04, 0.1])
+    ap.add_argument("--seconds", type=float, default=20.0, help="stream seconds per configuration")
+    ap.add_argument("--memory-seconds", type=float, default=5.0, help="stream seconds of the tracemalloc pass")
+    ap.add_argument("--replay", help="recorded raw session directory to stream instead of FakeBoard")
+    ap.add_argument("--out", help="also write the JSON results to this file")
+    ap.add_argument("--baseline", help="earlier --out file to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    args = ap.parse_args()
+
+    configs = []
+    if args.replay:
+        # channel count and rate are fixed by the recording; only channel subsets can vary
+        probe = ReplayBoard(args.replay, clock="free")
+        rates = [probe.sampling_rate]
+        channels = [c for c in args.channels if c <= probe.n_channels] or [probe.n_channels]
+    else:
+        rates, channels = args.rates, args.channels
+    for n_channels in channels:
+        for fs in rates:
+            for step_s in args.steps:
+                configs.append((n_channels, fs, step_s))
+
+    results = []
+    for n_channels, fs, step_s in configs:
+        print(f"[bench_pipeline] {n_channels} ch, {fs} Hz, hop {step_s} s", file=sys.stderr)
+        results.append(bench_config(n_channels, fs, step_s, args.seconds, args.memory_seconds, args.replay))
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "settings": {"seconds": args.seconds, "chunk_s": CHUNK_S, "window_s": WINDOW_S,
+                     "source": args.replay or "fake"},
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of the headless inference path versus the Qt GUI.
+
+    python -m benchmarks.bench_startup [--repeat 5]
+
+Every case runs in a fresh interpreter; the median wall time (ms) over
+`--repeat` runs is reported, including interpreter start-up.
+headless_first_step runs up to the first completed runtime step, so
+anything deferred to first use is counted.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+CASES = {
+    "python": "pass",
+    "numpy": "import numpy",
+    "headless_imports": (
+        "import bci_app.core.runtime, bci_app.core.config, bci_app.hw.factory"
+    ),
+    "headless_ready": (
+        "from bci_app.core.config import get_session_cfg\n"
+        "from bci_app.core.runtime import build_runtime\n"
+        "from bci_app.hw.factory import create_board\n"
+        "cfg = get_session_cfg('demo')\n"
+        "build_runtime(cfg, create_board(dict(cfg['board'], clock='free')))\n"
+    ),
+    "headless_first_step": (
+        "from bci_app.core.config import get_session_cfg\n"
+        "from bci_app.core.runtime import build_runtime\n"
+        "from bci_app.hw.factory import create_board\n"
+        "cfg = get_session_cfg('demo')\n"
+        "rt = build_runtime(cfg, create_board(dict(cfg['board'], clock='free')))\n"
+        "rt.board.connect()\n"
+        "rt.board.start_stream()\n"
+        "rt.step()\n"
+    ),
+    "gui_imports": "import PyQt6.QtWidgets, bci_app.ui.main_window",
+}
+
+
+def time_case(code, repeat):
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        runs.append((time.perf_counter() - t) * 1e3)
+    return statistics.median(runs)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    results = {}
+    for name, code in CASES.items():
+        try:
+            results[name] = round(time_case(code, args.repeat), 1)
+        except subprocess.CalledProcessError:
+            results[name] = None  # e.g. PyQt6 not installed on the target
+    print(json.dumps({"startup_ms": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_sweep.py
+"""
+Scaling of the CV sweep with worker count.
+
+    python -m benchmarks.bench_sweep [--sessions 4] [--workers 1 2 4 8]
+
+Generates FakeBoard sessions, then times run_sweep in-process and with
+each pool size. Speed-up is relative to the in-process run.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bci_app.core.sweep import SweepGrid, run_sweep
+from bci_app.hw.fake_board import FakeBoard
+
+FS = 250
+
+
+def make_sessions(directory, n_sessions, n_trials=40, seconds=4):
+    paths = []
+    for s in range(n_sessions):
+        board = FakeBoard("", FS, 8, seed=s, clock="free")
+        board.start_stream()
+        labels = np.arange(n_trials) % 2
+        data = []
+        for label in labels:
+            board.set_class(label)
+            data.append(board.read_buffer(seconds * FS))
+        path = Path(directory) / f"session{s}.npz"
+        np.savez(path, data=np.stack(data), labels=labels)
+        paths.append(path)
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=4)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = ap.parse_args()
+
+    grid = SweepGrid(bands=[((8, 12), (12, 16), (16, 20), (20, 24), (24, 30)), ((8, 13), (13, 30))],
+                     window_s=[1.0, 2.0])
+    with tempfile.TemporaryDirectory() as d:
+        paths = make_sessions(d, args.sessions)
+        t = time.perf_counter()
+        run_sweep(paths, FS, grid, workers=0)
+        serial = time.perf_counter() - t
+        # per session: 4 covariance tasks, each followed by 5 fold tasks
+        results = {"cpus": os.cpu_count(), "tasks": args.sessions * 4 * (1 + 5), "serial_s": round(serial, 3),
+                   "pool": {}}
+        for w in args.workers:
+            t = time.perf_counter()
+            run_sweep(paths, FS, grid, workers=w)
+            el = time.perf_counter() - t
+            results["pool"][w] = {"seconds": round(el, 3), "speedup": round(serial / el, 2)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
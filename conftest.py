@@ -0,0 +1,48 @@
+# conftest.py
+"""Synthetic motor-imagery data shared by the tests."""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bci_app.hw.fake_board import FakeBoard
+
+FS = 250
+
+
+def _epochs(n_trials=20, seconds=3, seed=0, n_channels=8):
+    """Alternating REST/SWITCH trials from a free-running FakeBoard: (data, labels)."""
+    board = FakeBoard("", FS, n_channels, seed=seed, clock="free")
+    board.start_stream()
+    labels = np.arange(n_trials) % 2
+    data = []
+    for label in labels:
+        board.set_class(label)
+        data.append(board.read_buffer(seconds * FS))
+    return np.stack(data), labels
+
+
+@pytest.fixture
+def synthetic_epochs():
+    """Factory: synthetic_epochs(n_trials=20, seconds=3, seed=0) -> (data, labels) at 250 Hz."""
+    return _epochs
+
+
+@pytest.fixture
+def synthetic_sessions(tmp_path):
+    """
+    Factory writing .npz sessions as the collection page saves them:
+    synthetic_sessions(n_sessions, n_trials=20, seconds=3, seed=0, directory=tmp_path)
+    -> paths; session i uses seed + i.
+    """
+    def make(n_sessions, n_trials=20, seconds=3, seed=0, directory=None):
+        directory = Path(directory or tmp_path)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for s in range(n_sessions):
+            data, labels = _epochs(n_trials, seconds, seed + s)
+            path = directory / f"session{s}.npz"
+            np.savez(path, data=data, labels=labels)
+            paths.append(path)
+        return paths
+    return make
@@ -0,0 +1,95 @@
+# infer.py
+"""
+Headless inference entry point (no Qt).
+
+    python infer.py --model model.bcim [--session demo] [--board fake] [--duration 60] [--threaded]
+                    [--lsl NAME]
+
+Runs acquisition -> filter bank -> sliding-window classifier -> toggle FSM
+and prints every toggle with its acquired->toggled latency. With --lsl the
+raw stream, toggles and classifier outputs are also published over LSL, so
+a recorder or GUI in another process can follow along (--board lsl
+--port NAME reads such a stream back).
+"""
+import time
+
+T_START = time.perf_counter()
+
+import argparse
+import json
+import signal
+
+from bci_app.core import instrumentation as instr
+from bci_app.core.config import get_session_cfg
+from bci_app.core.runtime import build_runtime, load_model
+from bci_app.core.session import build_session
+from bci_app.hw.factory import create_board
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless motor-imagery toggle inference")
+    ap.add_argument("--model", help="exported model file (omit to only extract features)")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--session", default="demo")
+    ap.add_argument("--board", help="override board.type from the config")
+    ap.add_argument("--replay", help="recorded session to replay (implies --board replay)")
+    ap.add_argument("--clock", help="override board.clock (realtime | accelerated | free)")
+    ap.add_argument("--duration", type=float, help="stop after this many seconds")
+    ap.add_argument("--profile", metavar="PATH",
+                    help="record stage timings/counters and write them to PATH (JSON) at the end")
+    ap.add_argument("--threaded", action="store_true",
+                    help="run acquisition / dsp / FSM as pipeline stages on worker threads")
+    ap.add_argument("--lsl", metavar="NAME",
+                    help="publish the stream, outputs and toggles as LSL streams NAME* (implies --threaded)")
+    ap.add_argument("--port", help="override board.port (the stream name for --board lsl)")
+    args = ap.parse_args()
+
+    cfg = get_session_cfg(args.session, args.config)
+    if args.profile:
+        instr.enable()
+    board_cfg = dict(cfg["board"])
+    if args.replay:
+        board_cfg.update(type="replay", path=args.replay)
+    elif args.board:
+        board_cfg["type"] = args.board
+    if args.clock:
+        board_cfg["clock"] = args.clock
+    if args.port:
+        board_cfg["port"] = args.port
+
+    model = load_model(args.model) if args.model else None
+    board = create_board(board_cfg)
+
+    outlet = None
+    kwargs = {}
+    if args.lsl:
+        from bci_app.hw.lsl_bridge import LSLOutlet
+        outlet = LSLOutlet(args.lsl, board.n_channels, board.sampling_rate)
+        # the Session's storage branch publishes raw chunks without touching the dsp path;
+        # every classifier output is pushed from the fsm stage (a non-blocking LSL push)
+        kwargs = {"recorder": outlet, "on_window": outlet.push_result}
+
+    def on_toggle(ev):
+        print(f"[infer] {ev.state.upper():6s} p={ev.proba:.2f} sample={ev.sample} "
+              f"latency={1e3 * ev.trail.total:.1f} ms", flush=True)
+        if outlet is not None:
+            outlet.push_toggle(ev)
+
+    build = build_session if args.threaded or args.lsl else build_runtime
+    runtime = build(cfg, board, model, on_toggle=on_toggle, **kwargs)
+    signal.signal(signal.SIGINT, lambda *_: runtime.stop())
+    signal.signal(signal.SIGTERM, lambda *_: runtime.stop())
+    print(f"[infer] ready in {1e3 * (time.perf_counter() - T_START):.0f} ms "
+          f"({board_cfg.get('type', 'fake')} board, model={'yes' if model else 'none'})", flush=True)
+
+    runtime.run(duration=args.duration)
+    summary = runtime.summary()
+    if outlet is not None:
+        outlet.close()
+    print(json.dumps(summary, indent=2))
+    if args.profile:
+        instr.export(args.profile, {"summary": summary})
+
+
+if __name__ == "__main__":
+    main()
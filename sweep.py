@@ -0,0 +1,61 @@
+# sweep.py
+"""
+Cross-validated hyperparameter sweep over recorded sessions.
+
+    python sweep.py SESSION.npz [...] [--session demo] [--workers 8] [--out sweep.csv]
+    python sweep.py --subject s1 [--kind training]
+
+The grid comes from the session config's `sweep` section; sessions are
+.npz files written by the collection page, given as paths or selected
+from the Box session catalog.
+"""
+import argparse
+import glob
+import json
+import time
+
+from bci_app.core.config import get_session_cfg
+from bci_app.core.storage import open_box_catalog
+from bci_app.core.sweep import SweepGrid, best, run_sweep
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parallel CV / hyperparameter sweep")
+    ap.add_argument("sessions", nargs="*", help=".npz sessions (globs allowed)")
+    ap.add_argument("--subject", nargs="+", help="select sessions from the catalog instead")
+    ap.add_argument("--kind", default="training", help="catalog session kind (with --subject)")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--session", default="demo")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--workers", type=int, help="process count (0 = in-process, default = all cores)")
+    ap.add_argument("--out", default="sweep_results.csv")
+    args = ap.parse_args()
+
+    cfg = get_session_cfg(args.session, args.config)
+    proc = cfg.get("processing") or {}
+    paths = sorted(p for pattern in args.sessions for p in glob.glob(pattern))
+    if args.subject:
+        fs = cfg["board"]["sampling_rate"]
+        records = open_box_catalog().query(subject=args.subject, kind=args.kind, sampling_rate=fs,
+                                           unknown_rate=True)
+        unknown = sum(r.sampling_rate is None for r in records)
+        if unknown:
+            print(f"[sweep] {unknown} catalog sessions have no recorded sampling rate; assuming {fs} Hz")
+        paths += [str(r.path) for r in records]
+    if not paths:
+        ap.error("no sessions given or found in the catalog")
+    grid = SweepGrid.from_config(cfg.get("sweep"))
+    print(f"[sweep] {len(paths)} sessions x {grid.size} settings x {args.folds} folds", flush=True)
+
+    t = time.perf_counter()
+    rows = run_sweep(
+        paths, cfg["board"]["sampling_rate"], grid, n_folds=args.folds, workers=args.workers,
+        order=proc.get("order", 4), notch=proc.get("notch", 60.0), out=args.out,
+        progress=lambda i, n: print(f"[sweep] {i}/{n} tasks", flush=True),
+    )
+    print(f"[sweep] done in {time.perf_counter() - t:.1f} s")
+    print(json.dumps(best(rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
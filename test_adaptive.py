@@ -0,0 +1,63 @@
+import numpy as np
+
+from bci_app.core.adaptive import AdaptiveLDA, AdaptiveThreshold
+
+
+def test_rank_one_updates_match_recursive_covariance():
+    rng = np.random.default_rng(0)
+    d, lam = 6, 0.99
+    clf = AdaptiveLDA.cold(d, forgetting=lam)
+    means = [np.zeros(d), np.zeros(d)]
+    cov = np.eye(d)
+    for i in range(300):
+        label = i % 2
+        x = rng.standard_normal(d) + 2.0 * label
+        if i < 2:
+            means[label] = x.copy()
+        else:
+            means[label] += (1 - lam) * (x - means[label])
+        dx = x - means[label]
+        cov = lam * cov + (1 - lam) * np.outer(dx, dx)
+        clf.update(x, label)
+    np.testing.assert_allclose(clf.precision, np.linalg.inv(cov), rtol=1e-8)
+    np.testing.assert_allclose(clf.coef, np.linalg.solve(cov, means[1] - means[0]), rtol=1e-8)
+
+
+def test_follows_drifting_classes():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((200, 4))
+    y = np.arange(200) % 2
+    X[y == 1, 0] += 2.0
+    clf = AdaptiveLDA.from_features(X, y, forgetting=0.99)
+    # the discriminative feature moves from 0 to 1
+    for i in range(1000):
+        x = rng.standard_normal(4)
+        x[1] += 2.0 * (i % 2)
+        clf.update(x, i % 2)
+    test = np.zeros((2, 4))
+    test[1, 1] = 2.0
+    p = clf.predict_proba(test)
+    assert p[0] < 0.2 and p[1] > 0.8
+
+
+def test_update_after_seeding_only_nudges_the_mean():
+    rng = np.random.default_rng(3)
+    X = rng.standard_normal((100, 4))
+    y = np.arange(100) % 2
+    clf = AdaptiveLDA.from_features(X, y, forgetting=0.99)
+    assert clf.counts == [50, 50]
+    m1 = clf.means[1].copy()
+    x = np.full(4, 10.0)
+    clf.update(x, 1)
+    np.testing.assert_allclose(clf.means[1], m1 + (1 - 0.99) * (x - m1))
+    assert clf.n_updates == 1
+
+
+def test_threshold_tracks_rest_quantile():
+    rng = np.random.default_rng(2)
+    thr = AdaptiveThreshold(initial=0.8, target_fpr=0.1, forgetting=1.0, bounds=(0.0, 1.0))
+    assert thr.value == 0.8
+    for p in rng.uniform(0.0, 0.5, 5000):
+        thr.update(p, 0)
+    assert abs(thr.value - 0.45) < 0.02
+    assert abs(thr.rate_above(0) - 0.1) < 0.03
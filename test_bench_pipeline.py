@@ -0,0 +1,17 @@
+from benchmarks.bench_pipeline import bench_config, compare
+
+
+def test_bench_config_reports_every_stage():
+    r = bench_config(8, 250, 0.04, seconds=3, memory_s=1)
+    assert r["samples_per_s"] > 0 and r["peak_mb"] > 0
+    assert r["chunk_ms"]["p50"] <= r["chunk_ms"]["p95"] <= r["chunk_ms"]["max"]
+    assert set(r["stages"]) == {"acquire", "filter", "engine", "classify", "fsm", "storage"}
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    old = {"n_channels": 8, "sampling_rate": 250, "step_s": 0.04, "samples_per_s": 1000.0,
+           "chunk_ms": {"p95": 1.0}}
+    same = dict(old, samples_per_s=900.0, chunk_ms={"p95": 1.1})
+    worse = dict(old, samples_per_s=500.0, chunk_ms={"p95": 2.0})
+    assert compare([same], {"results": [old]}, 0.2) == []
+    assert len(compare([worse], {"results": [old]}, 0.2)) == 2
@@ -0,0 +1,51 @@
+import numpy as np
+
+from bci_app.core.catalog import SessionCatalog, iter_batches, load_dataset
+
+
+def _save(root, subject, kind, ts, n_trials, seed=0):
+    d = root / subject / kind
+    d.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    data = rng.standard_normal((n_trials, 4, 50))
+    labels = np.arange(n_trials) % 2
+    path = d / f"eegdata_{ts}.npz"
+    np.savez_compressed(path, data=data, labels=labels)
+    return path, data, labels
+
+
+def test_register_and_query(tmp_path):
+    cat = SessionCatalog(tmp_path)
+    p1, _, l1 = _save(tmp_path, "s1", "training", "20250101_120000", 6)
+    _save(tmp_path, "s1", "test", "20250102_120000", 4)
+    _save(tmp_path, "s2", "training", "20250103_120000", 5)
+    rec = cat.register(p1, "s1", "training", 250, l1)
+    assert rec.shape == (6, 4, 50) and (rec.n_rest, rec.n_switch) == (3, 3)
+    assert cat.scan(250) == 2            # the two files saved without registering
+    assert cat.scan(250) == 0
+    assert [r.subject for r in cat.query(kind="training")] == ["s1", "s2"]
+    assert len(cat.query(subject=["s1", "s2"], since="2025-01-02")) == 2
+    # scan() without a rate back-fills NULL; unknown_rate keeps those in a rate query
+    _save(tmp_path, "s3", "training", "20250104_120000", 4)
+    cat.scan()
+    assert [r.subject for r in cat.query(kind="training", sampling_rate=250)] == ["s1", "s2"]
+    assert [r.subject for r in cat.query(kind="training", sampling_rate=250, unknown_rate=True)] == \
+        ["s1", "s2", "s3"]
+    assert cat.query(sampling_rate=500, unknown_rate=True)[0].subject == "s3"
+    assert cat.summary()["s1"] == {"sessions": 2, "trials": 10, "rest": 5, "switch": 5}
+    # the index survives re-opening and stores paths relative to the root
+    assert SessionCatalog(tmp_path / "catalog.sqlite").query(subject="s2")[0].path == \
+        tmp_path / "s2" / "training" / "eegdata_20250103_120000.npz"
+
+
+def test_batched_and_pooled_loading(tmp_path):
+    cat = SessionCatalog(tmp_path)
+    saved = [_save(tmp_path, s, "training", f"2025010{i}_120000", n, seed=i)
+             for i, (s, n) in enumerate([("a", 5), ("b", 7)], 1)]
+    cat.scan()
+    records = cat.query()
+    batches = list(iter_batches(records, batch_trials=4))
+    assert [len(b[1]) for b in batches] == [4, 4, 4]
+    data, labels = load_dataset(records, verify=True)
+    np.testing.assert_array_equal(data, np.concatenate([s[1] for s in saved]))
+    np.testing.assert_array_equal(labels, np.concatenate([s[2] for s in saved]))
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("brainflow")
+from brainflow.board_shim import BoardShim, BoardIds
+
+from bci_app.hw.cyton_board import CytonBoard
+from bci_app.hw.factory import create_board
+
+BoardShim.disable_board_logger()
+
+
+def test_synthetic_board_chunks_and_timestamps():
+    board = create_board({"type": "synthetic", "port": "", "sampling_rate": 250, "n_channels": 8})
+    assert isinstance(board, CytonBoard)
+    assert board.board_id == BoardIds.SYNTHETIC_BOARD.value
+    board.connect()
+    board.start_stream()
+    try:
+        ring = board.create_ring_buffer(seconds=5)
+        for _ in range(4):
+            board.read_into(ring, 25)
+        data = ring.view(0, ring.head)
+        ts = ring.timestamps(0, ring.head)
+    finally:
+        board.stop_stream()
+        board.disconnect()
+    assert data.shape == (8, 100)
+    assert np.all(np.diff(ts) >= 0)
+    assert board.samples_read == 100
+    assert board.dropped_packets == 0
+
+
+def test_packet_gap_counting():
+    board = CytonBoard("", board_id=BoardIds.SYNTHETIC_BOARD.value)
+    board._track_packets(np.array([250, 251, 253]))
+    board._track_packets(np.array([255, 0, 3]))
+    assert board.dropped_packets == 1 + 1 + 2
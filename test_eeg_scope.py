@@ -0,0 +1,34 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("pyqtgraph")
+
+from bci_app.hw.ring_buffer import SampleRingBuffer
+from bci_app.ui.widgets.eeg_scope import EEGScopeWidget, minmax_decimate
+
+
+def test_minmax_keeps_extremes():
+    x = np.random.default_rng(0).standard_normal((3, 1001))
+    x[1, 517] = 50.0
+    out = minmax_decimate(x, 100)
+    assert out.shape == (3, 200)
+    np.testing.assert_array_equal(out.max(axis=1), x.max(axis=1))
+    np.testing.assert_array_equal(out.min(axis=1), x.min(axis=1))
+    assert np.all(out[:, 0::2] <= out[:, 1::2])
+
+
+def test_scope_frame_cost_is_bounded_by_pixels():
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    ring = SampleRingBuffer(32, 10000)
+    ring.write(np.random.default_rng(1).standard_normal((32, 6000)))
+    scope = EEGScopeWidget(ring, 1000, 32, window_s=5.0)
+    scope.resize(600, 400)
+    scope.refresh()
+    x, y = scope.curves[0].getData()
+    assert len(y) <= 2 * scope.plot.width() < 5000 * 2
+    assert y.max() <= 100.0   # clipped to the channel's lane
+    app.processEvents()
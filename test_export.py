@@ -0,0 +1,42 @@
+import numpy as np
+
+from bci_app.core.config import get_session_cfg
+from bci_app.core.export import export_model, load_model_file, read_header
+from bci_app.core.inference import LinearClassifier
+from bci_app.core.processing import StreamingFilterBank
+from bci_app.core.runtime import build_runtime
+from bci_app.hw.fake_board import FakeBoard
+
+
+def test_roundtrip_is_memory_mapped(tmp_path):
+    rng = np.random.default_rng(0)
+    clf = LinearClassifier(rng.standard_normal(10), -0.5, rng.standard_normal((5, 4, 2)))
+    fb = StreamingFilterBank(250, 4)
+    report = export_model(tmp_path / "m.bcim", clf, fb, channels=[0, 2, 4, 6],
+                          fsm_config={"threshold": 0.7}, metadata={"subject": "s1"})
+    assert report.size_bytes < 4096
+    assert report.load_ms < 50
+
+    model = load_model_file(tmp_path / "m.bcim")
+    assert model.channels == [0, 2, 4, 6]
+    assert model.fsm_config == {"threshold": 0.7}
+    assert read_header(tmp_path / "m.bcim")["metadata"] == {"subject": "s1"}
+    np.testing.assert_array_equal(model.classifier.spatial_filters, clf.spatial_filters)
+    assert not model.arrays["clf.coef"].flags.writeable  # view into the read-only map
+
+    x = rng.standard_normal((4, 500))
+    np.testing.assert_array_equal(model.build_filter_bank().process(x), StreamingFilterBank(250, 4).process(x))
+
+
+def test_runtime_uses_exported_channel_map(tmp_path):
+    clf = LinearClassifier(np.zeros(5 * 2), 0.0)
+    export_model(tmp_path / "m.bcim", clf, StreamingFilterBank(250, 2), channels=[1, 3],
+                 infer_config={"window_s": 0.5, "step_s": 0.1})
+    board = FakeBoard("", 250, 8, seed=0, clock="free")
+    runtime = build_runtime(get_session_cfg("demo"), board, load_model_file(tmp_path / "m.bcim"))
+    assert runtime.channels == [1, 3]
+    assert runtime.engine.window == 125
+    board.start_stream()
+    for _ in range(60):  # 300 samples in 5-sample reads
+        runtime.step()
+    assert runtime.windows > 0
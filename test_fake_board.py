@@ -1,6 +1,47 @@
+import time
+
+import numpy as np
+
 from bci_app.core.config import get_session_cfg
 from bci_app.hw.fake_board import FakeBoard
 
+
+def test_seeded_and_phase_continuous():
+    a = FakeBoard("", 250, seed=3, clock="free")
+    b = FakeBoard("", 250, seed=3, clock="free")
+    a.start_stream()
+    b.start_stream()
+    chunked = np.concatenate([a.read_buffer(n) for n in (10, 40, 75)], axis=1)
+    np.testing.assert_array_equal(chunked, b.read_buffer(125))
+
+
+def test_timestamps_follow_sample_clock():
+    fb = FakeBoard("", 250, seed=0, clock="free")
+    fb.start_stream()
+    _, ts1 = fb.read_timestamped(100)
+    _, ts2 = fb.read_timestamped(100)
+    np.testing.assert_allclose(np.diff(np.concatenate([ts1, ts2])), 1 / 250, atol=1e-6)
+
+
+def test_accelerated_clock_is_faster_than_realtime():
+    fb = FakeBoard("", 250, clock="accelerated", speed=20.0)
+    fb.start_stream()
+    t = time.perf_counter()
+    for _ in range(10):
+        fb.read_buffer(125)  # 5 s of data
+    assert time.perf_counter() - t < 1.0
+
+
+def test_switch_imagery_desynchronizes_mu():
+    fb = FakeBoard("", 250, seed=0, clock="free", erd=0.6)
+    fb.start_stream()
+    rest = fb.read_buffer(500)
+    fb.set_class(1)
+    switch = fb.read_buffer(500)
+    assert switch[0].var() < 0.7 * rest[0].var()
+    assert np.isclose(switch[5].var(), rest[5].var(), rtol=0.3)
+
+
 if __name__ == "__main__":
     cfg = get_session_cfg("demo")
     fb = FakeBoard(cfg["board"]["port"], cfg["board"]["sampling_rate"])
@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+
+from bci_app.core.config import get_session_cfg
+from bci_app.core.fsm import ToggleFSM, LatencyTrail, OPEN, CLOSED
+from bci_app.core.inference import LinearClassifier
+from bci_app.core.runtime import build_runtime
+from bci_app.hw.fake_board import FakeBoard
+
+
+def _run(fsm, probas, dt=0.04):
+    events = []
+    for i, p in enumerate(probas):
+        ev = fsm.update(p, sample=i, trail=LatencyTrail(acquired=time.time(), sample_time=i * dt))
+        if ev is not None:
+            events.append(ev)
+    return events
+
+
+def test_refractory_blocks_rapid_retoggle():
+    fsm = ToggleFSM(threshold=0.8, refractory_ms=500)
+    events = _run(fsm, [0.9] * 20)  # 0.8 s of sustained hits
+    assert [e.sample for e in events] == [0, 13]
+    assert fsm.state == OPEN
+    assert events[0].state == CLOSED
+
+
+def test_debounce_and_hysteresis():
+    fsm = ToggleFSM(threshold=0.8, refractory_ms=0, debounce=2, hysteresis=0.2)
+    probas = [0.9, 0.5, 0.9, 0.9, 0.9, 0.9, 0.7, 0.9, 0.5, 0.9, 0.9]
+    events = _run(fsm, probas)
+    # 0.7 is not low enough to re-arm; 0.5 is
+    assert [e.sample for e in events] == [3, 10]
+
+
+def test_from_config_and_latency_trail():
+    fsm = ToggleFSM.from_config({"threshold": 0.6, "refractory_ms": 250})
+    assert fsm.threshold == 0.6 and fsm.refractory == 0.25
+    now = time.time()
+    # sample clock far from wall time, as with an accelerated replay
+    trail = LatencyTrail(acquired=now - 0.05, filtered=now - 0.04, classified=now - 0.03, sample_time=100.0)
+    ev = fsm.update(0.7, trail=trail)
+    assert ev.trail.toggled >= trail.classified
+    assert 0.05 <= ev.trail.total < 0.5
+    summary = fsm.latency_summary()
+    assert summary["count"] == 1 and summary["p50"] == ev.trail.total
+
+
+def test_latency_is_wall_clock_with_a_free_running_board():
+    cfg = dict(get_session_cfg("demo"), train={"threshold": 0.8, "refractory_ms": 500, "hysteresis": 0.0})
+    board = FakeBoard("", 250, 8, seed=0, clock="free")   # stamps run far ahead of wall time
+    assert not board.wall_clock_timestamps
+    runtime = build_runtime(cfg, board, LinearClassifier(np.zeros(5 * 8), 5.0))   # always SWITCH
+    board.start_stream()
+    for _ in range(50 * 250 // runtime.chunk):   # 50 s of stream in well under a second
+        runtime.step()
+    summary = runtime.fsm.latency_summary()
+    assert summary["count"] > 10
+    assert 0.0 <= summary["p50"] <= summary["max"] < 0.5
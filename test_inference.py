@@ -0,0 +1,35 @@
+import numpy as np
+
+from bci_app.core.inference import LinearClassifier, SlidingWindowEngine
+from bci_app.core.processing import StreamingFilterBank, filter_offline
+
+FS = 250
+
+
+def test_incremental_window_matches_full_recompute():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((4, FS * 6))
+    w = rng.standard_normal((5, 4, 2))
+    clf = LinearClassifier(rng.standard_normal(10), 0.1, spatial_filters=w)
+    engine = SlidingWindowEngine(StreamingFilterBank(FS, 4), window_s=1.0, step_s=0.04, classifier=clf)
+    results = []
+    for i in range(0, x.shape[1], 37):
+        chunk = x[:, i:i + 37]
+        results.extend(engine.push(chunk, np.arange(i, i + chunk.shape[1]) / FS))
+
+    filtered = filter_offline(x, FS)
+    assert len(results) == (x.shape[1] - engine.window) // engine.step + 1
+    for r in results[::17]:
+        win = filtered[..., r.sample - engine.window:r.sample]
+        cov = np.einsum("bcn,bdn->bcd", win, win) / engine.window
+        np.testing.assert_allclose(r.features, clf.features(cov), rtol=1e-8)
+        np.testing.assert_allclose(r.proba, clf.predict_proba(clf.features(cov)), rtol=1e-8)
+        assert r.timestamp == (r.sample - 1) / FS
+
+
+def test_band_power_features_without_classifier():
+    engine = SlidingWindowEngine(StreamingFilterBank(FS, 3), window_s=0.5, step_s=0.1)
+    assert engine.push(np.zeros((3, engine.window - 1))) == []
+    (r,) = engine.push(np.ones((3, 1)))
+    assert r.proba is None
+    assert r.features.shape == (5 * 3,)
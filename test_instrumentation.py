@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+
+from bci_app.core import instrumentation as instr
+from bci_app.core.inference import LinearClassifier, SlidingWindowEngine
+from bci_app.core.processing import StreamingFilterBank
+from bci_app.hw.fake_board import FakeBoard
+
+
+@pytest.fixture
+def enabled():
+    instr.reset()
+    instr.enable()
+    yield
+    instr.enable(False)
+    instr.reset()
+
+
+def test_disabled_records_nothing():
+    instr.reset()
+    instr.enable(False)
+    t0 = instr.start()
+    instr.stop("x", t0)
+    instr.count("y")
+    assert t0 == 0.0
+    assert instr.snapshot()["timings"] == {} and instr.snapshot()["counters"] == {}
+
+
+def test_percentiles_within_bin_resolution(enabled):
+    samples = np.random.default_rng(0).lognormal(np.log(2e-3), 0.5, 5000)
+    for s in samples:
+        instr.record("stage", s)
+    summary = instr.snapshot()["timings"]["stage"]
+    for q in (50, 95, 99):
+        exact = np.percentile(samples, q) * 1e3
+        assert abs(summary[f"p{q}_ms"] / exact - 1) < 0.07
+
+
+def test_engine_is_instrumented_and_exportable(enabled, tmp_path):
+    engine = SlidingWindowEngine(StreamingFilterBank(250, 4), window_s=0.5, step_s=0.1,
+                                 classifier=LinearClassifier(np.zeros(20)))
+    x = np.random.default_rng(1).standard_normal((4, 500))
+    for i in range(0, 500, 25):
+        engine.push(x[:, i:i + 25])
+    snap = instr.export(tmp_path / "prof.json", {"summary": {"windows": 16}})
+    assert snap["timings"]["filter.process"]["count"] == 20
+    assert snap["counters"]["engine.windows"]["value"] == 16
+    assert json.loads((tmp_path / "prof.json").read_text())["summary"] == {"windows": 16}
+
+
+def test_read_lag_only_for_wall_clock_boards(enabled):
+    for clock in ("free", "realtime"):
+        board = FakeBoard("", 250, 2, seed=0, clock=clock)
+        board.start_stream()
+        ring = board.create_ring_buffer(seconds=1)
+        for _ in range(3):
+            board.read_into(ring, 5)
+    snap = instr.snapshot()
+    # free-clock stamps run ahead of wall time: not recorded (and not clamped to 0)
+    assert snap["timings"]["board.read_lag"]["count"] == 3
+    assert "board.read_lag_negative" not in snap["counters"]
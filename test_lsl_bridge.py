@@ -0,0 +1,33 @@
+import time
+
+import numpy as np
+import pytest
+
+try:
+    import pylsl  # noqa: F401
+except (ImportError, RuntimeError):   # pylsl without the native liblsl raises RuntimeError
+    pytest.skip("pylsl / liblsl not available", allow_module_level=True)
+
+from bci_app.hw.lsl_bridge import LSLBoard, LSLOutlet
+
+
+def test_loopback_preserves_samples_and_timestamps():
+    name = f"test-lsl-{time.time_ns()}"
+    outlet = LSLOutlet(name, 4, 250)
+    board = LSLBoard(name, resolve_timeout=5.0, read_timeout=2.0)
+    assert (board.n_channels, board.sampling_rate) == (4, 250)
+    board.connect()
+    board.start_stream()
+    assert outlet.wait_for_consumers(5.0)
+
+    data = np.random.default_rng(0).standard_normal((4, 100))
+    ts = time.time() - (np.arange(100, 0, -1) - 1) / 250
+    outlet.append(data, ts)
+    got, stamps = board.read_timestamped(100)
+    board.stop_stream()
+    board.disconnect()
+    outlet.close()
+
+    np.testing.assert_allclose(got, data.astype(np.float32), rtol=1e-6)
+    # back in the time.time() domain, within clock-offset estimation error
+    np.testing.assert_allclose(stamps, ts, atol=0.01)
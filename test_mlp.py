@@ -0,0 +1,67 @@
+import numpy as np
+
+from bci_app.core.export import export_model, load_model_file
+from bci_app.core.inference import window_covariances, log_variance_features
+from bci_app.core.mlp import (
+    QuantizedMLP, evaluate_quantization, fit_mlp, quantize_mlp, session_features, train_session_mlp,
+)
+from bci_app.core.processing import StreamingFilterBank
+
+FS = 250
+
+
+def _toy(n=1200, d=20, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n, d))
+    y = (X @ rng.standard_normal(d) + 0.3 * rng.standard_normal(n) > 0).astype(int)
+    return X, y
+
+
+def test_int8_tracks_float():
+    X, y = _toy()
+    mlp = fit_mlp(X[:800], y[:800], hidden=(16,))
+    qmlp = quantize_mlp(mlp, X[:800])
+    assert all(w.dtype == np.int8 for w in qmlp.weights_q)
+    report = evaluate_quantization(mlp, qmlp, X[800:], y[800:], repeat=2)
+    assert report.float_accuracy > 0.85
+    assert abs(report.accuracy_delta) < 0.02
+    assert report.agreement > 0.97
+    assert report.int8_bytes < report.float_bytes / 4
+
+
+def test_quantized_model_round_trips_through_export(tmp_path):
+    X, y = _toy(d=2 * 5)
+    qmlp = quantize_mlp(fit_mlp(X, y, hidden=(8,), epochs=100), X)
+    path = tmp_path / "m.bcim"
+    export_model(path, qmlp, StreamingFilterBank(250, 2))
+    loaded = load_model_file(path).classifier
+    assert isinstance(loaded, QuantizedMLP)
+    np.testing.assert_array_equal(loaded.predict_proba(X), qmlp.predict_proba(X))
+
+
+def test_window_covariances_match_direct():
+    x = np.random.default_rng(3).standard_normal((2, 5, 3, 200))
+    covs = window_covariances(x, 50, 25)
+    assert covs.shape == (2, 7, 5, 3, 3)
+    w = x[1, :, :, 75:125]
+    np.testing.assert_allclose(covs[1, 3], np.einsum("bcn,bdn->bcd", w, w) / 50)
+    assert log_variance_features(covs).shape == (2, 7, 15)
+
+
+def test_session_features_windows_every_trial(synthetic_sessions):
+    paths = synthetic_sessions(2, n_trials=4)
+    bands = ((8, 12), (16, 24))
+    X, y = session_features(paths, FS, bands, window_s=1.0, step_s=0.5)
+    per_trial = (3 * FS - FS) // (FS // 2) + 1
+    assert X.shape == (2 * 4 * per_trial, len(bands) * 8)
+    assert np.isfinite(X).all()
+    np.testing.assert_array_equal(y, np.tile(np.repeat([0, 1, 0, 1], per_trial), 2))
+
+
+def test_train_session_mlp_reports_quantization(synthetic_sessions):
+    paths = synthetic_sessions(1, n_trials=10)
+    mlp, qmlp, report = train_session_mlp(paths, FS, ((8, 12), (16, 24)), hidden=(8,), window_s=1.0,
+                                          step_s=0.5, epochs=100)
+    assert isinstance(qmlp, QuantizedMLP)
+    assert report.int8_bytes < report.float_bytes
+    assert report.agreement > 0.9
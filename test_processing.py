@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from bci_app.core.processing import StreamingFilterBank, filter_offline, DEFAULT_BANDS
+
+FS = 250
+
+
+def test_chunked_stream_matches_offline():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((8, FS * 10)) + 40.0  # DC offset like a real electrode
+    offline = filter_offline(x, FS)
+    fb = StreamingFilterBank(FS, 8)
+    out, i = [], 0
+    for n in rng.integers(1, 130, size=500):
+        if i >= x.shape[1]:
+            break
+        out.append(fb.process(x[:, i:i + n]))
+        i += n
+    streamed = np.concatenate(out, axis=-1)
+    assert streamed.shape == (len(DEFAULT_BANDS), 8, x.shape[1])
+    np.testing.assert_allclose(streamed, offline, rtol=0, atol=1e-9 * np.abs(offline).max())
+
+
+def test_in_band_power_matches_zero_phase():
+    t = np.arange(FS * 10) / FS
+    x = np.tile(np.sin(2 * np.pi * 10.0 * t), (2, 1))
+    epoch = slice(5 * FS, 7 * FS)
+    causal = np.log(filter_offline(x, FS)[0, :, epoch].var(-1))
+    zero_phase = np.log(filter_offline(x, FS, zero_phase=True)[0, :, epoch].var(-1))
+    np.testing.assert_allclose(causal, zero_phase, atol=0.01)
+
+
+def test_offline_handles_stacked_trials():
+    x = np.random.default_rng(1).standard_normal((3, 4, FS))
+    out = filter_offline(x, FS)
+    assert out.shape == (3, len(DEFAULT_BANDS), 4, FS)
+    np.testing.assert_allclose(out[1], filter_offline(x[1], FS))
+
+
+def test_numpy_fallback_matches_scipy(monkeypatch):
+    import bci_app.core.processing as processing
+    x = np.random.default_rng(2).standard_normal((4, 300)) + 10.0
+    expected = filter_offline(x, FS)
+    fb = StreamingFilterBank(FS, 4)
+    monkeypatch.setattr(processing, "_signal", False)   # as if scipy were not installed
+    out = np.concatenate([fb.process(x[:, i:i + 60]) for i in range(0, 300, 60)], axis=-1)
+    np.testing.assert_allclose(out, expected, atol=1e-9)
+
+
+def test_scipy_is_imported_on_first_use():
+    # importing the runtime is cheap; building a filter bank (even from
+    # exported coefficients) loads the kernel before the first chunk
+    code = ("import sys, numpy as np, bci_app.core.processing as p, bci_app.core.export, bci_app.core.runtime\n"
+            "assert 'scipy.signal' not in sys.modules\n"
+            "p.StreamingFilterBank(250, 2, band_sos=np.eye(1, 6)[None], notch_sos=None)\n"
+            "assert 'scipy.signal' in sys.modules\n")
+    subprocess.run([sys.executable, "-c", code], check=True)
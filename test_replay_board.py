@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bci_app.core.storage import RawSessionRecorder
+from bci_app.hw.replay_board import ReplayBoard, _npz_member_memmap
+
+
+def _drain(board, chunk):
+    parts = []
+    while not board.finished:
+        parts.append(board.read_buffer(chunk))
+    return np.concatenate(parts, axis=1)
+
+
+def test_replay_npz_trials_with_label_events(tmp_path):
+    data = np.random.default_rng(0).standard_normal((4, 3, 100))
+    labels = np.array([1, 0, 1, 0])
+    path = tmp_path / "eegdata_test.npz"
+    np.savez_compressed(path, data=data, labels=labels)
+
+    board = ReplayBoard(str(path), sampling_rate=250, clock="free", cache_dir=tmp_path / "cache")
+    board.start_stream()
+    first = board.read_buffer(150)
+    events = board.read_events()
+    assert [(e["sample"], e["label"]) for e in events] == [(0, 1), (100, 0)]
+    rest = _drain(board, 64)
+    stream = np.concatenate([first, rest], axis=1)
+    np.testing.assert_array_equal(stream, np.concatenate(list(data), axis=1))
+    assert [e["sample"] for e in board.read_events()] == [200, 300]
+
+
+def test_replay_raw_session_looping(tmp_path):
+    rec = RawSessionRecorder(tmp_path / "raw", n_channels=2, sampling_rate=100)
+    x = np.arange(60, dtype=float).reshape(2, 30)
+    rec.append(x)
+    rec.add_event(10, 1, "Imagine SWITCH", duration=5)
+    rec.close()
+
+    board = ReplayBoard(str(tmp_path / "raw"), clock="free", loop=True)
+    board.start_stream()
+    assert board.sampling_rate == 100
+    out = board.read_buffer(70)
+    np.testing.assert_array_equal(out[0], np.arange(70) % 30)
+    assert not board.finished
+    assert [e["sample"] for e in board.read_events()] == [10, 40]
+
+
+def test_empty_recording_is_rejected(tmp_path):
+    RawSessionRecorder(tmp_path / "raw", n_channels=2, sampling_rate=100).close()
+    with pytest.raises(ValueError, match="no samples"):
+        ReplayBoard(str(tmp_path / "raw"), clock="free", loop=True)
+
+
+def test_npz_cache_drops_stale_copies_and_stays_capped(tmp_path):
+    cache = tmp_path / "cache"
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"s{i}.npz")
+        np.savez_compressed(paths[-1], data=np.full((2, 3, 1000), float(i)), labels=np.arange(2))
+    _npz_member_memmap(paths[0], "data", cache)
+    # a newer version of the same file replaces its cached copy
+    np.savez_compressed(paths[0], data=np.ones((2, 3, 1000)), labels=np.arange(2))
+    np.testing.assert_array_equal(_npz_member_memmap(paths[0], "data", cache), 1.0)
+    assert len(list(cache.glob("*.npy"))) == 1
+    # with room for about two copies, the least recently used one goes
+    size = next(cache.glob("*.npy")).stat().st_size
+    for p in paths[1:]:
+        _npz_member_memmap(p, "data", cache, max_bytes=2 * size)
+    assert sorted(f.name.split("_")[0] for f in cache.glob("*.npy")) == ["s1", "s2"]
+
+
+def test_private_cache_for_cache_dir_none(tmp_path):
+    path = tmp_path / "s.npz"
+    np.savez_compressed(path, data=np.zeros((2, 3, 100)), labels=np.arange(2))
+    board = ReplayBoard(str(path), sampling_rate=250, clock="free", cache_dir=None)
+    private = board._tmp.name
+    assert list(Path(private).glob("*.npy"))
+    del board
+    assert not Path(private).exists()
@@ -0,0 +1,44 @@
+import threading
+
+import numpy as np
+import pytest
+
+from bci_app.hw.ring_buffer import SampleRingBuffer
+
+
+def _chunk(start, n, n_channels=4):
+    idx = np.arange(start, start + n, dtype=float)
+    return np.tile(idx, (n_channels, 1)) + np.arange(n_channels)[:, None] * 1000, idx / 250.0
+
+
+def test_views_are_contiguous_across_wrap():
+    ring = SampleRingBuffer(4, capacity=10)
+    head = 0
+    for n in (3, 4, 5, 7, 2):
+        data, ts = _chunk(head, n)
+        head = ring.write(data, ts)
+    assert head == 21
+    view = ring.view(13, 21)
+    assert view.base is not None  # a view, not a copy
+    np.testing.assert_array_equal(view[0], np.arange(13, 21))
+    np.testing.assert_array_equal(view[3], np.arange(13, 21) + 3000)
+    np.testing.assert_allclose(ring.timestamps(13, 21), np.arange(13, 21) / 250.0)
+
+
+def test_overwritten_samples_raise():
+    ring = SampleRingBuffer(4, capacity=10)
+    ring.write(*_chunk(0, 25))
+    assert ring.tail == 15
+    with pytest.raises(IndexError):
+        ring.view(10, 20)
+    start, view = ring.latest(100)
+    assert start == 15
+    np.testing.assert_array_equal(view[0], np.arange(15, 25))
+
+
+def test_wait_for_wakes_reader():
+    ring = SampleRingBuffer(4, capacity=10)
+    t = threading.Timer(0.05, lambda: ring.write(*_chunk(0, 5)))
+    t.start()
+    assert ring.wait_for(5, timeout=2.0)
+    assert not ring.wait_for(6, timeout=0.01)
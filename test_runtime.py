@@ -0,0 +1,24 @@
+import numpy as np
+
+from bci_app.core.config import get_session_cfg
+from bci_app.core.inference import LinearClassifier
+from bci_app.core.runtime import build_runtime
+from bci_app.hw.fake_board import FakeBoard
+
+
+def test_headless_runtime_toggles_on_fake_imagery():
+    cfg = get_session_cfg("demo")
+    board = FakeBoard("", 250, 8, seed=0, clock="free")
+    # SWITCH imagery lowers mu power on channel 0: score = -log(mu power)
+    coef = np.zeros(5 * 8)
+    coef[0] = -4.0
+    toggles = []
+    runtime = build_runtime(cfg, board, LinearClassifier(coef, -3.0), on_toggle=toggles.append)
+    board.start_stream()
+    for label in (0, 1, 0, 1):
+        board.set_class(label)
+        for _ in range(3 * 250 // runtime.chunk):
+            runtime.step()
+    assert [ev.state for ev in toggles] == ["closed", "open"]
+    assert runtime.windows > 200
+    assert all(np.isfinite(ev.trail.classified) for ev in toggles)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from bci_app.core.segmentation import Marker, cue_sample, cut_epochs
+from bci_app.hw.ring_buffer import SampleRingBuffer
+
+
+def _ring(n, capacity=100):
+    ring = SampleRingBuffer(2, capacity, sampling_rate=250)
+    x = np.tile(np.arange(n, dtype=float), (2, 1))
+    ring.write(x, 1000.0 + np.arange(n) / 250)
+    return ring
+
+
+def test_cut_epochs_by_sample_index():
+    data = np.tile(np.arange(100, dtype=float), (3, 1))
+    markers = [Marker(10, 1, duration=20), Marker(50, 0, duration=20), Marker(90, 1, duration=20)]
+    epochs, labels, kept = cut_epochs(data, markers)
+    assert epochs.shape == (2, 3, 20)
+    np.testing.assert_array_equal(epochs[1, 0], np.arange(50, 70))
+    np.testing.assert_array_equal(labels, [1, 0])
+    assert [m.sample for m in kept] == [10, 50]
+
+
+def test_cue_sample_follows_the_sample_counter():
+    # timestamps far from time.time(), as from an accelerated or replayed board
+    ring = _ring(50)
+    assert cue_sample(ring) == 50
+    ring.write(np.zeros((2, 30)), np.zeros(30))
+    assert cue_sample(ring) == 80
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from bci_app.core.config import get_session_cfg
+from bci_app.core.inference import LinearClassifier
+from bci_app.core.session import BoundedQueue, QueueClosed, Span, build_session
+from bci_app.core.storage import RawSessionRecorder, open_raw_session
+from bci_app.hw.fake_board import FakeBoard
+
+
+def test_queue_policies():
+    q = BoundedQueue("d", 2, "drop_oldest")
+    for i in range(5):
+        q.put(i)
+    assert [q.get(), q.get()] == [3, 4] and q.dropped == 3
+
+    q = BoundedQueue("c", 2, "coalesce", lambda a, b: a.merge(b))
+    for i in range(5):
+        q.put(Span(10 * i, 10 * i + 10))
+    assert [q.get(), q.get()] == [Span(0, 10), Span(10, 50)] and q.coalesced == 3
+
+    q = BoundedQueue("b", 1, "block")
+    q.put(1)
+    assert not q.put(2, timeout=0.05)
+    threading.Timer(0.05, q.get).start()
+    assert q.put(3, timeout=1.0) and q.blocked_s > 0
+    q.close()
+    assert q.get() == 3
+    with pytest.raises(QueueClosed):
+        q.get()
+
+
+class SlowRecorder:
+    """Storage that stalls; must not hold up classification."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def append(self, data, timestamps):
+        time.sleep(0.05)
+        self.inner.append(data, timestamps)
+
+
+def test_slow_storage_does_not_stall_classification(tmp_path):
+    cfg = get_session_cfg("demo")
+    board = FakeBoard("", 250, 8, seed=0, clock="accelerated", speed=10.0)
+    coef = np.zeros(5 * 8)
+    coef[0] = -4.0
+    recorder = RawSessionRecorder(tmp_path / "raw", 8, 250)
+    results = []
+    session = build_session(cfg, board, LinearClassifier(coef, -3.0), recorder=SlowRecorder(recorder),
+                            on_result=lambda r: (results.append(r), time.sleep(0.02)))
+    session.run(duration=1.0)
+    recorder.close()
+
+    stats = session.stats()
+    n = session.buffer.head
+    assert n > 5 * 250
+    # dsp kept up with acquisition although storage and the monitor lagged
+    assert session.engine.sample == n
+    assert stats["queues"]["storage"]["coalesced"] > 0
+    assert stats["queues"]["monitor"]["dropped"] > 0
+    assert stats["queues"]["fsm"]["blocked_s"] < 0.1
+    # coalesced spans lose nothing: the whole stream reached the recorder
+    assert open_raw_session(tmp_path / "raw").n_samples == n
+    assert session.overruns == {"dsp": 0, "storage": 0}
+    assert results and session.windows > 100
+
+
+def test_on_window_sees_every_result():
+    cfg = get_session_cfg("demo")
+    board = FakeBoard("", 250, 8, seed=0, clock="accelerated", speed=10.0)
+    published, monitored = [], []
+    session = build_session(cfg, board, LinearClassifier(np.zeros(5 * 8)), on_window=published.append,
+                            on_result=lambda r: (monitored.append(r), time.sleep(0.02)))
+    session.run(duration=1.0)
+
+    # the monitor lags and drops, the on_window hook does not
+    assert session.stats()["queues"]["monitor"]["dropped"] > 0
+    assert len(published) == session.windows > len(monitored)
+    samples = [r.sample for r in published]
+    assert samples == sorted(samples) and len(set(samples)) == len(samples)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from bci_app.core.storage import RawSessionRecorder, open_raw_session, RAW_SAMPLES
+
+
+def test_raw_session_roundtrip(tmp_path):
+    rec = RawSessionRecorder(tmp_path / "raw", n_channels=3, sampling_rate=250, max_pending=2)
+    chunks = [np.random.randn(3, n) for n in (50, 75, 125)]
+    start = 0
+    for c in chunks:
+        ts = np.arange(start, start + c.shape[1]) / 250.0
+        rec.append(c, ts)
+        start += c.shape[1]
+    rec.add_event(10, 1, "Imagine SWITCH", duration=100)
+    rec.add_event(200, 0, "Imagine REST", duration=100)  # runs past the end
+    rec.close()
+
+    session = open_raw_session(tmp_path / "raw")
+    assert session.n_samples == 250
+    np.testing.assert_allclose(session.data, np.concatenate(chunks, axis=1), rtol=1e-6)
+    np.testing.assert_allclose(session.timestamps[-1], 249 / 250.0)
+    data, labels = session.epochs()
+    assert data.shape == (1, 3, 100)
+    np.testing.assert_array_equal(labels, [1])
+
+
+def test_raw_session_survives_torn_write(tmp_path):
+    rec = RawSessionRecorder(tmp_path / "raw", n_channels=4, sampling_rate=250)
+    rec.append(np.ones((4, 20)), np.arange(20.0))
+    rec.flush()
+    # simulate a crash in the middle of writing the next sample
+    with open(tmp_path / "raw" / RAW_SAMPLES, "ab") as f:
+        f.write(b"\x00" * 6)
+    session = open_raw_session(tmp_path / "raw")
+    assert session.n_samples == 20
+    assert session.data.shape == (4, 20)
+    rec.close()
@@ -0,0 +1,132 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bci_app.core.catalog import SessionCatalog
+from bci_app.core.storage import RAW_LOCK, RawSessionRecorder, StorageFull, StorageService
+
+
+def test_spools_until_box_appears_then_migrates(tmp_path):
+    box = tmp_path / "box"
+    svc = StorageService(tmp_path / "spool", retry_s=0.05, box_root=box)
+    raw_dir = svc.new_raw_session_dir("s1")
+    rec = RawSessionRecorder(raw_dir, 2, 250)
+    rec.append(np.ones((2, 10)))
+    rec.close()
+
+    data, labels = np.random.randn(4, 2, 10), np.array([0, 1, 0, 1])
+    spooled = svc.save_npz(data, labels, "s1", sampling_rate=250, raw_dir=raw_dir)
+    svc.submit_raw(raw_dir)
+    assert svc.flush(timeout=5)
+    assert svc.stats()["spooled"] == 2           # Box missing: both wait in the spool
+    assert spooled.exists() and not list(spooled.parent.glob(".*.tmp"))
+
+    box.mkdir()
+    assert svc.flush(timeout=5, migrate=True)
+    dest = box / "s1" / "training" / spooled.name
+    with np.load(dest) as z:
+        np.testing.assert_array_equal(z["data"], data)
+    assert (box / "s1" / "training" / raw_dir.name / "samples.f32").exists()
+    assert not spooled.exists() and not raw_dir.exists()
+    rec, = SessionCatalog(box).query(subject="s1")
+    assert rec.sampling_rate == 250 and rec.raw_dir == f"s1/training/{raw_dir.name}"
+    s = svc.stats()
+    assert (s["saved"], s["migrated"], s["spooled"]) == (1, 2, 0)
+    svc.close()
+
+
+def test_recovers_raw_sessions_left_by_a_crash(tmp_path):
+    raw_dir = tmp_path / "spool" / "s1" / "training" / "raw_20250101_000000"
+    # a recorder that dies without close() or submit_raw()
+    subprocess.run([sys.executable, "-c",
+                    "import os, numpy as np\n"
+                    "from bci_app.core.storage import RawSessionRecorder\n"
+                    f"rec = RawSessionRecorder({str(raw_dir)!r}, 2, 250)\n"
+                    "rec.append(np.ones((2, 10)))\n"
+                    "rec.flush()\n"
+                    "os._exit(1)\n"], check=False, cwd=Path(__file__).parent)
+    svc = StorageService(tmp_path / "spool", retry_s=0.05, box_root=tmp_path / "box")
+    (tmp_path / "box").mkdir()
+    assert svc.flush(timeout=5, migrate=True)
+    dest = tmp_path / "box" / "s1" / "training" / raw_dir.name
+    assert (dest / "header.json").exists() and not (dest / RAW_LOCK).exists()
+    svc.close()
+
+
+def test_leaves_live_recordings_in_place(tmp_path):
+    raw_dir = tmp_path / "spool" / "s1" / "training" / "raw_20250101_000000"
+    rec = RawSessionRecorder(raw_dir, 2, 250)   # e.g. another app instance, still recording
+    rec.append(np.ones((2, 10)))
+    rec.flush()
+    (tmp_path / "box").mkdir()
+    svc = StorageService(tmp_path / "spool", retry_s=0.05, box_root=tmp_path / "box")
+    svc.flush(timeout=0.5, migrate=True)
+    assert raw_dir.exists() and not (tmp_path / "box" / "s1").exists()
+    rec.close()
+    assert svc.flush(timeout=5, migrate=True)   # picked up once the recorder is gone
+    assert not raw_dir.exists()
+    svc.close()
+
+
+def test_finish_raw_closes_cuts_and_saves_on_the_writer_thread(tmp_path):
+    svc = StorageService(tmp_path / "spool", retry_s=0.05, box_root=tmp_path / "box")
+    raw_dir = svc.new_raw_session_dir("s1")
+    rec = RawSessionRecorder(raw_dir, 2, 250)
+    rec.append(np.random.randn(2, 1000))
+    rec.add_event(100, 1, "SWITCH", duration=250)
+    rec.add_event(500, 0, "REST", duration=250)
+    done = []
+    svc.finish_raw(rec, "s1", on_done=done.append)   # returns before anything is written
+    assert svc.flush(timeout=5)
+    result, = done
+    assert result["error"] is None and (result["n_rest"], result["n_switch"]) == (1, 1)
+    with np.load(result["path"]) as z:
+        assert z["data"].shape == (2, 2, 250)
+    assert (raw_dir / ".complete").exists()
+    svc.close()
+
+
+def test_saves_in_the_same_second_get_distinct_names(tmp_path):
+    svc = StorageService(tmp_path / "spool", retry_s=0.05, box_root=tmp_path / "box")
+    paths = [svc.save_npz(np.zeros((1, 2, 10)), np.array([i]), "s1") for i in range(3)]
+    assert len(set(paths)) == 3
+    assert svc.flush(timeout=5)
+    assert [int(np.load(p)["labels"][0]) for p in paths] == [0, 1, 2]
+    svc.close()
+
+
+class StalledRecorder:
+    """Keeps the writer thread busy until released."""
+
+    def __init__(self, directory, release):
+        self.directory = directory
+        self.release = release
+        self.sampling_rate = 250
+
+    def close(self):
+        self.release.wait(5)
+
+
+def test_save_npz_never_waits_for_a_busy_writer(tmp_path):
+    svc = StorageService(tmp_path / "spool", max_pending=2, box_root=tmp_path / "box")
+    release = threading.Event()
+    raw_dir = svc.new_raw_session_dir("s1")
+    raw_dir.mkdir(parents=True)
+    svc.finish_raw(StalledRecorder(raw_dir, release), "s1")
+    x = np.zeros((1, 2, 10))
+    svc.save_npz(x, np.array([0]), "s1")
+    svc.save_npz(x, np.array([1]), "s1")
+    t = time.perf_counter()
+    with pytest.raises(StorageFull):
+        svc.save_npz(x, np.array([0]), "s1")
+    assert time.perf_counter() - t < 0.1
+    assert svc.stats()["rejected"] == 1
+    release.set()
+    assert svc.flush(timeout=5)
+    svc.save_npz(x, np.array([0]), "s1")   # room again once the writer caught up
+    svc.close()
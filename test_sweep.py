@@ -0,0 +1,37 @@
+import csv
+
+import numpy as np
+
+from bci_app.core.sweep import SweepGrid, best, run_sweep, stratified_folds
+
+
+def test_folds_are_stratified_and_disjoint():
+    labels = np.arange(20) % 2
+    folds = stratified_folds(labels, 5)
+    assert sorted(np.concatenate(folds)) == list(range(20))
+    assert all(labels[f].sum() == 2 for f in folds)
+
+
+def test_pool_matches_in_process(tmp_path, synthetic_sessions):
+    paths = synthetic_sessions(2, n_trials=12)
+    grid = SweepGrid(window_s=[1.0, 2.0], n_components=[2, 4], threshold=[0.5, 0.8])
+    serial = run_sweep(paths, 250, grid, n_folds=3, workers=0, out=tmp_path / "serial.csv")
+    pooled = run_sweep(paths, 250, grid, n_folds=3, workers=2)
+    assert len(serial) == 2 * grid.size
+    strip = lambda rows: [{k: v for k, v in r.items() if k != "task_s"} for r in rows]
+    assert strip(serial) == strip(pooled)
+    with open(tmp_path / "serial.csv") as f:
+        assert len(list(csv.DictReader(f))) == len(serial)
+    assert all(r["accuracy"] > 0.8 for r in best(serial).values())
+
+
+def test_sessions_with_the_same_name_stay_apart(tmp_path, synthetic_sessions):
+    grid = SweepGrid(n_components=[2], threshold=[0.5])
+    paths = []
+    for subject, seed in (("s1", 0), ("s2", 1)):
+        made, = synthetic_sessions(1, n_trials=10, seed=seed, directory=tmp_path / subject)
+        paths.append(made.rename(made.with_name("eegdata_20240101_120000.npz")))
+    rows = run_sweep(paths, 250, grid, n_folds=2, workers=0)
+    assert len(rows) == 2
+    assert {r["session"] for r in rows} == {str(p.resolve()) for p in paths}
+    assert set(best(rows)) == {str(p.resolve()) for p in paths}
@@ -0,0 +1,42 @@
+import numpy as np
+
+from bci_app.core.training import (
+    CovarianceCache, CovarianceSettings, compute_covariances, csp_filters, train_csp_lda,
+)
+
+FS = 250
+
+
+def test_batched_covariances_match_per_trial(synthetic_epochs):
+    data, labels = synthetic_epochs(4)
+    settings = CovarianceSettings(FS, window_s=1.0, step_s=0.5)
+    cs = compute_covariances(data, labels, settings)
+    assert cs.trials.shape == (4, 5, 8, 8)
+    assert cs.windows.shape == (4, 5, 5, 8, 8)
+    single = compute_covariances(data[2:3], labels[2:3], settings)
+    np.testing.assert_allclose(cs.trials[2], single.trials[0])
+
+
+def test_csp_separates_classes(synthetic_epochs):
+    data, labels = synthetic_epochs()
+    cs = compute_covariances(data, labels, CovarianceSettings(FS))
+    w = csp_filters(cs.trials, labels, n_components=2)
+    assert w.shape == (5, 8, 2)
+    # the last filter maximises class-1 variance relative to class 0, the first the reverse
+    var = np.einsum("tbij,bi,bj->tb", cs.trials, w[..., -1], w[..., -1])
+    assert np.all(var[labels == 1].mean(0) > var[labels == 0].mean(0))
+    var = np.einsum("tbij,bi,bj->tb", cs.trials, w[..., 0], w[..., 0])
+    assert np.all(var[labels == 1].mean(0) < var[labels == 0].mean(0))
+
+
+def test_retrain_hits_cache(tmp_path, synthetic_epochs):
+    data, labels = synthetic_epochs()
+    settings = CovarianceSettings(FS)
+    cache = CovarianceCache(tmp_path)
+    first = train_csp_lda(data, labels, settings, n_components=4, cache=cache)
+    assert not first.cached and first.train_accuracy > 0.9
+    second = train_csp_lda(data, labels, settings, n_components=2, cache=cache)
+    assert second.cached and second.covariance_s == 0.0
+    assert second.classifier.spatial_filters.shape == (5, 8, 2)
+    # a fresh cache on the same directory finds the stored covariances
+    assert train_csp_lda(data, labels, settings, cache=CovarianceCache(tmp_path)).cached
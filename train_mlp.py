@@ -0,0 +1,71 @@
+# train_mlp.py
+"""
+Train an MLP on recorded sessions, quantize it to int8 and export it.
+
+    python train_mlp.py SESSION.npz [...] --out model.bcim [--hidden 16] [--float]
+    python train_mlp.py --subject s1 [--kind training] --out model.bcim
+
+Features, bands and filter settings come from the session config. The
+quantization report (accuracy delta on held-out windows, latency, weight
+memory) is printed as JSON; the int8 model is exported unless --float is
+given.
+"""
+import argparse
+import dataclasses
+import glob
+import json
+
+from bci_app.core.config import get_session_cfg
+from bci_app.core.export import export_model
+from bci_app.core.mlp import train_session_mlp
+from bci_app.core.processing import DEFAULT_BANDS, StreamingFilterBank
+from bci_app.core.storage import open_box_catalog
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Train, quantize and export an MLP model")
+    ap.add_argument("sessions", nargs="*", help=".npz sessions (globs allowed)")
+    ap.add_argument("--subject", nargs="+", help="select sessions from the catalog instead")
+    ap.add_argument("--kind", default="training", help="catalog session kind (with --subject)")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--session", default="demo")
+    ap.add_argument("--hidden", type=int, nargs="+", default=[16], help="hidden layer sizes")
+    ap.add_argument("--float", action="store_true", help="export the float model instead of int8")
+    ap.add_argument("--out", default="model.bcim")
+    args = ap.parse_args()
+
+    cfg = get_session_cfg(args.session, args.config)
+    proc = cfg.get("processing") or {}
+    infer = cfg.get("infer") or {}
+    fs = cfg["board"]["sampling_rate"]
+    bands = proc.get("bands", DEFAULT_BANDS)
+    paths = sorted(p for pattern in args.sessions for p in glob.glob(pattern))
+    if args.subject:
+        records = open_box_catalog().query(subject=args.subject, kind=args.kind, sampling_rate=fs,
+                                           unknown_rate=True)
+        unknown = sum(r.sampling_rate is None for r in records)
+        if unknown:
+            print(f"[train_mlp] {unknown} catalog sessions have no recorded sampling rate; assuming {fs} Hz")
+        paths += [str(r.path) for r in records]
+    if not paths:
+        ap.error("no sessions given or found in the catalog")
+
+    mlp, qmlp, report = train_session_mlp(
+        paths, fs, bands, hidden=tuple(args.hidden), window_s=infer.get("window_s", 2.0),
+        notch=proc.get("notch", 60.0), order=proc.get("order", 4),
+    )
+    print(json.dumps({"quantization": dataclasses.asdict(report)}, indent=2))
+
+    model = mlp if args.float else qmlp
+    fb = StreamingFilterBank.from_config(proc, fs, mlp.mean.shape[0] // len(bands))
+    train = cfg.get("train", {})
+    fsm_cfg = {k: train[k] for k in ("threshold", "refractory_ms", "debounce", "hysteresis") if k in train}
+    exported = export_model(args.out, model, fb, fsm_config=fsm_cfg, infer_config=infer,
+                            metadata={"source": f"MLP on {len(paths)} sessions",
+                                      "quantized": not args.float})
+    print(f"[train_mlp] wrote {exported.path} ({exported.size_bytes / 1024:.1f} KiB, "
+          f"{'float' if args.float else 'int8'})")
+
+
+if __name__ == "__main__":
+    main()